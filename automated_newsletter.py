@@ -2,6 +2,10 @@
 """
 Climate Cardinals - Automated Weekly Newsletter System
 Uses DuckDuckGo (free, no API keys needed)
+
+Heavy dependencies (ddgs, sqlite3, smtplib/email, concurrent.futures) are
+imported inside the functions that use them, so importing this module stays cheap.
+The search backend is pluggable (see search_backends.py and SEARCH_BACKEND).
 """
 
 import os
@@ -11,28 +15,66 @@ import re
 import csv
 import time
 import html
-import random
+import threading
 from datetime import datetime, timedelta
 from pathlib import Path
 from urllib.parse import urlparse
 
-import requests
-import pandas as pd
-from bs4 import BeautifulSoup
-from dateutil import parser
-from ddgs import DDGS
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+from weekly_store import WeeklyStore
+from dedup_index import DedupIndex
+from expert_index import ExpertIndex, looks_like_person, parse_profile, profile_slug, profile_url
+from relevance import MIN_RELEVANCE_SCORE, score
+from date_extract import extract_date
+from query_budget import YieldStats, schedule
+from editions import FUTURE_SECTIONS, Edition, load_editions, query_uses, union_queries
+import metrics
+from metrics import Metrics
 
 # ---------------------- CONFIG ----------------------
+# Shared rate limit: one search per POLITE_DELAY + POLITE_JITTER / 2 seconds on average
 POLITE_DELAY = 0.25
+POLITE_JITTER = 0.15
+SEARCH_BURST = int(os.getenv("SEARCH_BURST", "1"))
+# Retryable errors get SEARCH_ATTEMPTS tries; each try gives up after SEARCH_TIMEOUT seconds
+SEARCH_ATTEMPTS = int(os.getenv("SEARCH_ATTEMPTS", "3"))
+SEARCH_TIMEOUT = float(os.getenv("SEARCH_TIMEOUT", "20"))
+# After BREAKER_THRESHOLD failed queries in a row, serve the cache for BREAKER_COOLDOWN seconds
+BREAKER_THRESHOLD = 5
+BREAKER_COOLDOWN = 60.0
+SEARCH_WORKERS = int(os.getenv("SEARCH_WORKERS", "6"))
 MAX_RESULTS_PER_KEYWORD = 4
 MAX_ROWS_PER_SECTION = 40
+MAX_EXPERTS = 30
+# A section stops searching once this many candidates score STRONG_SCORE or better
+ENOUGH_STRONG_ROWS = int(os.getenv("ENOUGH_STRONG_ROWS", "12"))
+STRONG_SCORE = 5.0
 MIN_YEAR = 2025
 OUTPUT_FOLDER = Path("weekly_data")
 OUTPUT_FOLDER.mkdir(exist_ok=True)
 TODAY = datetime.now().date()
+STATE_PATH = OUTPUT_FOLDER / "state.json"
+WEEK_FOLDER = OUTPUT_FOLDER / "week"
+ARCHIVE_FOLDER = OUTPUT_FOLDER / "archive"
+DEDUP_PATH = OUTPUT_FOLDER / "dedup_index.jsonl"
+EXPERT_INDEX_PATH = OUTPUT_FOLDER / "experts.jsonl"
+ISSUE_ARCHIVE_PATH = OUTPUT_FOLDER / "archive.sqlite"
+METRICS_PATH = OUTPUT_FOLDER / "metrics.jsonl"
+YIELD_PATH = OUTPUT_FOLDER / "keyword_yield.json"
+# PROFILE=cpu (cProfile) or PROFILE=memory (tracemalloc) dumps hot spots to weekly_data/profile-*.txt
+PROFILE = os.getenv("PROFILE", "").lower()
+
+# Search cache / quota config
+CACHE_PATH = OUTPUT_FOLDER / "search_cache.sqlite"
+CACHE_MAX_ENTRIES = 5000
+DAILY_QUERY_LIMIT = int(os.getenv("DAILY_QUERY_LIMIT", "100"))
+CACHE_TTL_HOURS = {"grants": 20, "events": 20, "csr": 72, "experts": 72}
+DEFAULT_CACHE_TTL_HOURS = 20
+
+# Landing-page enrichment config (ENRICH_PAGES=0 keeps snippet-only rows)
+ENRICH_PAGES = os.getenv("ENRICH_PAGES", "1") != "0"
+ENRICH_WORKERS = int(os.getenv("ENRICH_WORKERS", "8"))
+PAGE_CACHE_PATH = OUTPUT_FOLDER / "page_cache.sqlite"
+REPORT_CACHE_PATH = OUTPUT_FOLDER / "pdf_reports.sqlite"
 
 # Email config
 SMTP_SERVER = os.getenv("SMTP_SERVER", "smtp.gmail.com")
@@ -40,6 +82,21 @@ SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
 SENDER_EMAIL = os.getenv("SENDER_EMAIL", "")
 SENDER_PASSWORD = os.getenv("SENDER_PASSWORD", "")
 RECIPIENT_EMAILS = [e.strip() for e in os.getenv("RECIPIENT_EMAILS", "").split(",") if e.strip()]
+# 1 = one message per recipient; larger values send BCC batches of that size
+EMAIL_BATCH_SIZE = int(os.getenv("EMAIL_BATCH_SIZE", "1"))
+EMAIL_WORKERS = int(os.getenv("EMAIL_WORKERS", "2"))
+DELIVERY_LOG_PATH = OUTPUT_FOLDER / "delivery_log.jsonl"
+OUTBOX_FOLDER = OUTPUT_FOLDER / "outbox"
+EMAIL_SUBJECT = "🌍 Climate Cardinals Newsletter - {date}"
+# HTML byte budget per issue (Gmail clips at ~102 KB); the lowest-ranked cards are trimmed to fit, 0 = no budget
+EMAIL_MAX_BYTES = int(os.getenv("EMAIL_MAX_BYTES", "95000"))
+# Optional fixed cap on cards per section on top of the byte budget
+EMAIL_MAX_CARDS = int(os.getenv("EMAIL_MAX_CARDS", "0")) or None
+# Move repeated inline styles into a <style> block; 0 keeps every style inline for clients that strip <style>
+EMAIL_SHARED_STYLES = os.getenv("EMAIL_SHARED_STYLES", "1") != "0"
+
+# Several editions from one process (see editions.example.json); unset = the single default edition
+EDITIONS_CONFIG = os.getenv("EDITIONS_CONFIG", "")
 
 # ---------------------- KEYWORDS ----------------------
 GRANT_KEYWORDS = [
@@ -63,16 +120,6 @@ EXPERT_QUERIES = [
     "climate resilience NGO director LinkedIn"
 ]
 
-# ---------------------- RELEVANCE FILTER ----------------------
-CLIMATE_TERMS = [
-    "climate", "resilien", "adapt", "sustain", "environment", "decarbon",
-    "net zero", "renewable", "flood", "heat", "wildfire", "community", "justice"
-]
-
-def looks_relevant(title, snippet, url):
-    blob = f"{title} {snippet} {url}".lower()
-    return any(t in blob for t in CLIMATE_TERMS)
-
 # ---------------------- UTILS ----------------------
 def clean_text(txt):
     return html.unescape(re.sub(r"\s+", " ", txt or "").strip())
@@ -83,120 +130,326 @@ def domain_from_url(url):
     except:
         return "—"
 
-def extract_year(text):
+# ---------------------- STATE / QUOTA ----------------------
+_state_lock = threading.Lock()
+_state = None
+
+def load_state():
+    state = {"queries_used_today": 0, "last_reset_date": None,
+             "last_email_sent": None, "week_start_date": None}
     try:
-        return parser.parse(text, fuzzy=True).year
-    except:
-        return None
+        with open(STATE_PATH, encoding="utf-8") as f:
+            state.update(json.load(f))
+    except (OSError, ValueError):
+        pass
+    if state["last_reset_date"] != TODAY.isoformat():
+        state["queries_used_today"] = 0
+        state["last_reset_date"] = TODAY.isoformat()
+    return state
 
-def extract_date_snippet(text, future=True):
-    if not text:
-        return "—"
-    month_pat = re.compile(
-        r"(January|February|March|April|May|June|July|August|September|October|November|December)"
-        r"\s+\d{1,2},?\s*(20\d{2})", re.I
-    )
-    for m in month_pat.finditer(text):
-        year = int(m.group(2))
-        if year >= MIN_YEAR:
-            return m.group(0)
-    if future and re.search(r"rolling|ongoing|open until", text, re.I):
-        return "Rolling / Ongoing"
-    return "—"
+def save_state(state):
+    with open(STATE_PATH, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+
+def get_state():
+    global _state
+    if _state is None:
+        _state = load_state()
+    return _state
+
+def take_quota():
+    """Charge one backend call (a query's first try, a retry or a hedge) against DAILY_QUERY_LIMIT;
+    False once today's budget is spent"""
+    with _state_lock:
+        state = get_state()
+        if state["queries_used_today"] >= DAILY_QUERY_LIMIT:
+            return False
+        state["queries_used_today"] += 1
+        save_state(state)
+        return True
 
 # ---------------------- SEARCH ----------------------
-def web_search(query, num=8):
-    results = []
+METRICS = Metrics()
+
+_rate_lock = threading.Lock()
+_cache = None
+_backend = None
+_searcher = None
+
+def get_cache():
+    global _cache
+    with _rate_lock:
+        if _cache is None:
+            from search_cache import SearchCache
+            _cache = SearchCache(CACHE_PATH, max_entries=CACHE_MAX_ENTRIES)
+    return _cache
+
+def get_backend():
+    global _backend
+    with _rate_lock:
+        if _backend is None:
+            from search_backends import backend_from_env
+            _backend = backend_from_env()
+    return _backend
+
+def set_backend(backend):
+    """Swap the search backend, e.g. a ReplayBackend for offline runs and benchmarks"""
+    global _backend, _searcher
+    _backend = backend
+    _searcher = None
+
+def get_searcher():
+    """The backend wrapped in retries, hedging, the shared rate limit and the circuit breaker"""
+    global _searcher
+    backend = get_backend()
+    with _rate_lock:
+        if _searcher is None:
+            from resilient_search import CircuitBreaker, ResilientSearch
+            interval = POLITE_DELAY + POLITE_JITTER / 2
+            _searcher = ResilientSearch(backend, rate=1 / interval if interval else None, burst=SEARCH_BURST,
+                                        attempts=SEARCH_ATTEMPTS, timeout=SEARCH_TIMEOUT,
+                                        breaker=CircuitBreaker(BREAKER_THRESHOLD, BREAKER_COOLDOWN), quota=take_quota,
+                                        latencies=metrics.recent_latencies(METRICS_PATH))
+    return _searcher
+
+def web_search(query, num=8, ttl_hours=DEFAULT_CACHE_TTL_HOURS):
+    start = time.perf_counter()
+    cache = get_cache()
+    cached = cache.get(query, num, ttl_hours)
+    if cached is not None:
+        METRICS.query(query, num, "cache", time.perf_counter() - start, len(cached))
+        return cached
+    searcher = get_searcher()
+    if searcher.breaker.is_open():
+        return stale_results(query, num, start, "circuit open")
+    from resilient_search import QuotaExceededError
+    start = time.perf_counter()
     try:
-        with DDGS() as ddgs:
-            for r in ddgs.text(query, max_results=num):
-                results.append({
-                    "title": r.get("title", ""),
-                    "link": r.get("href", ""),
-                    "snippet": r.get("body", "")
-                })
+        # The searcher charges every backend call, retries and hedges included, to the daily quota
+        results = searcher.search(query, num)
+    except QuotaExceededError:
+        print(f"⚠️  Daily query limit ({DAILY_QUERY_LIMIT}) reached, using stale cache for: {query}")
+        return stale_results(query, num, start, "daily query limit reached")
     except Exception as e:
         print(f"⚠️  Search error: {e}")
+        return stale_results(query, num, start, f"{type(e).__name__}: {e}")
+    cache.put(query, num, results)
+    METRICS.query(query, num, "network", time.perf_counter() - start, len(results))
     return results
 
+def stale_results(query, num, start, error):
+    """Fall back to cached results of any age, recording why the network wasn't used"""
+    results = get_cache().get(query, num) or []
+    METRICS.query(query, num, "stale" if results else "empty", time.perf_counter() - start, len(results), error)
+    return results
+
+def search_many(jobs, workers=None):
+    """Run (query, num, ttl_hours) jobs on a bounded thread pool; results come back in job order"""
+    jobs = list(jobs)
+    workers = max(1, min(workers or SEARCH_WORKERS, len(jobs) or 1))
+    if workers == 1:
+        return [web_search(*job) for job in jobs]
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(lambda job: web_search(*job), jobs))
+
+def cached_only(query, num):
+    """Serve a query the scheduler decided not to spend a network call on"""
+    start = time.perf_counter()
+    results = get_cache().get(query, num) or []
+    METRICS.query(query, num, "skipped", time.perf_counter() - start, len(results))
+    return results
+
+def prefetch(sections, expert_queries=(), yields=None, dedup=None, early_stop=True):
+    """Search every section keyword and expert query at once, keyed by (query, num)
+
+    sections maps a section name ("grants", "events", "csr") to its keywords;
+    the name picks the cache TTL from CACHE_TTL_HOURS. With yields (a
+    query_budget.YieldStats) the searches are scheduled instead, see scheduled_search.
+    """
+    unique = {}
+    for name, keywords in sections.items():
+        for kw in keywords:
+            unique.setdefault((kw, 8), (name, CACHE_TTL_HOURS.get(name, DEFAULT_CACHE_TTL_HOURS)))
+    for q in expert_queries:
+        unique.setdefault((q, 12), ("experts", CACHE_TTL_HOURS["experts"]))
+    for q, _ in unique:
+        print(f"🔍 Searching: {q}")
+    if yields is None:
+        results = dict(zip(unique, search_many([(q, n, ttl) for (q, n), (_, ttl) in unique.items()])))
+    else:
+        results = scheduled_search(unique, yields, dedup, early_stop=early_stop)
+    stats = get_cache().stats()
+    network = sum(1 for q in METRICS.queries if q["source"] == "network")
+    print(f"🗄️  Search cache: {stats['hits']} hits, {stats['misses']} misses, "
+          f"{get_state()['queries_used_today']}/{DAILY_QUERY_LIMIT} backend calls used today "
+          f"({network} queries answered this run)")
+    if _searcher is not None and _searcher.stats["calls"]:
+        s = _searcher.stats
+        print(f"🛡️  Search backend: {s['calls']} calls, {s['retries']} retries, {s['hedges']} hedged "
+              f"({s['hedge_wins']} won), {s['failed'] + s['fatal']} failed, breaker {_searcher.breaker.state}"
+              f"{f' (tripped {_searcher.breaker.trips}x)' if _searcher.breaker.trips else ''}")
+    return results
+
+def scheduled_search(jobs, yields, dedup=None, early_stop=True):
+    """Spend the day's remaining query budget where keywords have paid off before
+
+    jobs maps (query, num) -> (section, ttl_hours). Fresh cache hits are served
+    first (low-yield keywords trust their cache LOW_YIELD_TTL_FACTOR times longer).
+    Cache misses are searched in waves of SEARCH_WORKERS in query_budget.schedule
+    order; before each wave, sections that already have enough strong candidates
+    drop their remaining searches (unless early_stop is off), and once the budget
+    is spent the rest fall back to the cache.
+    """
+    cache = get_cache()
+    jobs = {(q, n): (section, yields.ttl(q, ttl)) for (q, n), (section, ttl) in jobs.items()}
+    fresh = [(q, n, ttl) for (q, n), (_, ttl) in jobs.items() if cache.fresh(q, n, ttl)]
+    results = dict(zip([(q, n) for q, n, _ in fresh], search_many(fresh)))
+    pending = schedule([(section, q, n, ttl) for (q, n), (section, ttl) in jobs.items()
+                        if (q, n) not in results], yields)
+    enough, over_budget = set(), 0
+    while pending:
+        # Retries and hedges are charged too, so re-read what's left before each wave
+        budget = max(0, DAILY_QUERY_LIMIT - get_state()["queries_used_today"])
+        if early_stop:
+            enough |= {section for section, *_ in pending
+                       if section not in enough and has_enough(section, jobs, results, yields, dedup)}
+        for _, q, n, _ in (job for job in pending if job[0] in enough):
+            results[(q, n)] = cached_only(q, n)
+        pending = [job for job in pending if job[0] not in enough]
+        if pending and not budget:
+            over_budget = len(pending)
+            for _, q, n, _ in pending:
+                results[(q, n)] = cached_only(q, n)
+            break
+        wave, pending = pending[:min(SEARCH_WORKERS, budget)], pending[min(SEARCH_WORKERS, budget):]
+        results.update(zip([(q, n) for _, q, n, _ in wave], search_many([(q, n, ttl) for _, q, n, ttl in wave])))
+    if enough:
+        print(f"⏭️  Stopped searching early for: {', '.join(sorted(enough))} (enough strong candidates)")
+    if over_budget:
+        print(f"⚠️  Daily query budget spent, {over_budget} lower-yield searches served from cache")
+    return results
+
+def has_enough(section, jobs, results, yields, dedup=None):
+    """True once a section's results hold ENOUGH_STRONG_ROWS candidates scoring STRONG_SCORE+ that
+    run_section would accept: one per canonical URL, no near-duplicates of each other or of `dedup`,
+    none dated before MIN_YEAR"""
+    if section == "experts":
+        return False
+    candidates = []
+    for (q, n), (s, _) in jobs.items():
+        if s == section and (q, n) in results:
+            candidates += [(clean_text(item["title"]), clean_text(item["snippet"]), item["link"])
+                           for item in results[(q, n)][:yields.take(q, MAX_RESULTS_PER_KEYWORD)] if item["link"]]
+    scored = [(score(title, snippet, url), title, snippet, url) for title, snippet, url in candidates]
+    run, strong = DedupIndex(), 0
+    for value, title, snippet, url in sorted(scored, key=lambda c: -c[0]):
+        if value < STRONG_SCORE:
+            break
+        if (dedup and dedup.find(url, title, snippet)) or run.find(url, title, snippet):
+            continue
+        dated = extract_date(f"{title} {snippet}", min_year=MIN_YEAR, future=FUTURE_SECTIONS[section])
+        if dated.year and dated.year < MIN_YEAR:
+            continue
+        run.add(url, title, snippet)
+        strong += 1
+        if strong >= ENOUGH_STRONG_ROWS:
+            return True
+    return False
+
 # ---------------------- CORE PIPELINE ----------------------
-def run_section(keywords, future=True):
-    rows = []
-    seen_domains = set()
+def run_section(keywords, future=True, results=None, section=None, dedup=None, yields=None, max_rows=None):
+    """Collect candidates in keyword order, then keep the best-scoring ones that aren't
+    near-duplicates of each other or of anything in `dedup` (past issues).
+    With `yields`, proven keywords contribute more of their results and duds fewer"""
+    max_rows = max_rows or MAX_ROWS_PER_SECTION
+    if results is None:
+        results = prefetch({section: keywords})
+    if dedup is None:
+        dedup = DedupIndex()
+    week = get_state()["week_start_date"]
+    candidates, sources = [], []
     for kw in keywords:
-        if len(rows) >= MAX_ROWS_PER_SECTION:
-            break
-        print(f"🔍 Searching: {kw}")
-        items = web_search(kw, num=8)[:MAX_RESULTS_PER_KEYWORD]
-        for item in items:
-            if len(rows) >= MAX_ROWS_PER_SECTION:
-                break
+        take = yields.take(kw, MAX_RESULTS_PER_KEYWORD) if yields else MAX_RESULTS_PER_KEYWORD
+        for item in results.get((kw, 8), [])[:take]:
             url = item["link"]
-            domain = domain_from_url(url)
-            if not url or domain in seen_domains:
-                continue
-            seen_domains.add(domain)
-            title = clean_text(item["title"])
-            snippet = clean_text(item["snippet"])
-            if not looks_relevant(title, snippet, url):
-                continue
-            date_info = extract_date_snippet(f"{title} {snippet}", future=future)
-            year = extract_year(date_info)
-            if year and year < MIN_YEAR:
+            if not url:
                 continue
-            rows.append({
-                "Title": title,
-                "Organization": domain,
-                "Description": snippet,
-                "Date Info": date_info,
-                "URL": url
-            })
-        time.sleep(POLITE_DELAY + random.uniform(0, 0.15))
+            candidates.append((clean_text(item["title"]), clean_text(item["snippet"]), url))
+            sources.append(kw)
+    scores = [score(title, snippet, url) for title, snippet, url in candidates]
+    ranked = sorted(range(len(candidates)), key=lambda i: -scores[i])
+    rows = []
+    for n, i in enumerate(ranked):
+        if len(rows) >= max_rows or scores[i] < MIN_RELEVANCE_SCORE:
+            for j in ranked[n:]:
+                reason = metrics.IRRELEVANT if scores[j] < MIN_RELEVANCE_SCORE else metrics.OVER_CAP
+                METRICS.outcome(section, sources[j], reason)
+            break
+        title, snippet, url = candidates[i]
+        if dedup.find(url, title, snippet):
+            METRICS.outcome(section, sources[i], metrics.DUPLICATE)
+            continue
+        dated = extract_date(f"{title} {snippet}", min_year=MIN_YEAR, future=future)
+        if dated.year and dated.year < MIN_YEAR:
+            METRICS.outcome(section, sources[i], metrics.TOO_OLD)
+            continue
+        dedup.add(url, title, snippet, section=section, week=week)
+        METRICS.outcome(section, sources[i], metrics.ACCEPTED)
+        rows.append({
+            "Title": title,
+            "Organization": domain_from_url(url),
+            "Description": snippet,
+            "Date Info": dated.label,
+            "URL": url,
+            "Score": round(scores[i], 2)
+        })
     return rows
 
-def looks_like_person(name):
-    return (len(name.split()) >= 2 and name[0].isupper() and
-            not any(x in name.lower() for x in ["jobs", "careers", "hiring"]))
-
-def run_experts(queries):
+def run_experts(queries, results=None, dedup=None, experts=None, max_experts=None):
+    """Profiles from the expert queries, one per person: results are merged into `experts`
+    by profile slug, and anyone featured in a past issue (or earlier in this run) is skipped"""
+    max_experts = max_experts or MAX_EXPERTS
     rows = []
-    seen_profiles = set()
+    if results is None:
+        results = prefetch({}, queries)
+    if dedup is None:
+        dedup = DedupIndex()
+    if experts is None:
+        experts = ExpertIndex()
+    week = get_state()["week_start_date"]
     for q in queries:
-        print(f"🔍 Searching Experts: {q}")
-        items = web_search(q, num=12)
+        items = results.get((q, 12), [])
         for item in items:
-            url = item["link"]
-            if "linkedin.com/in" not in url:
+            slug = profile_slug(item["link"])
+            if slug is None:
+                METRICS.outcome("experts", q, metrics.NOT_A_PROFILE)
                 continue
-            if url in seen_profiles:
+            name, role, org = parse_profile(clean_text(item["title"]), clean_text(item["snippet"]))
+            record = experts.observe(item["link"], name, role, org, week=week)
+            url = profile_url(slug)
+            # dedup still holds the experts featured before the expert index existed
+            if experts.was_featured(slug) or dedup.find(url):
+                METRICS.outcome("experts", q, metrics.DUPLICATE)
                 continue
-            seen_profiles.add(url)
-            title = clean_text(item["title"])
-            snippet = clean_text(item["snippet"])
-            name = title.split("–")[0].split("-")[0].strip()
-            if not looks_like_person(name):
+            if not looks_like_person(record["name"]):
+                METRICS.outcome("experts", q, metrics.NOT_A_PERSON)
                 continue
-            role = "—"
-            parts = re.split(r"–|-", title)
-            if len(parts) > 1:
-                role = parts[1].strip()
-            org = "—"
-            if " at " in snippet:
-                org = snippet.split(" at ")[-1].split(".")[0].strip()
+            experts.feature(slug, week)
+            METRICS.outcome("experts", q, metrics.ACCEPTED)
             rows.append({
-                "Name": name,
-                "Role": role,
-                "Organization": org,
+                "Name": record["name"],
+                "Role": record["role"],
+                "Organization": record["organization"],
                 "LinkedIn": url
             })
-        time.sleep(POLITE_DELAY)
-        if len(rows) >= 30:
+        if len(rows) >= max_experts:
             break
     return rows
 
 # ---------------------- WRITE CSVs ----------------------
-def write_csv(name, data):
-    path = OUTPUT_FOLDER / name
+def write_csv(name, data, folder=None):
+    path = Path(folder or OUTPUT_FOLDER) / name
     if not data:
         print(f"Saved {name} (0 rows)")
         return
@@ -206,92 +459,286 @@ def write_csv(name, data):
         writer.writerows(data)
     print(f"Saved {name} ({len(data)} rows)")
 
+# ---------------------- ENRICHMENT ----------------------
+def is_pdf_url(url):
+    return urlparse(url).path.lower().endswith(".pdf")
+
+def enrich_sections(sections):
+    """Fetch every row's landing page in one concurrent pass; sections maps name -> (rows, future)
+
+    PDFs (by URL or Content-Type) get their title, year and company from Range
+    reads instead. Returns {name: rows} with Organization / Date Info read from
+    the pages, minus rows whose page or report dates them before MIN_YEAR.
+    """
+    from enrichment import PageFetcher, enrich_row
+    from pdf_meta import PdfMetaReader, as_page
+    urls = [row["URL"] for rows, _ in sections.values() for row in rows]
+    fetcher = PageFetcher(PAGE_CACHE_PATH, workers=ENRICH_WORKERS)
+    reader = PdfMetaReader(REPORT_CACHE_PATH, session=fetcher.session)
+    try:
+        pages = fetcher.fetch_many(u for u in urls if not is_pdf_url(u))
+        pdfs = [u for u in urls if is_pdf_url(u) or (pages.get(u) or {}).get("content_type") == "application/pdf"]
+        pages.update((url, as_page(meta)) for url, meta in reader.read_many(pdfs).items())
+    finally:
+        reader.close()
+        fetcher.close()
+    stats, pdf_stats = fetcher.stats, reader.stats
+    print(f"🔎 Enriched {len(pages)} pages: {stats['fetched']} fetched, {stats['not_modified']} unchanged (304), "
+          f"{stats['cached']} cached, {stats['errors']} failed, {stats['bytes'] / 1024:.0f} KB")
+    if pdfs:
+        print(f"📄 {len(pdfs)} PDF reports: {pdf_stats['fetched']} read, "
+              f"{pdf_stats['cached'] + pdf_stats['same_content']} cached, {pdf_stats['errors']} failed, "
+              f"{pdf_stats['bytes'] / 1024:.0f} KB in {pdf_stats['requests']} range requests")
+    enriched = {}
+    for name, (rows, future) in sections.items():
+        kept = [enrich_row(row, pages.get(row["URL"]), future=future, min_year=MIN_YEAR) for row in rows]
+        enriched[name] = [row for row in kept if row is not None]
+        if len(enriched[name]) < len(rows):
+            METRICS.outcome(name, "(landing page)", metrics.TOO_OLD_PAGE, len(rows) - len(enriched[name]))
+            print(f"🗑️  {name}: dropped {len(rows) - len(enriched[name])} items dated before {MIN_YEAR} by their page")
+    return enriched
+
+# ---------------------- WEEKLY STORE ----------------------
+def is_send_day():
+    return datetime.now().weekday() == 0
+
+def store_week(store, grants_data, events_data, csr_data, experts_data, archive=None):
+    """Merge this run's rows into the weekly store (and the issue archive) and return the whole week per section"""
+    sections = (("grants", grants_data, "URL"), ("events", events_data, "URL"),
+                ("csr", csr_data, "URL"), ("experts", experts_data, "LinkedIn"))
+    week = {}
+    for section, data, url_field in sections:
+        added = store.merge(section, data, url_field=url_field)
+        week[section] = store.load(section)
+        if archive is not None:
+            archive.record(section, data, get_state()["week_start_date"])
+        print(f"📥 {section}: {added} new, {len(week[section])} this week")
+    return week
+
+def rollover_week(store, sent, archive=None, archive_folder=None):
+    """Archive the finished week under archive_folder (ARCHIVE_FOLDER)/<week_start_date>"""
+    state = get_state()
+    store.rollover(Path(archive_folder or ARCHIVE_FOLDER) / state["week_start_date"])
+    if archive is not None and sent:
+        archive.mark_sent(state["week_start_date"])
+    print(f"🗃️  Archived week of {state['week_start_date']}")
+
+def start_new_week(sent):
+    """Every edition's week is archived; the next one starts today"""
+    state = get_state()
+    state["week_start_date"] = TODAY.isoformat()
+    if sent:
+        state["last_email_sent"] = TODAY.isoformat()
+    save_state(state)
+
 # ---------------------- EMAIL ----------------------
-def send_email(grants_data, events_data, csr_data, experts_data):
-    """Send newsletter email using premium template - only on Monday"""
+def smtp_pool():
+    from delivery import SMTPPool
+    return SMTPPool(SMTP_SERVER, SMTP_PORT, SENDER_EMAIL, SENDER_PASSWORD, size=EMAIL_WORKERS)
+
+def send_email(grants_data, events_data, csr_data, experts_data, edition=None, pool=None):
+    """Send newsletter email using premium template - only on Monday. Returns True if anyone has it
+
+    edition picks the recipients, subject, template and card limit (default: the
+    RECIPIENT_EMAILS newsletter); pool lets several editions share SMTP connections.
+    """
+    edition = edition or default_edition()
     # Only send on Monday (weekday 0 = Monday)
-    if datetime.now().weekday() != 0:
+    if not is_send_day():
         print(f"⏭️  Not Monday (today is {datetime.now().strftime('%A')}), skipping email send")
-        return
+        return False
     
-    if not SENDER_EMAIL or not SENDER_PASSWORD or not RECIPIENT_EMAILS:
+    if not SENDER_EMAIL or not SENDER_PASSWORD or not edition.recipients:
         print("⚠️  Email config missing, skipping send")
-        return
-    
-    # Import template generator
-    from email_template import generate_email_html
+        return False
     
-    # Convert to DataFrames and rename columns for template
-    grants_df = pd.DataFrame(grants_data) if grants_data else pd.DataFrame()
-    events_df = pd.DataFrame(events_data) if events_data else pd.DataFrame()
-    csr_df = pd.DataFrame(csr_data) if csr_data else pd.DataFrame()
-    experts_df = pd.DataFrame(experts_data) if experts_data else pd.DataFrame()
+    # Import template generator and mail libraries only when actually sending
+    from delivery import DeliveryLog, build_message, deliver, save_outbox
+    from email_budget import render_email
     
-    # Rename Organization to Domain for template compatibility
-    if not grants_df.empty:
-        grants_df = grants_df.rename(columns={'Organization': 'Domain'})
-    if not events_df.empty:
-        events_df = events_df.rename(columns={'Organization': 'Domain'})
-    if not csr_df.empty:
-        csr_df = csr_df.rename(columns={'Organization': 'Domain'})
+    # Render once; every recipient gets the same bytes with their own To header (or BCC)
+    with METRICS.stage("render"):
+        email = render_email(experts_data, grants_data, events_data, csr_data, max_cards=edition.max_cards,
+                             template=edition.template, max_bytes=EMAIL_MAX_BYTES, shared_styles=EMAIL_SHARED_STYLES)
+        body = build_message((edition.subject or EMAIL_SUBJECT).format(date=TODAY, edition=edition.name),
+                             SENDER_EMAIL, email.html, email.text)
+    issue = edition.issue(get_state()["week_start_date"])
+    METRICS.email(issue, {**email.record(), "message_bytes": len(body)})
+    print(email.summary())
+    if email.over_budget:
+        print(f"⚠️  Email is still over the {EMAIL_MAX_BYTES / 1024:.0f} KB budget with one card per section; "
+              "Gmail may clip it")
+    save_outbox(OUTBOX_FOLDER, issue, body)
     
-    # Generate HTML
-    html_content = generate_email_html(experts_df, grants_df, events_df, csr_df)
+    own_pool = pool is None
+    pool = pool or smtp_pool()
+    try:
+        with METRICS.stage("smtp"):
+            counts = deliver(pool, DeliveryLog(DELIVERY_LOG_PATH), issue, SENDER_EMAIL, body, edition.recipients,
+                             batch_size=EMAIL_BATCH_SIZE, workers=EMAIL_WORKERS)
+    finally:
+        if own_pool:
+            pool.close()
     
-    # Send email
+    print(f"✅ {'' if edition.primary else f'[{edition.name}] '}Email sent to {counts['sent']} recipients ({counts['skipped']} already had it, "
+          f"{pool.connects} SMTP connections)")
+    if counts["failed"] or counts["rejected"]:
+        print(f"❌ Email: {counts['failed']} failed (queued for retry), {counts['rejected']} rejected")
+    return counts["sent"] + counts["skipped"] > 0
+
+def retry_failed_deliveries():
+    """Resend queued issues to recipients whose earlier delivery failed"""
+    if not SENDER_EMAIL or not SENDER_PASSWORD or not DELIVERY_LOG_PATH.exists():
+        return
+    from delivery import DeliveryLog, deliver, load_outbox
+    log = DeliveryLog(DELIVERY_LOG_PATH)
+    retries = log.retry_queue()
+    if not retries:
+        return
+    pool = smtp_pool()
     try:
-        msg = MIMEMultipart("alternative")
-        msg["Subject"] = f"🌍 Climate Cardinals Newsletter - {TODAY}"
-        msg["From"] = SENDER_EMAIL
-        msg["To"] = ", ".join(RECIPIENT_EMAILS)
-        
-        msg.attach(MIMEText(html_content, "html"))
-        
-        with smtplib.SMTP(SMTP_SERVER, SMTP_PORT) as server:
-            server.starttls()
-            server.login(SENDER_EMAIL, SENDER_PASSWORD)
-            server.sendmail(SENDER_EMAIL, RECIPIENT_EMAILS, msg.as_string())
-        
-        print(f"✅ Email sent to {len(RECIPIENT_EMAILS)} recipients")
-    except Exception as e:
-        print(f"❌ Email error: {e}")
+        for issue, recipients in retries.items():
+            body = load_outbox(OUTBOX_FOLDER, issue)
+            if body is None:
+                continue
+            counts = deliver(pool, log, issue, SENDER_EMAIL, body, recipients,
+                             batch_size=EMAIL_BATCH_SIZE, workers=EMAIL_WORKERS)
+            print(f"🔁 Retried issue {issue}: {counts['sent']} sent, {counts['failed']} still failing")
+    finally:
+        pool.close()
 
 # ---------------------- MAIN ----------------------
+def print_summary(heading, rows, width=120):
+    if not rows:
+        return
+    print(f"\n===== {heading} =====")
+    for i, row in enumerate(rows):
+        print(f"{i:>3}  " + " | ".join(str(v)[:width] for v in row.values()))
+
 def main():
+    with metrics.profiled(PROFILE, OUTPUT_FOLDER):
+        run()
+    if _searcher is not None:
+        METRICS.backend(_searcher.measured)
+    METRICS.save(METRICS_PATH)
+    print()
+    for line in METRICS.summary():
+        print(line)
+    print(f"📈 Metrics appended to {METRICS_PATH}")
+
+def default_edition():
+    """The newsletter configured by the module constants and RECIPIENT_EMAILS, in OUTPUT_FOLDER"""
+    return Edition("default", {"grants": GRANT_KEYWORDS, "events": EVENT_KEYWORDS, "csr": CSR_KEYWORDS},
+                   EXPERT_QUERIES, folder=OUTPUT_FOLDER, recipients=RECIPIENT_EMAILS,
+                   max_rows=MAX_ROWS_PER_SECTION, max_experts=MAX_EXPERTS, max_cards=EMAIL_MAX_CARDS, primary=True)
+
+def get_editions():
+    if not EDITIONS_CONFIG:
+        return [default_edition()]
+    return load_editions(EDITIONS_CONFIG, OUTPUT_FOLDER,
+                         defaults={"max_rows": MAX_ROWS_PER_SECTION, "max_experts": MAX_EXPERTS,
+                                   "max_cards": EMAIL_MAX_CARDS})
+
+SUMMARY_HEADINGS = {"grants": "🌍 GRANTS (2025+)", "events": "🎤 EVENTS (2025+)",
+                    "csr": "🏢 CSR / ESG REPORTS", "experts": "👥 CLIMATE EXPERTS"}
+CSV_NAMES = {"grants": "grants.csv", "events": "events.csv", "csr": "csr_reports.csv", "experts": "experts.csv"}
+
+def run():
     print("=" * 70)
     print("🌍 CLIMATE CARDINALS - AUTOMATED NEWSLETTER")
     print("=" * 70)
     print(f"📅 Date: {TODAY}")
     
-    grants_data = run_section(GRANT_KEYWORDS, future=True)
-    events_data = run_section(EVENT_KEYWORDS, future=True)
-    csr_data = run_section(CSR_KEYWORDS, future=False)
-    experts_data = run_experts(EXPERT_QUERIES)
+    state = get_state()
+    if not state["week_start_date"]:
+        # A fresh install's week started last Monday; starting it on a Monday run would read as already sent
+        state["week_start_date"] = (TODAY - timedelta(days=TODAY.weekday() or 7)).isoformat()
+        save_state(state)
+    print(f"🗓️  Week of: {state['week_start_date']}")
+    retry_failed_deliveries()
     
-    write_csv("grants.csv", grants_data)
-    write_csv("events.csv", events_data)
-    write_csv("csr_reports.csv", csr_data)
-    write_csv("experts.csv", experts_data)
+    editions = get_editions()
+    if len(editions) > 1:
+        print(f"📚 Editions: {', '.join(edition.name for edition in editions)}")
+    dedups = {edition.name: DedupIndex(edition.folder / DEDUP_PATH.name) for edition in editions}
+    print(f"🧬 Dedup index: {', '.join(str(len(d)) for d in dedups.values())} items from past runs")
     
-    print(f"\n✅ CSVs saved to: {OUTPUT_FOLDER.resolve()}")
+    # Every distinct query is searched once, for all editions, on one pool and one cache
+    sections, expert_queries = union_queries(editions)
+    yields = YieldStats(YIELD_PATH)
+    with METRICS.stage("search"):
+        # A section's strong candidates may all come from one edition's keywords, so
+        # stopping early only applies to a single edition
+        results = prefetch(sections, expert_queries, yields=yields, dedup=dedups[editions[0].name],
+                           early_stop=len(editions) == 1)
     
-    # Send email
-    send_email(grants_data, events_data, csr_data, experts_data)
+    sent = False
+    # On send day every edition goes out over the same SMTP connections
+    pool = smtp_pool() if is_send_day() else None
+    try:
+        for edition in editions:
+            sent |= run_edition(edition, results, yields, dedups[edition.name], pool=pool)
+    finally:
+        if pool is not None:
+            pool.close()
+    # Only fresh network results say anything about a keyword's yield; cached ones were already seen.
+    # Each edition judged the shared results, so a keyword's counts are averaged over its editions
+    yields.update(METRICS.outcomes, {q["query"] for q in METRICS.queries if q["source"] == "network"},
+                  uses=query_uses(editions))
+    yields.save()
+    if is_send_day() and state["week_start_date"] != TODAY.isoformat():
+        start_new_week(sent)
+
+def run_edition(edition, results, yields, dedup, pool=None):
+    """Build, store and (on Monday) send one edition from the shared search results; True if sent"""
+    label = "" if edition.primary else f"[{edition.name}] "
+    if not edition.primary:
+        print(f"\n📰 Edition: {edition.name}")
+    edition.folder.mkdir(parents=True, exist_ok=True)
+    experts = ExpertIndex(edition.folder / EXPERT_INDEX_PATH.name)
+    with METRICS.stage("sections"):
+        data = {section: run_section(keywords, future=FUTURE_SECTIONS[section], results=results, section=section,
+                                     dedup=dedup, yields=yields, max_rows=edition.max_rows)
+                for section, keywords in edition.sections.items()}
+        data["experts"] = run_experts(edition.expert_queries, results=results, dedup=dedup, experts=experts,
+                                      max_experts=edition.max_experts)
+    if ENRICH_PAGES and edition.sections:
+        with METRICS.stage("enrich"):
+            data.update(enrich_sections({section: (data[section], FUTURE_SECTIONS[section])
+                                         for section in edition.sections}))
+    for section in FUTURE_SECTIONS:
+        data.setdefault(section, [])
+    
+    with METRICS.stage("csv"):
+        for section, name in CSV_NAMES.items():
+            if section in edition.sections or (section == "experts" and edition.expert_queries):
+                write_csv(name, data[section], folder=edition.folder)
+    
+    print(f"\n✅ {label}CSVs saved to: {edition.folder.resolve()}")
+    
+    # Accumulate the week, send it on Monday, then start a fresh week
+    from issue_archive import IssueArchive
+    archive = IssueArchive(edition.folder / ISSUE_ARCHIVE_PATH.name)
+    sent = False
+    try:
+        with METRICS.stage("store"):
+            store = WeeklyStore(edition.folder / WEEK_FOLDER.name)
+            week = store_week(store, data["grants"], data["events"], data["csr"], data["experts"], archive=archive)
+            dedup.save()
+            experts.save()
+        if get_state()["week_start_date"] == TODAY.isoformat():
+            print("⏭️  This week's issue already went out, skipping email send")
+        else:
+            sent = send_email(week["grants"], week["events"], week["csr"], week["experts"], edition=edition, pool=pool)
+            if is_send_day():
+                rollover_week(store, sent, archive=archive, archive_folder=edition.folder / ARCHIVE_FOLDER.name)
+    finally:
+        archive.close()
     
     # Display summary
-    pd.set_option("display.max_colwidth", 120)
-    if grants_data:
-        print("\n===== 🌍 GRANTS (2025+) =====")
-        print(pd.DataFrame(grants_data).to_string())
-    if events_data:
-        print("\n===== 🎤 EVENTS (2025+) =====")
-        print(pd.DataFrame(events_data).to_string())
-    if csr_data:
-        print("\n===== 🏢 CSR / ESG REPORTS =====")
-        print(pd.DataFrame(csr_data).to_string())
-    if experts_data:
-        print("\n===== 👥 CLIMATE EXPERTS =====")
-        print(pd.DataFrame(experts_data).to_string())
+    for section, heading in SUMMARY_HEADINGS.items():
+        print_summary(f"{label}{heading}", data[section])
+    return sent
 
 if __name__ == "__main__":
     main()
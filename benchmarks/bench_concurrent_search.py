@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Benchmark - serial vs concurrent keyword search using a fake search backend
+Run: python benchmarks/bench_concurrent_search.py
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import automated_newsletter as nl
+from search_backends import SearchBackend
+
+FAKE_LATENCY = 0.6
+
+
+class FakeBackend(SearchBackend):
+    """Fixed latency, deterministic results per query"""
+
+    name = "fake"
+
+    def search(self, query, num):
+        time.sleep(FAKE_LATENCY)
+        slug = query.replace(" ", "-")
+        return [{
+            "title": f"{query.title()} 2026 climate result {i}",
+            "link": f"https://site{i}.{slug}.org/page",
+            "snippet": f"Climate resilience programme, deadline March {i + 1}, 2026.",
+        } for i in range(num)]
+
+
+def run_pipeline(workers):
+    nl.SEARCH_WORKERS = workers
+    start = time.perf_counter()
+    results = nl.prefetch({"grants": nl.GRANT_KEYWORDS, "events": nl.EVENT_KEYWORDS,
+                           "csr": nl.CSR_KEYWORDS}, nl.EXPERT_QUERIES)
+    rows = [
+        nl.run_section(nl.GRANT_KEYWORDS, future=True, results=results),
+        nl.run_section(nl.EVENT_KEYWORDS, future=True, results=results),
+        nl.run_section(nl.CSR_KEYWORDS, future=False, results=results),
+        nl.run_experts(nl.EXPERT_QUERIES, results=results),
+    ]
+    return time.perf_counter() - start, rows
+
+
+def main():
+    nl.set_backend(FakeBackend())
+    nl.POLITE_DELAY = 0.05
+    nl.DAILY_QUERY_LIMIT = 10 ** 6
+    with tempfile.TemporaryDirectory() as tmp:
+        nl.CACHE_PATH = Path(tmp) / "cache.sqlite"
+        nl.STATE_PATH = Path(tmp) / "state.json"
+        compare()
+
+
+def compare():
+    serial_time, serial_rows = run_pipeline(1)
+    nl.get_cache().close()
+    nl._cache = None
+    nl.CACHE_PATH = nl.CACHE_PATH.with_name("cache-concurrent.sqlite")
+    concurrent_time, concurrent_rows = run_pipeline(8)
+    warm_time, warm_rows = run_pipeline(8)
+    assert serial_rows == concurrent_rows == warm_rows, "results differ between runs"
+    print(f"\nserial:     {serial_time:6.2f}s")
+    print(f"concurrent: {concurrent_time:6.2f}s")
+    print(f"speedup:    {serial_time / concurrent_time:6.2f}x (identical rows)")
+    print(f"warm cache: {warm_time:6.2f}s ({nl.get_cache().stats()})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Benchmark - legacy extract_date_snippet + extract_year vs date_extract.extract_date
+Checks the regression fixtures in fixtures/date_cases.json first (snippets from weekly_data/*.csv)
+Run: python benchmarks/bench_dates.py [repeat]
+"""
+
+import json
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from dateutil import parser
+
+import date_extract
+
+MIN_YEAR = 2025
+FIXTURES = Path(__file__).parent / "fixtures" / "date_cases.json"
+
+
+# The per-row path run_section used before date_extract.py
+def legacy_extract_year(text):
+    try:
+        return parser.parse(text, fuzzy=True).year
+    except:
+        return None
+
+
+def legacy_extract_date_snippet(text, future=True):
+    if not text:
+        return "—"
+    month_pat = re.compile(
+        r"(January|February|March|April|May|June|July|August|September|October|November|December)"
+        r"\s+\d{1,2},?\s*(20\d{2})", re.I
+    )
+    for m in month_pat.finditer(text):
+        year = int(m.group(2))
+        if year >= MIN_YEAR:
+            return m.group(0)
+    if future and re.search(r"rolling|ongoing|open until", text, re.I):
+        return "Rolling / Ongoing"
+    return "—"
+
+
+def legacy(text, future):
+    info = legacy_extract_date_snippet(text, future=future)
+    return info, legacy_extract_year(info)
+
+
+def check_fixtures(cases):
+    failures = 0
+    for case in cases:
+        got = date_extract.extract_date(case["text"], min_year=MIN_YEAR, future=case["future"])
+        if (got.label, got.year, got.kind) != (case["label"], case["year"], case["kind"]):
+            failures += 1
+            print(f"❌ {case['source']}: {case['text'][:60]!r} -> {got}")
+    print(f"fixtures: {len(cases) - failures}/{len(cases)} match")
+    return failures
+
+
+def timed(label, fn, n):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<26} {elapsed * 1000:8.1f} ms  {n / elapsed:12,.0f} snippets/s")
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    cases = json.loads(FIXTURES.read_text(encoding="utf-8"))
+    if check_fixtures(cases):
+        sys.exit(1)
+    maxsize = date_extract.extract_date.cache_info().maxsize
+    if repeat * len(cases) > maxsize:
+        # A working set past the memo size evicts everything before it's reused
+        repeat = maxsize // len(cases)
+        print(f"repeat capped at {repeat} to fit the {maxsize}-entry memo")
+    # Make each copy distinct so the memo cache doesn't hide the parsing cost
+    work = [(f"{c['text']} #{i}", c["future"]) for i in range(repeat) for c in cases]
+    n = len(work)
+    print(f"\n{n:,} snippets\n")
+    timed("legacy (regex + dateutil)", lambda: [legacy(t, f) for t, f in work], n)
+    date_extract.extract_date.cache_clear()
+    timed("extract_date (cold)", lambda: [date_extract.extract_date(t, MIN_YEAR, f) for t, f in work], n)
+    before = date_extract.extract_date.cache_info().hits
+    timed("extract_date (memoized)", lambda: [date_extract.extract_date(t, MIN_YEAR, f) for t, f in work], n)
+    hits = date_extract.extract_date.cache_info().hits - before
+    print(f"memo hit rate on the second pass: {hits / n:.0%}")
+    if hits < n:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
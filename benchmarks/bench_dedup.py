@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark - DedupIndex lookup cost as history grows (should stay flat) and load time (should stay linear)
+Exits 1 if loading 50k entries costs more than MAX_LOAD_GROWTH times as much per entry as loading 1k.
+Run: python benchmarks/bench_dedup.py
+"""
+
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from dedup_index import DedupIndex
+
+VOCAB = ("climate resilience grant community adaptation fund program deadline apply nonprofit "
+         "flood heat wildfire summit conference report sustainability esg energy water city "
+         "county state federal tribal coastal rural urban equity justice planning capacity").split()
+
+
+def synthetic_item(rng, i):
+    words = [rng.choice(VOCAB) for _ in range(rng.randint(15, 40))]
+    return f"https://site{rng.randint(1, 5000)}.org/item/{i}", " ".join(words[:6]).title(), " ".join(words[6:])
+
+
+def syndicated(rng, item):
+    """Same item on another site with light edits"""
+    url, title, snippet = item
+    words = snippet.split()
+    words[rng.randrange(len(words))] = rng.choice(VOCAB)
+    return f"https://mirror{rng.randint(1, 99)}.net/{rng.randint(1, 10 ** 6)}", title, " ".join(words)
+
+
+# Allowed growth of per-entry load time from the smallest to the largest history (noise headroom)
+MAX_LOAD_GROWTH = 2.5
+
+
+def timed_load_ms(path, repeat=3):
+    """Median of a few loads, with the history built so far still alive as in a run with other state in memory"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        DedupIndex(path)
+        times.append((time.perf_counter() - start) * 1000)
+    return sorted(times)[len(times) // 2]
+
+
+def main():
+    rng = random.Random(3)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "dedup.jsonl"
+        index = DedupIndex(path)
+        history = []
+        per_entry = {}
+        print(f"{'history':>8} {'check us/item':>14} {'dups caught':>12} {'fresh kept':>11} {'load ms':>8} "
+              f"{'load us/item':>13}")
+        for target in (1_000, 10_000, 50_000):
+            while len(history) < target:
+                item = synthetic_item(rng, len(history))
+                history.append(item)
+                index.add(*item)
+            index.save()
+            probes = [syndicated(rng, rng.choice(history)) for _ in range(500)]
+            fresh = [synthetic_item(rng, 10 ** 7 + i) for i in range(500)]
+            start = time.perf_counter()
+            caught = sum(index.find(*p) is not None for p in probes)
+            kept = sum(index.find(*f) is None for f in fresh)
+            per_item = (time.perf_counter() - start) / 1000 * 1e6
+            load_ms = timed_load_ms(path)
+            per_entry[target] = load_ms * 1000 / target
+            print(f"{target:>8,} {per_item:>14.1f} {caught:>8}/500 {kept:>7}/500 {load_ms:>8.0f} "
+                  f"{per_entry[target]:>13.1f}")
+    growth = per_entry[max(per_entry)] / per_entry[min(per_entry)]
+    ok = growth <= MAX_LOAD_GROWTH
+    print(f"\n{'✅' if ok else '❌'} load time per entry grew {growth:.1f}x from {min(per_entry):,} to "
+          f"{max(per_entry):,} entries (limit {MAX_LOAD_GROWTH}x)")
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
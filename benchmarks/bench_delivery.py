@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Delivery benchmark - pooled / batched SMTP sends against a local SMTP stand-in
+The stand-in adds a fixed connect+login cost and per-message cost, refuses "bounce*" (550)
+and defers "later*" (451) addresses, so the run also checks statuses and idempotent resends.
+
+Run: python benchmarks/bench_delivery.py [--recipients 200 --recipients 2000] [--connect-ms 40]
+"""
+
+import argparse
+import smtplib
+import socketserver
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from delivery import DeliveryLog, SMTPPool, build_message, deliver, with_recipient
+
+SENDER = "newsletter@example.org"
+
+
+class SMTPStandIn(socketserver.ThreadingTCPServer):
+    """Just enough SMTP for smtplib: EHLO, AUTH, MAIL, RCPT, DATA, RSET, NOOP, QUIT"""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, connect_delay, message_delay):
+        super().__init__(("127.0.0.1", 0), SMTPHandler)
+        self.connect_delay = connect_delay
+        self.message_delay = message_delay
+        self.lock = threading.Lock()
+        self.sessions = self.messages = self.deliveries = 0
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        srv = self.server
+        with srv.lock:
+            srv.sessions += 1
+        time.sleep(srv.connect_delay / 2)  # TCP + TLS handshake
+        self.reply("220 stand-in ESMTP")
+        rcpts = []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            cmd = line.decode(errors="replace").strip()
+            verb = cmd.split(" ", 1)[0].upper()
+            if verb == "EHLO":
+                self.wfile.write(b"250-stand-in\r\n250-AUTH PLAIN\r\n250 SIZE 10485760\r\n")
+            elif verb == "AUTH":
+                time.sleep(srv.connect_delay / 2)
+                self.reply("235 ok")
+            elif verb in ("MAIL", "RSET"):
+                rcpts = []
+                self.reply("250 ok")
+            elif verb == "RCPT":
+                addr = cmd.split(":", 1)[1].strip(" <>")
+                if addr.startswith("bounce"):
+                    self.reply("550 no such user")
+                elif addr.startswith("later"):
+                    self.reply("451 try again later")
+                else:
+                    rcpts.append(addr)
+                    self.reply("250 ok")
+            elif verb == "DATA":
+                self.reply("354 go ahead")
+                while self.rfile.readline() not in (b".\r\n", b""):
+                    pass
+                time.sleep(srv.message_delay)
+                with srv.lock:
+                    srv.messages += 1
+                    srv.deliveries += len(rcpts)
+                self.reply("250 queued")
+            elif verb == "QUIT":
+                self.reply("221 bye")
+                return
+            else:
+                self.reply("250 ok")
+
+
+def naive_send(port, body, recipients):
+    """What a per-recipient send looks like without pooling: connect + login for every message"""
+    for r in recipients:
+        with smtplib.SMTP("127.0.0.1", port) as server:
+            server.login("user", "pw")
+            try:
+                server.sendmail(SENDER, [r], with_recipient(body, r))
+            except smtplib.SMTPRecipientsRefused:
+                pass
+
+
+def recipients_for(n):
+    people = [f"reader{i}@example.com" for i in range(n)]
+    people[1::50] = [f"bounce{i}@example.com" for i in range(len(people[1::50]))]
+    people[2::50] = [f"later{i}@example.com" for i in range(len(people[2::50]))]
+    return people
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Pooled / batched SMTP delivery against a local stand-in")
+    ap.add_argument("--recipients", type=int, action="append", help="list sizes (repeatable), default 200 and 2000")
+    ap.add_argument("--connect-ms", type=float, default=40.0, help="stand-in handshake + login cost")
+    ap.add_argument("--message-ms", type=float, default=2.0, help="stand-in cost per DATA")
+    ap.add_argument("--workers", type=int, default=4)
+    ap.add_argument("--batch", type=int, default=50, help="BCC batch size")
+    args = ap.parse_args()
+
+    server = SMTPStandIn(args.connect_ms / 1000, args.message_ms / 1000)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+    body = build_message("Benchmark issue", SENDER, "<p>" + "Climate news. " * 2000 + "</p>")
+
+    print(f"{'recipients':>10} {'mode':<26} {'seconds':>8} {'msgs/s':>8} {'connects':>9} "
+          f"{'sent':>6} {'failed':>7} {'rejected':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.recipients or [200, 2000]:
+            people = recipients_for(n)
+            if n <= 500:
+                server.sessions = 0
+                start = time.perf_counter()
+                naive_send(port, body, people)
+                elapsed = time.perf_counter() - start
+                print(f"{n:>10} {'connect per message':<26} {elapsed:>8.2f} {n / elapsed:>8.0f} "
+                      f"{server.sessions:>9} {'':>6} {'':>7} {'':>9}")
+            else:
+                print(f"{n:>10} {'connect per message':<26} {'skipped (too slow)':>18}")
+
+            for mode, batch in (("pooled, per recipient", 1), (f"pooled, BCC x{args.batch}", args.batch)):
+                log = DeliveryLog(Path(tmp) / f"log-{n}-{batch}.jsonl")
+                pool = SMTPPool("127.0.0.1", port, "user", "pw", size=args.workers, starttls=False)
+                start = time.perf_counter()
+                counts = deliver(pool, log, "2026-02-02", SENDER, body, people,
+                                 batch_size=batch, workers=args.workers)
+                elapsed = time.perf_counter() - start
+                print(f"{n:>10} {mode:<26} {elapsed:>8.2f} {n / elapsed:>8.0f} {pool.connects:>9} "
+                      f"{counts['sent']:>6} {counts['failed']:>7} {counts['rejected']:>9}")
+
+                # Resend the same issue: only the deferred (451) recipients go out again
+                again = deliver(pool, DeliveryLog(log.path), "2026-02-02", SENDER, body, people,
+                                batch_size=batch, workers=args.workers)
+                pool.close()
+                expected = counts["failed"]
+                check = "✅" if again["sent"] == 0 and again["failed"] == expected else "❌"
+                print(f"{'':>10} {'  resend same issue':<26} {check} {again['skipped']} skipped, "
+                      f"{again['failed']} retried")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
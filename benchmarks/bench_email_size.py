@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Email size benchmark - bytes of the rendered issue before and after the size-budget pass, at growing card counts
+For each size it reports raw HTML, minified, minified + shared styles, the text part and the encoded message,
+then checks that optimizing keeps the visible text, the budget holds, the best cards survive trimming and
+the text part links every shown card. A week whose strong cards were found after its weak ones must still
+keep the strong ones when trimming. Exits 1 if a check fails.
+
+Run: python benchmarks/bench_email_size.py [--cards 5 --cards 40] [--budget 95000]
+"""
+
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from delivery import build_message
+from email_budget import minify, optimize, render_email, size
+from email_template import generate_email_html
+
+TOPICS = ["Climate Resilience Grant", "Community Adaptation Fund", "Sustainability Summit",
+          "Net Zero Conference", "ESG Report 2025", "Wildfire Recovery Funding", "Climate Week"]
+ORGS = ["climatefund.org", "city.gov", "resilience.net", "greenfoundation.org", "esgreports.com"]
+TAGS = re.compile(r"<style>.*?</style>|<!--.*?-->|<[^>]+>", re.S)
+
+
+def fixtures(n, seed=0):
+    rng = random.Random(seed)
+    sections = {}
+    for section in ("grants", "events", "csr"):
+        sections[section] = [{
+            "Title": f"{rng.choice(TOPICS)} {rng.randint(1, 999)}",
+            "URL": f"https://{rng.choice(ORGS)}/{section}/{i}?utm_source=search&id={rng.randint(1, 10 ** 6)}",
+            "Domain": rng.choice(ORGS),
+            "Date Info": f"Deadline: {rng.choice(['March', 'June', 'October'])} {rng.randint(1, 28)}, 2026",
+            "Description": "Applications for this climate resilience programme are open to community "
+                           "organizations working on adaptation, sustainability and net zero transitions. " * 2,
+            "Score": round(n - i + rng.random(), 2),
+        } for i in range(n)]
+    sections["experts"] = [{"Name": f"Expert Person {i}", "Role": "Head of Sustainability at Green NGO",
+                            "LinkedIn": f"https://www.linkedin.com/in/expert-{i}"} for i in range(n)]
+    return sections
+
+
+def two_days(n=40):
+    """A week as WeeklyStore returns it: n weak cards found on day 1 ahead of n strong ones from day 2"""
+    s = fixtures(2 * n, seed=1)
+    for name in ("grants", "events", "csr"):
+        for i, row in enumerate(s[name]):
+            row["Score"] = 3.0 if i < n else 12.0
+    return s
+
+
+def visible_text(html):
+    return " ".join(TAGS.sub(" ", html).split())
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Rendered email size before and after the size-budget pass")
+    ap.add_argument("--cards", type=int, action="append", help="cards per section (repeatable)")
+    ap.add_argument("--budget", type=int, default=95_000, help="HTML byte budget")
+    args = ap.parse_args()
+    failures = []
+
+    def check(ok, message):
+        print(f"{'✅' if ok else '❌'} {message}")
+        if not ok:
+            failures.append(message)
+
+    print(f"{'cards':>5} {'raw KB':>8} {'minified':>9} {'+styles':>8} {'saved':>6} {'text KB':>8} "
+          f"{'message KB':>11} {'shown':>6} {'ms':>6}")
+    for n in args.cards or [5, 20, 40, 80]:
+        s = fixtures(n)
+        raw = generate_email_html(s["experts"], s["grants"], s["events"], s["csr"], max_cards=n)
+        start = time.perf_counter()
+        email = render_email(s["experts"], s["grants"], s["events"], s["csr"], max_bytes=args.budget)
+        ms = (time.perf_counter() - start) * 1000
+        message = build_message("Benchmark issue", "bench@example.com", email.html, email.text)
+        print(f"{n:>5} {size(raw) / 1024:>8.1f} {size(minify(raw)) / 1024:>9.1f} {size(optimize(raw)) / 1024:>8.1f} "
+              f"{100 * (1 - size(optimize(raw)) / size(raw)):>5.0f}% {email.text_bytes / 1024:>8.1f} "
+              f"{len(message) / 1024:>11.1f} {sum(email.shown.values()):>6} {ms:>6.1f}")
+
+        check(visible_text(optimize(raw)) == visible_text(raw) == visible_text(optimize(raw, shared_styles=False)),
+              f"{n} cards: optimizing keeps every visible word")
+        check(email.html_bytes <= args.budget,
+              f"{n} cards: {email.html_bytes / 1024:.1f} KB within the {args.budget / 1024:.0f} KB budget")
+        # Trimming drops cards from the bottom of each section, never a better-ranked one
+        kept = all(email.html.count(row["URL"].replace("&", "&amp;")) == (i < email.shown[name]) * 2
+                   for name in ("grants", "events", "csr") for i, row in enumerate(s[name]))
+        check(kept, f"{n} cards: kept the top {email.shown} cards per section")
+        check(all(row["URL"] in email.text for name in ("grants", "events", "csr")
+                  for row in s[name][:email.shown[name]]), f"{n} cards: text part links every shown card")
+
+    # Rows come out of the weekly store in first-seen order, so a strong day 2 follows a weak day 1
+    s = two_days()
+    email = render_email(s["experts"], s["grants"], s["events"], s["csr"], max_bytes=60_000)
+    for name in ("grants", "events", "csr"):
+        shown = [row["Score"] for row in s[name] if row["URL"].replace("&", "&amp;") in email.html]
+        check(len(shown) == email.shown[name] and (3.0 not in shown or shown.count(12.0) == 40),
+              f"day 1 at 3.0 + day 2 at 12.0, 60 KB: {name} shows {shown.count(12.0)} strong, "
+              f"{shown.count(3.0)} weak of {email.shown[name]}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Enrichment benchmark - PageFetcher against local http.server hosts
+Each host serves synthetic landing pages (JSON-LD dates, ETags, some multi-MB pages and PDFs) with fixed
+latency and tracks how many requests it handles at once, so the run checks the per-host limit, the size cap
+and 304 revalidation alongside the timings. Exits 1 if enrich_row keeps or drops a dating case wrongly.
+
+Run: python benchmarks/bench_enrichment.py [--pages 120] [--hosts 4] [--latency-ms 50]
+"""
+
+import argparse
+import hashlib
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from enrichment import PageFetcher, enrich_row
+
+PAGE = """<!doctype html><html><head><title>Climate Resilience Grant {i}</title>
+<meta property="og:site_name" content="Green Fund {host}">
+<meta name="description" content="Funding for community adaptation projects.">
+<script>{js}</script>
+<script type="application/ld+json">{{"@context": "https://schema.org", "@type": "Grant",
+ "funder": {{"@type": "Organization", "name": "Green Fund {host}"}}, "applicationDeadline": "{deadline}"}}</script>
+</head><body><nav>{nav}</nav><main><h1>Climate Resilience Grant {i}</h1>
+<p>Applications are due {month} 15, {year}. Community organizations can apply.</p>{filler}</main>
+<footer>© 2019 Green Fund</footer></body></html>"""
+
+
+class Host(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, latency):
+        super().__init__(("127.0.0.1", 0), PageHandler)
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.in_flight = self.max_in_flight = 0
+        self.requests = self.not_modified = 0
+
+    def handle_error(self, request, client_address):
+        pass  # the fetcher hangs up on pages past its size cap
+
+
+class PageHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def body_for(self, i):
+        if i % 10 == 9:
+            return b"%PDF-1.7\n" + b"0" * 200_000, "application/pdf"
+        big = i % 10 == 7
+        page = PAGE.format(i=i, host=self.server.server_address[1], js="var x = 1;" * 2000,
+                           nav="<a href='#'>Menu</a>" * 200,
+                           deadline="2023-01-31" if i % 10 == 3 else f"2026-{i % 12 + 1:02d}-28",
+                           month="March", year=2023 if i % 10 == 3 else 2026,
+                           filler="<p>Background on the programme.</p>" * (60_000 if big else 40))
+        return page.encode(), "text/html; charset=utf-8"
+
+    def do_GET(self):
+        srv = self.server
+        with srv.lock:
+            srv.in_flight += 1
+            srv.max_in_flight = max(srv.max_in_flight, srv.in_flight)
+            srv.requests += 1
+        try:
+            time.sleep(srv.latency)
+            i = int(self.path.rsplit("/", 1)[1])
+            body, content_type = self.body_for(i)
+            etag = '"' + hashlib.md5(body).hexdigest()[:12] + '"'
+            if self.headers.get("If-None-Match") == etag:
+                with srv.lock:
+                    srv.not_modified += 1
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("ETag", etag)
+            self.end_headers()
+            try:
+                self.wfile.write(body)
+            except (BrokenPipeError, ConnectionResetError):
+                self.close_connection = True
+        finally:
+            with srv.lock:
+                srv.in_flight -= 1
+
+
+def naive(urls):
+    """Serial full downloads and full-document parses, the obvious first version; returns bytes read"""
+    import requests
+    from bs4 import BeautifulSoup
+    read = 0
+    for url in urls:
+        resp = requests.get(url, timeout=30)
+        read += len(resp.content)
+        if resp.headers.get("Content-Type", "").startswith("text/html"):
+            BeautifulSoup(resp.text, "lxml").get_text(" ")
+    return read
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Landing-page enrichment against local HTTP hosts")
+    ap.add_argument("--pages", type=int, default=120)
+    ap.add_argument("--hosts", type=int, default=4)
+    ap.add_argument("--latency-ms", type=float, default=50.0)
+    ap.add_argument("--per-host", type=int, default=2)
+    ap.add_argument("--workers", type=int, default=8)
+    args = ap.parse_args()
+
+    hosts = [Host(args.latency_ms / 1000) for _ in range(args.hosts)]
+    for host in hosts:
+        threading.Thread(target=host.serve_forever, daemon=True).start()
+    urls = [f"http://127.0.0.1:{hosts[i % len(hosts)].server_address[1]}/page/{i}" for i in range(args.pages)]
+
+    def reset():
+        for h in hosts:
+            h.max_in_flight = h.requests = h.not_modified = 0
+
+    print(f"{'run':<30} {'seconds':>8} {'pages/s':>8} {'requests':>9} {'304s':>6} {'MB read':>8} {'max/host':>9}")
+
+    def report(name, elapsed, read):
+        print(f"{name:<30} {elapsed:>8.2f} {args.pages / elapsed:>8.0f} {sum(h.requests for h in hosts):>9} "
+              f"{sum(h.not_modified for h in hosts):>6} {read / 2 ** 20:>8.1f} "
+              f"{max(h.max_in_flight for h in hosts):>9}")
+
+    reset()
+    start = time.perf_counter()
+    read = naive(urls)
+    report("naive (serial, full body)", time.perf_counter() - start, read)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = Path(tmp) / "pages.sqlite"
+        for name, fresh_hours in (("PageFetcher cold", 20), ("PageFetcher fresh cache", 20),
+                                  ("PageFetcher revalidate (304)", 0)):
+            reset()
+            fetcher = PageFetcher(cache, workers=args.workers, per_host=args.per_host, fresh_hours=fresh_hours)
+            start = time.perf_counter()
+            pages = fetcher.fetch_many(urls)
+            report(name, time.perf_counter() - start, fetcher.stats["bytes"])
+            fetcher.close()
+
+    rows = [{"Title": f"Grant {i}", "Organization": "127.0.0.1", "Description": "", "Date Info": "—", "URL": u}
+            for i, u in enumerate(urls)]
+    enriched = [enrich_row(row, pages[row["URL"]]) for row in rows]
+    kept = [r for r in enriched if r]
+    dated = sum(r["Date Info"] != "—" for r in kept)
+    limit_ok = "✅" if max(h.max_in_flight for h in hosts) <= args.per_host else "❌"
+    print(f"\n{limit_ok} per-host limit {args.per_host}; rows: {len(kept)}/{len(rows)} kept "
+          f"({len(rows) - len(kept)} dated pre-2025 by their page), {dated} with a date "
+          f"(snippet-only: 0), orgs e.g. {kept[0]['Organization']!r}")
+    for host in hosts:
+        host.shutdown()
+
+    # A CMS's old WebPage.datePublished mustn't drop a live rolling grant
+    rolling = enrich_row({"Title": "Rolling grant", "Date Info": "—"}, {
+        "dates": [], "published": "2021-03-04T10:00:00+00:00",
+        "text": "Applications are accepted on a rolling basis. Apply now for 2026 funding."})
+    print(f"{'✅' if rolling else '❌'} rolling grant on a page published in 2021: "
+          f"{rolling['Date Info'] if rolling else 'dropped'}")
+    # A two-digit-year publication date is past the patterns; the dateutil fallback still dates the report
+    report = enrich_row({"Title": "Annual report", "Date Info": "—"},
+                        {"dates": [], "published": "04/03/21", "text": "Our annual impact report."}, future=False)
+    print(f"{'✅' if report is None else '❌'} report published 04/03/21: {'dropped' if report is None else 'kept'}")
+    if not rolling or report is not None:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
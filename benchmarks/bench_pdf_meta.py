@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+PDF metadata benchmark - PdfMetaReader (Range requests) vs downloading whole reports
+Serves generated 20-50 MB PDFs from a local http.server with Range support and a bandwidth cap. Checks
+the extracted title / year / company, the MIN_YEAR decision, that cached or mirrored reports cost at
+most one small request, and that a report replaced under the same URL is picked up once the URL's TTL passes.
+
+Run: python benchmarks/bench_pdf_meta.py [--mbps 200]
+"""
+
+import argparse
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from enrichment import enrich_row
+from pdf_meta import PdfMetaReader, Spool, as_page, extract
+
+MB = 1024 * 1024
+# name, size MB, title, created, company, where the Info dictionary sits
+REPORTS = [
+    ("acme-2025", 20, "Acme Corp 2025 Sustainability Report", "20250312", "Acme Corp", "end"),
+    ("globex-2024", 30, "Globex Impact Report 2024", "20250401", "Globex Inc.", "middle"),
+    ("initech-2023", 40, "Initech ESG Report 2023", "20230615", "Initech", "end"),
+    ("umbrella-2025", 50, "Umbrella Climate Disclosure", "20250120", "Umbrella plc", "middle"),
+]
+
+
+def make_pdf(title, created, company, size, info_at, pad):
+    """A small valid PDF padded to size with an image stream; Info either last or mid-file"""
+    content = zlib.compress(b"BT /F1 24 Tf 72 700 Td (" + title.encode() + b") Tj ET")
+    info = (b"<< /Title (" + title.encode() + b") /Author (Reporting Team) /Company (" + company.encode()
+            + b") /CreationDate (D:" + created.encode() + b"120000Z) /Producer (bench) >>")
+    pad_len = size * MB
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /Contents 4 0 R /MediaBox [0 0 612 792] >>",
+        b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(content) + content + b"\nendstream",
+    ]
+    halves = [pad_len // 2, pad_len - pad_len // 2] if info_at == "middle" else [pad_len]
+    for i, n in enumerate(halves):
+        objects.append(b"<< /Subtype /Image /Length %d >>\nstream\n" % n + pad[i * (pad_len // 2):][:n]
+                       + b"\nendstream")
+        if info_at == "middle" and i == 0:
+            objects.append(info)
+    if info_at != "middle":
+        objects.append(info)
+    info_num = objects.index(info) + 1
+
+    out = bytearray(b"%PDF-1.7\n%\xe2\xe3\xcf\xd3\n")
+    offsets = []
+    for num, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % num + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % o for o in offsets)
+    out += (b"trailer\n<< /Size %d /Root 1 0 R /Info %d 0 R >>\nstartxref\n%d\n%%%%EOF\n"
+            % (len(objects) + 1, info_num, xref))
+    return bytes(out)
+
+
+class ReportServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, files, bytes_per_second):
+        super().__init__(("127.0.0.1", 0), RangeHandler)
+        self.files = files
+        self.rate = bytes_per_second
+        self.lock = threading.Lock()
+        self.sent = self.requests = 0
+
+    def handle_error(self, request, client_address):
+        pass
+
+
+class RangeHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        srv = self.server
+        name = self.path.strip("/").split("/")[-1]
+        data = srv.files.get(name.removesuffix(".pdf"))
+        if data is None:
+            self.send_error(404)
+            return
+        start, end, status = 0, len(data) - 1, 200
+        m = re.match(r"bytes=(\d*)-(\d*)$", self.headers.get("Range", ""))
+        if m and not self.path.startswith("/norange/"):
+            if m.group(1):
+                start, end = int(m.group(1)), min(int(m.group(2) or end), end)
+            else:
+                start = max(0, len(data) - int(m.group(2)))
+            status = 206
+        self.send_response(status)
+        self.send_header("Content-Type", "application/pdf")
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Content-Length", str(end - start + 1))
+        if status == 206:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(data)}")
+        self.end_headers()
+        with srv.lock:
+            srv.requests += 1
+        try:
+            for pos in range(start, end + 1, 256 * 1024):
+                chunk = data[pos:min(pos + 256 * 1024, end + 1)]
+                self.wfile.write(chunk)
+                with srv.lock:
+                    srv.sent += len(chunk)
+                time.sleep(len(chunk) / srv.rate)
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+
+
+def naive(urls):
+    """Download every report in full, then read the same metadata from it"""
+    import requests
+    metas = {}
+    for url in urls:
+        data = requests.get(url, timeout=120).content
+        spool = Spool(len(data))
+        spool.write(0, data)
+        metas[url] = extract(spool)
+        spool.close()
+    return metas
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Range-request PDF metadata vs full downloads")
+    ap.add_argument("--mbps", type=float, default=200.0, help="server bandwidth cap in Mbit/s")
+    args = ap.parse_args()
+
+    pad = os.urandom(max(r[1] for r in REPORTS) * MB)
+    files = {name: make_pdf(title, created, company, size, info_at, pad)
+             for name, size, title, created, company, info_at in REPORTS}
+    server = ReportServer(files, args.mbps * 1e6 / 8)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    urls = [f"{base}/reports/{name}.pdf" for name in files]
+    total_mb = sum(map(len, files.values())) / MB
+
+    print(f"{len(files)} reports, {total_mb:.0f} MB total, server capped at {args.mbps:.0f} Mbit/s\n")
+    print(f"{'run':<28} {'seconds':>8} {'requests':>9} {'MB read':>8}")
+
+    def run(name, fn):
+        server.sent = server.requests = 0
+        start = time.perf_counter()
+        result = fn()
+        print(f"{name:<28} {time.perf_counter() - start:>8.2f} {server.requests:>9} {server.sent / MB:>8.2f}")
+        return result
+
+    full = run("download whole files", lambda: naive(urls))
+    with tempfile.TemporaryDirectory() as tmp:
+        reader = PdfMetaReader(Path(tmp) / "reports.sqlite")
+        metas = run("range requests, cold", lambda: reader.read_many(urls))
+        run("range requests, cached", lambda: reader.read_many(urls))
+        mirrors = [u.replace("/reports/", "/mirror/") for u in urls]
+        run("same reports, other URLs", lambda: reader.read_many(mirrors))
+        # Next year's report published under last year's URL
+        original, files["initech-2023"] = files["initech-2023"], make_pdf("Initech ESG Report 2025", "20250615", "Initech",
+                                         REPORTS[2][1], REPORTS[2][5], pad[::-1])
+        initech = next(u for u in urls if "initech" in u)
+        stale = run("replaced, within URL TTL", lambda: reader.read(initech))
+        reader.url_ttl = 0
+        fresh = run("replaced, after URL TTL", lambda: reader.read(initech))
+        run("unchanged, after URL TTL", lambda: reader.read_many([u for u in urls if u != initech]))
+        files["initech-2023"] = original
+        print(f"{'':<28} stats: {reader.stats}")
+        print(f"{'':<28} replaced report: {stale['year']} within the TTL, {fresh['year']} after it "
+              f"{'✅' if (stale['year'], fresh['year']) == (2023, 2025) else '❌'}")
+        no_range = PdfMetaReader()
+        capped = run("server without Range", lambda: no_range.read_many([f"{base}/norange/{n}.pdf" for n in files]))
+        reader.close()
+
+    print(f"\n{'report':<16} {'title':<38} {'year':>5} {'company':<14} {'kept (MIN_YEAR 2025)':<20}")
+    for url, meta in metas.items():
+        same = "✅" if {k: meta[k] for k in full[url]} == full[url] else "❌ differs from full read"
+        row = enrich_row({"Title": "", "Date Info": "—", "URL": url}, as_page(meta), future=False)
+        print(f"{url.rsplit('/', 1)[1][:-4]:<16} {meta['title']:<38} {meta['year'] or '':>5} "
+              f"{meta['company'] or '':<14} {('yes, ' + row['Date Info']) if row else 'no':<20} {same}")
+    print(f"\nwithout Range support (first {len(next(iter(capped.values()))['text'])} chars of cover text only): "
+          f"years {[m['year'] for m in capped.values()]}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
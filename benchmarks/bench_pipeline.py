@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmark suite - per-stage throughput of the newsletter pipeline at scaled-up sizes
+Generates synthetic fixtures, replays them through ReplayBackend and times search, run_section,
+run_experts, write_csv and generate_email_html. Also checks that stopping a section early only counts
+candidates run_section would accept (exit 1 if not).
+
+Run: python benchmarks/bench_pipeline.py --scale 10 --scale 100
+     python benchmarks/bench_pipeline.py --scale 10 --save baseline.json
+     python benchmarks/bench_pipeline.py --scale 10 --baseline baseline.json   (exit 1 on regression)
+"""
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import automated_newsletter as nl
+from email_template import generate_email_html
+from search_backends import RecordingBackend, ReplayBackend, SearchBackend
+
+ORGS = ["climatefund.org", "city.gov", "resilience.net", "greenfoundation.org", "esgreports.com",
+        "adaptation.eu", "sustainability.edu", "en.wikipedia.org", "netzero.co", "floodready.org"]
+TOPICS = ["Climate Resilience Grant", "Community Adaptation Fund", "Sustainability Summit",
+          "Net Zero Conference", "ESG Report 2025", "Wildfire Recovery Funding", "Climate Week"]
+PEOPLE = ["Ana Silva", "Tom Becker", "Priya Nair", "Kwame Mensah", "Lena Fischer", "Jo Park"]
+ROLES = ["Executive Director", "Head of Sustainability", "Climate Program Lead"]
+
+
+class SyntheticBackend(SearchBackend):
+    """Deterministic fake results, only used to record fixtures for ReplayBackend"""
+
+    name = "synthetic"
+
+    def search(self, query, num):
+        rng = random.Random(query)
+        if "linkedin" in query.lower():
+            return [{
+                "title": f"{rng.choice(PEOPLE)} {i} – {rng.choice(ROLES)} – Green NGO | LinkedIn",
+                "link": f"https://www.linkedin.com/in/{rng.randint(1, 10 ** 8)}",
+                "snippet": f"Climate leader at Green NGO {i}. Working on resilience.",
+            } for i in range(num)]
+        return [{
+            "title": f"{rng.choice(TOPICS)} {rng.randint(1, 999)}",
+            "link": f"https://{rng.randint(1, 10 ** 6)}.{rng.choice(ORGS)}/item/{i}",
+            "snippet": (f"Applications for this climate resilience programme are due "
+                        f"{rng.choice(['March', 'June', 'October'])} {rng.randint(1, 28)}, 2026. "
+                        "Community organizations working on sustainability can apply."),
+        } for i in range(num)]
+
+
+def scaled(keywords, scale):
+    return [kw if i == 0 else f"{kw} {i}" for i in range(scale) for kw in keywords]
+
+
+def stage(report, name, items, fn):
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    report[name] = {"seconds": round(elapsed, 4), "items": items,
+                    "per_second": round(items / elapsed, 1) if elapsed else None}
+    return result
+
+
+def run_scale(scale, workdir, latency):
+    sections = {"grants": scaled(nl.GRANT_KEYWORDS, scale), "events": scaled(nl.EVENT_KEYWORDS, scale),
+                "csr": scaled(nl.CSR_KEYWORDS, scale)}
+    experts = scaled(nl.EXPERT_QUERIES, scale)
+
+    fixtures = workdir / f"fixtures-{scale}"
+    recorder = RecordingBackend(SyntheticBackend(), fixtures)
+    for keywords in sections.values():
+        for kw in keywords:
+            recorder.search(kw, 8)
+    for q in experts:
+        recorder.search(q, 12)
+
+    nl.set_backend(ReplayBackend(fixtures, latency=latency))
+    nl.CACHE_PATH = workdir / f"cache-{scale}.sqlite"
+    nl._cache = None
+    nl.OUTPUT_FOLDER = workdir / f"out-{scale}"
+    nl.OUTPUT_FOLDER.mkdir(exist_ok=True)
+
+    report = {}
+    n_queries = sum(map(len, sections.values())) + len(experts)
+    results = stage(report, "search", n_queries, lambda: nl.prefetch(sections, experts))
+    n_candidates = sum(len(v[:nl.MAX_RESULTS_PER_KEYWORD]) for k, v in results.items() if k[1] == 8)
+    rows = stage(report, "run_section", n_candidates, lambda: {
+        name: nl.run_section(kws, future=(name != "csr"), results=results) for name, kws in sections.items()})
+    experts_rows = stage(report, "run_experts", sum(len(results[(q, 12)]) for q in experts),
+                         lambda: nl.run_experts(experts, results=results))
+    n_rows = sum(map(len, rows.values())) + len(experts_rows)
+    stage(report, "write_csv", n_rows, lambda: [
+        nl.write_csv(f"{name}.csv", data) for name, data in [*rows.items(), ("experts", experts_rows)]])
+    stage(report, "render", n_rows, lambda: generate_email_html(
+        experts_rows, rows["grants"], rows["events"], rows["csr"], max_cards=n_rows))
+    return report
+
+
+def early_stop_check():
+    """One grant returned by three keywords (plain and utm_ variants) plus a strong but stale one is one
+    acceptable row, not four: has_enough must agree with what run_section keeps"""
+    from query_budget import YieldStats
+    grant = {"title": "Climate Resilience Grant for community adaptation",
+             "snippet": "Applications due June 15, 2026. Community organizations working on climate "
+                        "resilience can apply.", "link": "https://climatefund.org/grants/resilience"}
+    stale = {"title": "Climate Resilience Grant 2021", "link": "https://city.gov/grant-2021",
+             "snippet": "Applications due March 1, 2021 for climate adaptation funding."}
+    keywords = ["climate grant", "resilience funding", "adaptation grant"]
+    results = {(kw, 8): [dict(grant, link=grant["link"] + suffix), stale]
+               for kw, suffix in zip(keywords, ["", "?utm_source=search", "?utm_campaign=weekly&utm_medium=x"])}
+    jobs = {(kw, 8): ("grants", nl.DEFAULT_CACHE_TTL_HOURS) for kw in keywords}
+    enough, nl.ENOUGH_STRONG_ROWS = nl.ENOUGH_STRONG_ROWS, 2
+    try:
+        stopped = nl.has_enough("grants", jobs, results, YieldStats())
+        rows = nl.run_section(keywords, results=results, section="grants")
+    finally:
+        nl.ENOUGH_STRONG_ROWS = enough
+    ok = not stopped and len(rows) == 1
+    print(f"{'✅' if ok else '❌'} early stop: a grant repeated across {len(keywords)} keywords plus a stale one "
+          f"-> has_enough {stopped}, run_section kept {len(rows)} row(s)")
+    return ok
+
+
+def compare(report, baseline, tolerance):
+    regressions = []
+    for scale, stages in report.items():
+        for name, now in stages.items():
+            before = baseline.get(scale, {}).get(name)
+            if before and before["per_second"] and now["per_second"] < before["per_second"] * (1 - tolerance):
+                regressions.append(f"{name} @ {scale}x: {now['per_second']:,.0f}/s "
+                                   f"(baseline {before['per_second']:,.0f}/s)")
+    return regressions
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Per-stage pipeline throughput at scaled-up sizes")
+    ap.add_argument("--scale", type=int, action="append", help="keyword multiplier (repeatable), default 10 and 100")
+    ap.add_argument("--latency", type=float, default=0.0, help="replayed seconds per search call")
+    ap.add_argument("--save", help="write the report to this JSON file")
+    ap.add_argument("--baseline", help="compare against a saved report; exit 1 on regression")
+    ap.add_argument("--tolerance", type=float, default=0.3, help="allowed throughput drop vs baseline")
+    args = ap.parse_args()
+
+    nl.POLITE_DELAY = nl.POLITE_JITTER = 0.0
+    nl.DAILY_QUERY_LIMIT = 10 ** 9
+    nl.MAX_ROWS_PER_SECTION = nl.MAX_EXPERTS = 10 ** 9
+
+    report = {}
+    with tempfile.TemporaryDirectory() as tmp, open(Path(tmp) / "pipeline.log", "w") as quiet:
+        nl.STATE_PATH = Path(tmp) / "state.json"
+        for scale in args.scale or [10, 100]:
+            stdout, sys.stdout = sys.stdout, quiet
+            try:
+                report[f"{scale}"] = run_scale(scale, Path(tmp), args.latency)
+            finally:
+                sys.stdout = stdout
+
+    print(f"{'scale':>6} {'stage':<12} {'items':>8} {'seconds':>9} {'items/s':>12}")
+    for scale, stages in report.items():
+        for name, r in stages.items():
+            print(f"{scale + 'x':>6} {name:<12} {r['items']:>8,} {r['seconds']:>9.3f} {r['per_second'] or 0:>12,.0f}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        nl.STATE_PATH = Path(tmp) / "state.json"
+        nl._state = None
+        checks_ok = early_stop_check()
+
+    if args.save:
+        Path(args.save).write_text(json.dumps(report, indent=2))
+    if args.baseline:
+        regressions = compare(report, json.loads(Path(args.baseline).read_text()), args.tolerance)
+        for line in regressions:
+            print(f"❌ regression: {line}")
+        if regressions:
+            sys.exit(1)
+    if not checks_ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark - old looks_relevant substring loop vs relevance.score
+Run: python benchmarks/bench_relevance.py [num_candidates]
+"""
+
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import relevance
+
+# The filter run_section used before relevance.py
+CLIMATE_TERMS = [
+    "climate", "resilien", "adapt", "sustain", "environment", "decarbon",
+    "net zero", "renewable", "flood", "heat", "wildfire", "community", "justice"
+]
+
+
+def legacy_looks_relevant(title, snippet, url):
+    blob = f"{title} {snippet} {url}".lower()
+    return any(t in blob for t in CLIMATE_TERMS)
+
+
+def naive_weighted_score(title, snippet, url):
+    """The same weighted score done the legacy way: one substring scan per term"""
+    blob = f"{title} {snippet} {url}".lower()
+    return sum(w for t, w in relevance.WEIGHTS.items() if t in blob) + relevance.domain_penalty(url)
+
+
+WORDS = ("the program supports local organizations across the region with technical assistance "
+         "and capacity building for partners in rural and urban areas over several years").split()
+TOPICAL = ["climate", "resilience", "grant", "wildfire", "sustainability", "book", "born", "deadline"]
+DOMAINS = ["example.org", "en.wikipedia.org", "city.gov", "foundation.org", "goodreads.com"]
+
+
+def synthetic_candidates(n, seed=7):
+    rng = random.Random(seed)
+    out = []
+    for i in range(n):
+        words = [rng.choice(WORDS) for _ in range(rng.randint(20, 120))]
+        for _ in range(rng.randint(0, 3)):
+            words.insert(rng.randrange(len(words)), rng.choice(TOPICAL))
+        title = " ".join(words[:8]).title()
+        out.append((title, " ".join(words[8:]), f"https://{rng.choice(DOMAINS)}/page/{i}"))
+    return out
+
+
+def timed(label, fn, n):
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed * 1000:8.1f} ms  {n / elapsed:12,.0f} items/s")
+    return result
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    candidates = synthetic_candidates(n)
+    print(f"{n:,} synthetic candidates, avg {sum(len(s) for _, s, _ in candidates) // n} chars\n")
+    legacy = timed("legacy looks_relevant", lambda: [legacy_looks_relevant(*c) for c in candidates], n)
+    timed("naive weighted (per term)", lambda: [naive_weighted_score(*c) for c in candidates], n)
+    scores = timed("relevance.score", lambda: [relevance.score(*c) for c in candidates], n)
+    kept = sum(s >= relevance.MIN_RELEVANCE_SCORE for s in scores)
+    print(f"\nlegacy keeps {sum(legacy):,}; scorer keeps {kept:,} (and ranks them)")
+
+
+if __name__ == "__main__":
+    main()
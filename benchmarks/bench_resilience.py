@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Fault-injection benchmark - the resilient search layer against a fake backend that throttles, stalls and goes down
+Every scenario runs the same queries through web_search twice: once with a single plain attempt (the old
+behaviour) and once through ResilientSearch. It reports answered queries and latency, and checks the
+layer's guarantees: throttled queries are retried, slow tails are hedged, fatal errors aren't retried,
+and an outage trips the breaker and serves the cache. A run the size of the default edition, too short to
+reach min_samples on its own, must hedge once seeded with an earlier run's latencies. Exits 1 if a check fails.
+
+Run: python benchmarks/bench_resilience.py [--queries 60] [--latency-ms 40]
+"""
+
+import argparse
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import automated_newsletter as nl
+from resilient_search import CircuitBreaker, ResilientSearch
+from search_backends import RetryableSearchError, SearchBackend, SearchError
+
+
+class FaultyBackend(SearchBackend):
+    """Deterministic faults per query: throttle the first `throttled` calls, stall every `slow_every`th
+    call for `stall` seconds, fail every call while `down`, or reject queries containing "bad" outright"""
+
+    name = "faulty"
+
+    def __init__(self, latency, throttled=0, slow_every=0, stall=0.0, down=False):
+        self.latency = latency
+        self.throttled = throttled
+        self.slow_every = slow_every
+        self.stall = stall
+        self.down = down
+        self.calls = {}
+        self.total = 0
+        self._lock = threading.Lock()
+
+    def search(self, query, num):
+        with self._lock:
+            self.total += 1
+            n = self.calls[query] = self.calls.get(query, 0) + 1
+            stalled = self.slow_every and self.total % self.slow_every == 0
+        time.sleep(self.stall if stalled else self.latency)
+        if self.down:
+            raise RetryableSearchError("202 Ratelimit")
+        if "bad" in query:
+            raise SearchError(f"malformed query {query!r}")
+        if n <= self.throttled:
+            raise RetryableSearchError("202 Ratelimit")
+        return [{"title": f"{query} {i}", "link": f"https://example.org/{i}", "snippet": ""} for i in range(num)]
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    return ordered[int(p * (len(ordered) - 1))] if ordered else 0.0
+
+
+def run(backend, queries, workdir, resilient, warm=()):
+    """Search every query with a fresh cache (pre-filled with `warm`); returns answered count and timings"""
+    nl.set_backend(backend)
+    nl._cache = None
+    nl.CACHE_PATH = workdir / f"cache-{time.monotonic_ns()}.sqlite"
+    nl.STATE_PATH = workdir / f"state-{time.monotonic_ns()}.json"
+    nl._state = None
+    for q in warm:
+        nl.get_cache().put(q, 8, [{"title": f"{q} (cached)", "link": "https://example.org/c", "snippet": ""}])
+    nl._searcher = ResilientSearch(
+        backend, attempts=3 if resilient else 1, backoff=0.02, timeout=2.0, hedge=resilient, min_samples=10,
+        min_hedge_delay=0.0, breaker=CircuitBreaker(5 if resilient else 10 ** 9, cooldown=60), workers=32)
+    nl.METRICS = nl.Metrics()
+    start = time.perf_counter()
+    # ttl 0: warm entries only come back as a fallback when the backend fails
+    nl.search_many([(q, 8, 0) for q in queries], workers=8)
+    elapsed = time.perf_counter() - start
+    answered = sum(1 for q in nl.METRICS.queries if q["source"] == "network")
+    stale = sum(1 for q in nl.METRICS.queries if q["source"] == "stale")
+    latencies = [q["ms"] / 1000 for q in nl.METRICS.queries if q["source"] in ("network", "stale", "empty")]
+    return {"answered": answered, "stale": stale, "seconds": elapsed, "p50": percentile(latencies, 0.5),
+            "max": max(latencies, default=0.0), "over_1s": sum(t > 1.0 for t in latencies), "calls": backend.total, "stats": dict(nl._searcher.stats),
+            "trips": nl._searcher.breaker.trips, "measured": list(nl._searcher.measured)}
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Resilient search layer under injected faults")
+    ap.add_argument("--queries", type=int, default=60)
+    ap.add_argument("--latency-ms", type=float, default=40.0)
+    args = ap.parse_args()
+    latency = args.latency_ms / 1000
+    queries = [f"climate query {i}" for i in range(args.queries)]
+
+    nl.POLITE_DELAY = nl.POLITE_JITTER = 0.0
+    nl.DAILY_QUERY_LIMIT = 10 ** 9
+    scenarios = {
+        "throttled (1st call per query)": (lambda: FaultyBackend(latency, throttled=1), queries, ()),
+        "slow tail (every 10th call 1.5s)": (lambda: FaultyBackend(latency, slow_every=10, stall=1.5), queries, ()),
+        "fatal errors (bad queries)": (lambda: FaultyBackend(latency),
+                                       [f"bad {q}" if i % 5 == 0 else q for i, q in enumerate(queries)], ()),
+        "outage (all calls fail)": (lambda: FaultyBackend(latency, down=True), queries, queries[::2]),
+    }
+    report, failures = {}, []
+    print(f"{'scenario':<34} {'mode':<10} {'answered':>8} {'stale':>6} {'calls':>6} {'p50 s':>7} "
+          f"{'max s':>7} {'total s':>8}")
+    with tempfile.TemporaryDirectory() as tmp, open(Path(tmp) / "run.log", "w") as quiet:
+        for name, (make, qs, warm) in scenarios.items():
+            for mode in ("plain", "resilient"):
+                stdout, sys.stdout = sys.stdout, quiet
+                try:
+                    r = report[(name, mode)] = run(make(), qs, Path(tmp), mode == "resilient", warm)
+                finally:
+                    sys.stdout = stdout
+                print(f"{name:<34} {mode:<10} {r['answered']:>8} {r['stale']:>6} {r['calls']:>6} "
+                      f"{r['p50']:>7.3f} {r['max']:>7.3f} {r['seconds']:>8.2f}")
+
+    def check(ok, message):
+        print(f"{'✅' if ok else '❌'} {message}")
+        if not ok:
+            failures.append(message)
+
+    n = args.queries
+    print()
+    throttled = report[("throttled (1st call per query)", "resilient")]
+    check(report[("throttled (1st call per query)", "plain")]["answered"] == 0 and throttled["answered"] == n,
+          f"throttling: retries answer {throttled['answered']}/{n} queries (plain: 0)")
+    slow, slow_plain = report[("slow tail (every 10th call 1.5s)", "resilient")], \
+        report[("slow tail (every 10th call 1.5s)", "plain")]
+    # Stalls before the first min_samples latencies are known can't be hedged yet
+    check(slow["stats"]["hedge_wins"] > 0 and slow["over_1s"] < slow_plain["over_1s"],
+          f"slow tail: {slow['stats']['hedges']} hedges ({slow['stats']['hedge_wins']} won) cut queries over 1s "
+          f"from {slow_plain['over_1s']} to {slow['over_1s']}")
+    fatal = report[("fatal errors (bad queries)", "resilient")]
+    check(fatal["stats"]["fatal"] == n // 5 and fatal["stats"]["retries"] == 0 and fatal["trips"] == 0,
+          f"fatal errors: {fatal['stats']['fatal']} failed at once, no retries, breaker closed")
+    outage = report[("outage (all calls fail)", "resilient")]
+    check(outage["trips"] == 1 and outage["calls"] < report[("outage (all calls fail)", "plain")]["calls"] * 3
+          and outage["stale"] == len(queries[::2]),
+          f"outage: breaker tripped after {outage['calls']} calls, {outage['stale']} queries served from cache")
+
+    # 17 queries (the default edition) never reach the default min_samples within one run
+    hedged = {}
+    for seeded in (False, True):
+        searcher = ResilientSearch(FaultyBackend(latency, slow_every=6, stall=1.5), timeout=2.0, min_hedge_delay=0.0,
+                                   latencies=throttled["measured"] if seeded else ())
+        for q in queries[:17]:
+            searcher.search(q, 8)
+        hedged[seeded] = searcher.stats["hedge_wins"]
+        searcher.close()
+    check(hedged[False] == 0 and hedged[True] > 0,
+          f"short run: {hedged[True]} stalls hedged with {len(throttled['measured'])} latencies from an earlier run "
+          f"(unseeded: {hedged[False]})")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark - import time (-X importtime) and peak memory of automated_newsletter
+Compares against the eager import set the module used to load at startup
+Run: python benchmarks/bench_startup.py [--max-ms 150]   (non-zero exit when over budget, for CI)
+"""
+
+import argparse
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# What `import automated_newsletter` pulled in before imports were made lazy
+EAGER_IMPORTS = ("import requests, pandas, bs4, smtplib, email.mime.text, email.mime.multipart; "
+                 "from dateutil import parser; from ddgs import DDGS; import automated_newsletter")
+LAZY_IMPORTS = "import automated_newsletter"
+
+PROBE = ("import resource, sys; {stmt}; "
+         "print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, len(sys.modules))")
+IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def measure(stmt):
+    """Run stmt in a fresh interpreter; returns (top-level cumulative ms, max RSS MB, module count, rows)"""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", PROBE.format(stmt=stmt)],
+                          cwd=ROOT, capture_output=True, text=True)
+    if proc.returncode != 0:
+        return None
+    rows = []
+    for line in proc.stderr.splitlines():
+        m = IMPORT_LINE.match(line)
+        if m:
+            rows.append((int(m.group(2)) / 1000, len(m.group(3)) - 1, m.group(4)))
+    # Drop interpreter startup (site, encodings, .pth hooks): everything up to the last
+    # top-level import the probe statement itself did not ask for
+    requested = set(re.findall(r"[A-Za-z_][\w.]*", stmt))
+    startup = [i for i, (_, depth, name) in enumerate(rows) if depth == 0 and name not in requested]
+    rows = rows[startup[-1] + 1:] if startup else rows
+    top_level = sum(ms for ms, depth, _ in rows if depth == 0)
+    rss_kb, modules = proc.stdout.split()
+    return top_level, int(rss_kb) / 1024, int(modules), rows
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--max-ms", type=float, default=None, help="fail if the lazy import exceeds this")
+    args = ap.parse_args()
+
+    # Warm the OS file cache so both measurements see the same disk state
+    measure(EAGER_IMPORTS)
+    lazy = measure(LAZY_IMPORTS)
+    eager = measure(EAGER_IMPORTS)
+
+    print(f"{'':<28}{'import ms':>10}{'peak MB':>10}{'modules':>10}")
+    if eager:
+        print(f"{'eager (previous startup)':<28}{eager[0]:>10.1f}{eager[1]:>10.1f}{eager[2]:>10}")
+    else:
+        print("eager (previous startup)      dependencies not installed, skipped")
+    print(f"{'lazy (current)':<28}{lazy[0]:>10.1f}{lazy[1]:>10.1f}{lazy[2]:>10}")
+    if eager:
+        print(f"\nimport time -{eager[0] - lazy[0]:.1f} ms ({eager[0] / lazy[0]:.0f}x), "
+              f"peak memory -{eager[1] - lazy[1]:.1f} MB")
+
+    print("\nslowest imports behind `import automated_newsletter`:")
+    for ms, depth, name in sorted(lazy[3], reverse=True)[:8]:
+        print(f"  {ms:8.1f} ms  {name}")
+
+    if args.max_ms is not None and lazy[0] > args.max_ms:
+        print(f"\n❌ import took {lazy[0]:.1f} ms, budget is {args.max_ms:.0f} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Date extraction - patterns compiled at import, one pass over the snippet's years, memoized per snippet
+Recognizes "March 5, 2026", "21-22 April 2026", ISO dates, "Q3 2026", deadline phrasing and rolling/ongoing markers
+"""
+
+import re
+from calendar import monthrange
+from collections import namedtuple
+from functools import lru_cache
+
+DateInfo = namedtuple("DateInfo", "label year month day kind")
+NO_DATE = DateInfo("—", None, None, None, None)
+ROLLING = DateInfo("Rolling / Ongoing", None, None, None, "rolling")
+
+MONTHS = {
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "jun": 6,
+    "jul": 7, "aug": 8, "sep": 9, "oct": 10, "nov": 11, "dec": 12,
+}
+_MONTH = (r"(?:jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?"
+          r"|sept?(?:ember)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)")
+_DAY = r"\d{1,2}(?:st|nd|rd|th)?"
+_RANGE = r"(?:\s*(?:[-–—]|to)\s*\d{1,2}(?:st|nd|rd|th)?)?"
+_YEAR = r"20\d{2}"
+
+# Every structured date contains a 20xx year, so scanning jumps between years (a fast
+# literal search) and only then matches the date shapes that end at, or start with, that year
+YEAR_PATTERN = re.compile(rf"(?<!\d){_YEAR}(?!\d)")
+DATE_BEFORE_YEAR = re.compile(
+    rf"(?:(?P<mdy>\b(?P<mdy_m>{_MONTH})\.?\s+(?P<mdy_d>{_DAY}){_RANGE},?\s*(?P<mdy_y>{_YEAR}))"
+    rf"|(?P<dmy>\b(?P<dmy_d>{_DAY}){_RANGE}\s+(?P<dmy_m>{_MONTH})\.?,?\s+(?P<dmy_y>{_YEAR}))"
+    rf"|(?P<num>\b(?P<num_m>[01]?\d)/(?P<num_d>[0-3]?\d)/(?P<num_y>{_YEAR}))"
+    rf"|(?P<qtr>\bQ(?P<qtr_q>[1-4])\s*(?:of\s+)?(?P<qtr_y>{_YEAR}))"
+    rf"|(?P<my>\b(?P<my_m>{_MONTH})\.?\s+(?P<my_y>{_YEAR})))\Z",
+    re.I,
+)
+DATE_FROM_YEAR = re.compile(rf"(?P<iso>(?P<iso_y>{_YEAR})-(?P<iso_m>[01]\d)-(?P<iso_d>[0-3]\d))")
+DEADLINE_PATTERN = re.compile(
+    r"\b(?:deadline|due(?: by| on)?|apply by|closes?(?: on)?|applications? close)\b", re.I
+)
+ROLLING_PATTERN = re.compile(r"\b(?:rolling|ongoing|open until)\b", re.I)
+
+# Longest date text before its year ("September 20th – 27th, ") and how far
+# back deadline phrasing may sit before a date
+DATE_LOOKBACK = 40
+DEADLINE_REACH = 40
+
+# Text that names a month or numeric date but that the patterns above could not structure
+_DATEISH = re.compile(rf"\b{_MONTH}\b|\d{{1,2}}[./]\d{{1,2}}[./]\d{{2,4}}", re.I)
+
+
+def _valid_day(year, month, day):
+    return 1 <= month <= 12 and 1 <= day <= monthrange(year, month)[1]
+
+
+def _structured(m):
+    """(year, month, day or None), or None for text that isn't a real date ("February 30, 2026")"""
+    kind = m.lastgroup
+    if kind in ("mdy", "dmy", "iso", "num"):
+        year = int(m.group(f"{kind}_y"))
+        if kind in ("mdy", "dmy"):
+            month = MONTHS[m.group(f"{kind}_m")[:3].lower()]
+            day = int(m.group(f"{kind}_d").rstrip("stndrh"))
+        else:
+            month, day = int(m.group(f"{kind}_m")), int(m.group(f"{kind}_d"))
+        return (year, month, day) if _valid_day(year, month, day) else None
+    if kind == "qtr":
+        return int(m.group("qtr_y")), 3 * int(m.group("qtr_q")) - 2, None
+    if kind == "my":
+        return int(m.group("my_y")), MONTHS[m.group("my_m")[:3].lower()], None
+    return None
+
+
+@lru_cache(maxsize=8192)
+def extract_date(text, min_year=2025, future=True):
+    """Best date in text as a DateInfo, in one pass over its years
+
+    The first dated mention in min_year or later wins; a date shortly after
+    deadline phrasing is labelled "Deadline: ...". With no such date,
+    rolling/ongoing markers give ROLLING (future sections only). Otherwise the
+    latest year mentioned is returned with an empty label, so callers can drop
+    stale items (every year older than min_year).
+    """
+    if not text:
+        return NO_DATE
+    latest_year = None
+    for ym in YEAR_PATTERN.finditer(text):
+        latest_year = max(latest_year or 0, int(ym.group(0)))
+        m = (DATE_FROM_YEAR.match(text, ym.start())
+             or DATE_BEFORE_YEAR.search(text, max(0, ym.start() - DATE_LOOKBACK), ym.end()))
+        parts = _structured(m) if m else None
+        if parts is None or parts[0] < min_year:
+            continue
+        year, month, day = parts
+        label = m.group(0)
+        window = max(0, m.start() - DEADLINE_REACH - 20)
+        deadline = [d for d in DEADLINE_PATTERN.finditer(text, window, m.start())
+                    if m.start() - d.end() <= DEADLINE_REACH]
+        if deadline:
+            return DateInfo(f"Deadline: {label}", year, month, day, "deadline")
+        return DateInfo(label, year, month, day, m.lastgroup)
+    if future and ROLLING_PATTERN.search(text):
+        return ROLLING
+    if latest_year is not None:
+        return DateInfo("—", latest_year, None, None, "stale" if latest_year < min_year else "year")
+    return NO_DATE
+
+
+def parse_year(text):
+    """Year of a date string; dateutil is only tried for date-looking text the pattern can't structure"""
+    info = extract_date(text, min_year=0)
+    if info.year:
+        return info.year
+    if not text or not _DATEISH.search(text):
+        return None
+    from dateutil import parser
+    try:
+        return parser.parse(text, fuzzy=True).year
+    except (ValueError, OverflowError):
+        return None
@@ -0,0 +1,146 @@
+"""
+Near-duplicate index - MinHash over title + snippet word bigrams plus canonical URLs, persisted across weeks
+LSH banding (8 bands x 4 rows) keeps each check to a few dict lookups as history grows
+"""
+
+import gc
+import hashlib
+import json
+import random
+import re
+from array import array
+from pathlib import Path
+
+from weekly_store import canonical_url
+
+NUM_PERM = 32
+BANDS = 8
+ROWS = NUM_PERM // BANDS
+# Share of equal signature slots (estimated Jaccard similarity) that counts as a duplicate
+MIN_SIMILARITY = 0.5
+
+_MASK = (1 << 64) - 1
+_rng = random.Random(20260202)
+PERMUTATIONS = [(_rng.getrandbits(64) | 1, _rng.getrandbits(64)) for _ in range(NUM_PERM)]
+
+_WORD = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset("a an and are as at be by for from in is it of on or the to with this that".split())
+
+
+def _features(text):
+    words = [w for w in _WORD.findall((text or "").lower()) if w not in STOPWORDS]
+    if len(words) < 2:
+        return words
+    return [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+def minhash(text):
+    """MinHash signature (NUM_PERM 32-bit values) of the text's word bigrams; None for empty text"""
+    features = _features(text)
+    if not features:
+        return None
+    hashes = [int.from_bytes(hashlib.blake2b(f.encode("utf-8"), digest_size=8).digest(), "big")
+              for f in set(features)]
+    return array("I", (min(((a * h + b) & _MASK) >> 32 for h in hashes) for a, b in PERMUTATIONS))
+
+
+def similarity(sig_a, sig_b):
+    return sum(x == y for x, y in zip(sig_a, sig_b)) / NUM_PERM
+
+
+def _bands(hex_sig):
+    """Each band's slice of the hex signature; string keys need no decoding on load and no GC tracking"""
+    width = len(hex_sig) // BANDS
+    return [hex_sig[i:i + width] for i in range(0, len(hex_sig), width)]
+
+
+def _signature(entry):
+    """The entry's MinHash array, decoded from hex on first comparison"""
+    sig = entry.get("_sig")
+    if sig is None:
+        sig = entry["_sig"] = array("I", bytes.fromhex(entry["minhash"]))
+    return sig
+
+
+class DedupIndex:
+    """Remembers every featured item and answers "have we shown this before?"
+
+    Entries are appended to a JSONL file; the in-memory index maps canonical URLs
+    and MinHash bands (one dict per band) to entries, so find() costs a few dict
+    lookups and loading costs a few string slices per entry. Almost every band
+    bucket holds one entry, so a bucket is that entry until a second one makes
+    it a list. Distinct items on the same domain are kept; only the same page or
+    near-identical text counts as a duplicate.
+    """
+
+    def __init__(self, path=None):
+        self.path = Path(path) if path else None
+        self.entries = []
+        self._urls = {}
+        self._buckets = [{} for _ in range(BANDS)]
+        self._pending = []
+        if self.path and self.path.exists():
+            # Collections triggered by the bulk load would rescan every entry loaded so far,
+            # making the load quadratic in history; nothing here forms a cycle
+            enabled = gc.isenabled()
+            gc.disable()
+            try:
+                with open(self.path, encoding="utf-8") as f:
+                    for line in f:
+                        if line.strip():
+                            self._index(json.loads(line))
+            finally:
+                if enabled:
+                    gc.enable()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _index(self, entry):
+        self.entries.append(entry)
+        self._urls.setdefault(entry["url"], entry)
+        if entry.get("minhash"):
+            for buckets, key in zip(self._buckets, _bands(entry["minhash"])):
+                bucket = buckets.setdefault(key, entry)
+                if bucket is not entry:
+                    if type(bucket) is list:
+                        bucket.append(entry)
+                    else:
+                        buckets[key] = [bucket, entry]
+
+    def find(self, url, title="", snippet=""):
+        """The earlier entry this item duplicates, or None"""
+        hit = self._urls.get(canonical_url(url))
+        if hit or not (title or snippet):
+            return hit
+        sig = minhash(f"{title} {snippet}")
+        if sig is None:
+            return None
+        for buckets, key in zip(self._buckets, _bands(sig.tobytes().hex())):
+            bucket = buckets.get(key)
+            if bucket is None:
+                continue
+            for entry in bucket if type(bucket) is list else (bucket,):
+                if similarity(_signature(entry), sig) >= MIN_SIMILARITY:
+                    return entry
+        return None
+
+    def add(self, url, title="", snippet="", section=None, week=None):
+        sig = minhash(f"{title} {snippet}")
+        entry = {"url": canonical_url(url), "minhash": sig.tobytes().hex() if sig is not None else None,
+                 "section": section, "week": week, "title": title, "_sig": sig}
+        self._index(entry)
+        self._pending.append(entry)
+        return entry
+
+    def save(self):
+        """Append entries added since the last save"""
+        if not self.path or not self._pending:
+            return 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            for entry in self._pending:
+                record = {k: v for k, v in entry.items() if k != "_sig"}
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        saved, self._pending = len(self._pending), []
+        return saved
@@ -0,0 +1,253 @@
+"""
+Email delivery - render once, then send per-recipient or BCC-batched copies over a pool of reused SMTP connections
+Every recipient's status is logged per issue, so resends skip whoever already has it and failures retry next run
+"""
+
+import json
+import queue
+import smtplib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from email import policy
+from email.message import EmailMessage
+from email.utils import formatdate, make_msgid
+from pathlib import Path
+
+MAX_ATTEMPTS = 5
+
+SENT, FAILED, REJECTED = "sent", "failed", "rejected"
+
+
+def build_message(subject, sender, html, text=None):
+    """Render the message once as SMTP-ready bytes without a To header (added per copy)"""
+    msg = EmailMessage(policy=policy.SMTP)
+    msg["Subject"] = subject
+    msg["From"] = sender
+    msg["Date"] = formatdate(localtime=True)
+    msg["Message-ID"] = make_msgid()
+    if text:
+        msg.set_content(text)
+        msg.add_alternative(html, subtype="html")
+    else:
+        msg.set_content(html, subtype="html")
+    return msg.as_bytes()
+
+
+def with_recipient(body, to):
+    return f"To: {to}\r\n".encode("utf-8") + body
+
+
+class SMTPPool:
+    """Up to `size` logged-in SMTP connections, each reused for every message it sends
+
+    Connections that drop are discarded and reopened on the next checkout. An
+    authentication failure is remembered so the remaining batches fail fast
+    instead of logging in again and again.
+    """
+
+    def __init__(self, host, port, user=None, password=None, size=2, starttls=True, timeout=30,
+                 factory=smtplib.SMTP):
+        self.host, self.port = host, port
+        self.user, self.password = user, password
+        self.starttls = starttls
+        self.timeout = timeout
+        self.factory = factory
+        self.connects = 0
+        self._slots = threading.BoundedSemaphore(size)
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._auth_error = None
+
+    def _connect(self):
+        if self._auth_error:
+            raise self._auth_error
+        server = self.factory(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.starttls:
+                server.starttls()
+            if self.user:
+                server.login(self.user, self.password)
+        except smtplib.SMTPAuthenticationError as e:
+            self._auth_error = e
+            _quit(server)
+            raise
+        except Exception:
+            _quit(server)
+            raise
+        with self._lock:
+            self.connects += 1
+        return server
+
+    @contextmanager
+    def connection(self):
+        with self._slots:
+            try:
+                server = self._idle.get_nowait()
+            except queue.Empty:
+                server = self._connect()
+            try:
+                yield server
+            except smtplib.SMTPServerDisconnected:
+                _quit(server)
+                raise
+            except smtplib.SMTPException:
+                # Refused recipients / data: smtplib already sent RSET, the session is still good
+                self._idle.put(server)
+                raise
+            except BaseException:
+                # Socket errors (SMTPException is an OSError too, so this comes after it)
+                _quit(server)
+                raise
+            else:
+                self._idle.put(server)
+
+    def close(self):
+        while True:
+            try:
+                _quit(self._idle.get_nowait())
+            except queue.Empty:
+                return
+
+
+def _quit(server):
+    try:
+        server.quit()
+    except Exception:
+        try:
+            server.close()
+        except Exception:
+            pass
+
+
+class DeliveryLog:
+    """Append-only JSONL of recipient status per issue; the latest line per (issue, email) wins
+
+    "sent" recipients are never sent that issue again; "failed" ones (dropped
+    connection, 4xx) stay in the retry queue until MAX_ATTEMPTS; "rejected"
+    ones (5xx for that address) are not retried.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._status = {}
+        self._lock = threading.Lock()
+        if self.path.exists():
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        record = json.loads(line)
+                        self._status[(record["issue"], record["email"])] = record
+
+    def status(self, issue, email):
+        record = self._status.get((issue, email))
+        return record["status"] if record else None
+
+    def _retryable(self, record):
+        return record is None or (record["status"] == FAILED and record["attempts"] < MAX_ATTEMPTS)
+
+    def pending(self, issue, recipients):
+        """Recipients of `recipients` who still need this issue, in order, without duplicates"""
+        seen = set()
+        todo = []
+        for email in recipients:
+            key = email.lower()
+            if key not in seen and self._retryable(self._status.get((issue, key))):
+                todo.append(email)
+            seen.add(key)
+        return todo
+
+    def retry_queue(self):
+        """{issue: [email, ...]} for failed recipients that have attempts left"""
+        retries = {}
+        for (issue, email), record in self._status.items():
+            if record["status"] == FAILED and record["attempts"] < MAX_ATTEMPTS:
+                retries.setdefault(issue, []).append(email)
+        return retries
+
+    def record(self, issue, outcomes):
+        """Log [(email, status, error), ...] for one issue in a single append"""
+        lines = []
+        with self._lock:
+            for email, status, error in outcomes:
+                key = (issue, email.lower())
+                attempts = self._status.get(key, {}).get("attempts", 0) + 1
+                record = {"issue": issue, "email": email.lower(), "status": status,
+                          "attempts": attempts, "error": error, "at": time.time()}
+                self._status[key] = record
+                lines.append(json.dumps(record, ensure_ascii=False) + "\n")
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.writelines(lines)
+
+
+def _outcomes(batch, refused, error=None):
+    """Map sendmail's refused dict (or a whole-batch error) to per-recipient statuses"""
+    outcomes = []
+    for email in batch:
+        if email in refused:
+            code, reason = refused[email]
+            reason = reason.decode("utf-8", "replace") if isinstance(reason, bytes) else str(reason)
+            status = REJECTED if 500 <= (code or 0) < 600 else FAILED
+            outcomes.append((email, status, f"{code} {reason}"))
+        elif error:
+            outcomes.append((email, FAILED, error))
+        else:
+            outcomes.append((email, SENT, None))
+    return outcomes
+
+
+def send_batch(pool, sender, body, batch):
+    """One transaction: a single recipient gets their own To header, a batch is BCC (To: sender)"""
+    data = with_recipient(body, batch[0] if len(batch) == 1 else sender)
+    for attempt in range(2):
+        try:
+            with pool.connection() as server:
+                return _outcomes(batch, server.sendmail(sender, batch, data))
+        except smtplib.SMTPRecipientsRefused as e:
+            return _outcomes(batch, e.recipients)
+        except smtplib.SMTPServerDisconnected as e:
+            # A pooled connection may have timed out server-side; reconnect once
+            error = f"disconnected: {e}"
+        except (smtplib.SMTPException, OSError) as e:
+            return _outcomes(batch, {}, f"{type(e).__name__}: {e}")
+    return _outcomes(batch, {}, error)
+
+
+def deliver(pool, log, issue, sender, body, recipients, batch_size=1, workers=2):
+    """Send `body` to every recipient who doesn't have this issue yet
+
+    Returns counts of sent / failed / rejected recipients this run plus those
+    skipped because an earlier run already delivered to them.
+    """
+    todo = log.pending(issue, recipients)
+    counts = {SENT: 0, FAILED: 0, REJECTED: 0, "skipped": len({r.lower() for r in recipients}) - len(todo)}
+    if not todo:
+        return counts
+    batch_size = max(1, batch_size)
+    batches = [todo[i:i + batch_size] for i in range(0, len(todo), batch_size)]
+
+    def run(batch):
+        outcomes = send_batch(pool, sender, body, batch)
+        log.record(issue, outcomes)
+        return outcomes
+
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(batches)))) as executor:
+        for outcomes in executor.map(run, batches):
+            for _, status, _ in outcomes:
+                counts[status] += 1
+    return counts
+
+
+def save_outbox(folder, issue, body):
+    """Keep the rendered issue so queued retries resend exactly what everyone else got"""
+    path = Path(folder) / f"{issue}.eml"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(body)
+    return path
+
+
+def load_outbox(folder, issue):
+    path = Path(folder) / f"{issue}.eml"
+    return path.read_bytes() if path.exists() else None
@@ -0,0 +1,104 @@
+"""
+Editions - several newsletter variants (regional chapters, grants-only or experts-only digests) from one JSON file
+Each edition has its own keywords, limits, template, recipients and weekly_data/editions/<name>/ folder;
+the runner searches the union of all editions' queries once, on one pool and one cache
+"""
+
+import json
+import os
+import re
+from collections import Counter
+from pathlib import Path
+
+# Sections an edition can carry and whether their dates should be in the future
+FUTURE_SECTIONS = {"grants": True, "events": True, "csr": False}
+LIMIT_KEYS = {"max_rows_per_section": "max_rows", "max_experts": "max_experts", "max_cards": "max_cards"}
+_NAME = re.compile(r"^[a-z0-9][a-z0-9_-]*$")
+
+
+class Edition:
+    """One newsletter variant
+
+    sections maps "grants" / "events" / "csr" to keywords; sections left out
+    (and experts, without expert_queries) are simply not collected.
+    """
+
+    def __init__(self, name, sections, expert_queries=(), folder=None, recipients=(), subject=None,
+                 template=None, max_rows=40, max_experts=30, max_cards=None, primary=False):
+        self.name = name
+        self.sections = {section: list(keywords) for section, keywords in sections.items()}
+        self.expert_queries = list(expert_queries)
+        self.folder = Path(folder) if folder else Path("weekly_data") / "editions" / name
+        self.recipients = list(recipients)
+        self.subject = subject
+        self.template = template
+        self.max_rows = max_rows
+        self.max_experts = max_experts
+        # None: as many cards as fit the email byte budget
+        self.max_cards = max_cards
+        # The primary edition keeps the historical file layout and issue ids
+        self.primary = primary
+
+    def __repr__(self):
+        return f"Edition({self.name!r}, sections={list(self.sections)}, experts={len(self.expert_queries)})"
+
+    def issue(self, week):
+        """Delivery / outbox id of this edition's issue for a week"""
+        return week if self.primary else f"{self.name}-{week}"
+
+
+def load_editions(path, base_folder, defaults=None):
+    """Editions from a JSON file: {"editions": [{"name": ..., "sections": {...}, "experts": [...], ...}]}
+
+    Per edition: recipients (a list) or recipients_env (an environment variable
+    holding a comma-separated list), subject, template, max_rows_per_section,
+    max_experts and max_cards. Missing limits, template and subject come from
+    defaults. Raises ValueError for unknown sections, bad or repeated names.
+    """
+    with open(path, encoding="utf-8") as f:
+        config = json.load(f)
+    defaults = defaults or {}
+    editions, names = [], set()
+    for entry in config.get("editions", []):
+        name = entry.get("name", "")
+        if not _NAME.match(name) or name in names:
+            raise ValueError(f"edition name {name!r} must be unique, lowercase letters, digits, - or _")
+        names.add(name)
+        unknown = set(entry.get("sections", {})) - set(FUTURE_SECTIONS)
+        if unknown:
+            raise ValueError(f"edition {name!r}: unknown sections {sorted(unknown)}")
+        recipients = entry.get("recipients")
+        if recipients is None:
+            recipients = [e.strip() for e in os.getenv(entry.get("recipients_env", ""), "").split(",") if e.strip()]
+        limits = {attr: entry.get(key, defaults.get(attr)) for key, attr in LIMIT_KEYS.items()}
+        editions.append(Edition(
+            name, entry.get("sections", {}), entry.get("experts", ()),
+            folder=Path(base_folder) / "editions" / name, recipients=recipients,
+            subject=entry.get("subject", defaults.get("subject")),
+            template=entry.get("template", defaults.get("template")),
+            **{attr: value for attr, value in limits.items() if value is not None},
+        ))
+    if not editions:
+        raise ValueError(f"{path} defines no editions")
+    return editions
+
+
+def union_queries(editions):
+    """All editions' section keywords and expert queries, each once, in first-seen order"""
+    sections, experts = {}, {}
+    for edition in editions:
+        for section, keywords in edition.sections.items():
+            sections.setdefault(section, {}).update(dict.fromkeys(keywords))
+        experts.update(dict.fromkeys(edition.expert_queries))
+    return {section: list(keywords) for section, keywords in sections.items()}, list(experts)
+
+
+def query_uses(editions):
+    """How many editions use each query, per section ("experts" for expert queries); every edition
+    judges the shared results again, so a shared query's outcomes are recorded that many times"""
+    uses = {}
+    for edition in editions:
+        for section, keywords in edition.sections.items():
+            uses.setdefault(section, Counter()).update(set(keywords))
+        uses.setdefault("experts", Counter()).update(set(edition.expert_queries))
+    return uses
@@ -0,0 +1,171 @@
+"""
+Email size budget - a post-render pass that shares repeated inline styles, minifies whitespace and trims cards
+Gmail clips messages whose HTML passes ~102 KB, so the lowest-ranked cards are dropped until the issue fits
+"""
+
+import re
+from collections import Counter
+
+from email_template import (SECTIONS, _limit, _records, generate_email_html, generate_email_text,
+                            render_expert_card, render_item_card)
+
+GMAIL_CLIP_BYTES = 102 * 1024
+# Headroom under the clip for what Gmail and relays add to the markup
+DEFAULT_MAX_BYTES = 95_000
+# Gmail ignores a whole <style> block over ~16 KB, so styles past that stay inline
+MAX_STYLE_BLOCK = 16_000
+
+TAG_STYLE = re.compile(r'<(\w+)([^>]*?)\sstyle="([^"]*)"([^>]*)>')
+# Outlook's <!--[if mso]> conditionals are kept
+COMMENT = re.compile(r"<!--(?!\[if).*?-->", re.S)
+# Indentation between tags; whitespace inside a line of text collapses to one space instead
+BETWEEN_TAGS = re.compile(r">\s*\n\s*<")
+SPACES = re.compile(r"\s+")
+
+
+def normalize_style(style):
+    """'color: #fff; margin: 0 0 4px 0;' -> 'color:#fff;margin:0 0 4px 0'"""
+    rules = []
+    for rule in style.split(";"):
+        prop, sep, value = rule.partition(":")
+        if sep and prop.strip():
+            rules.append(f"{prop.strip().lower()}:{SPACES.sub(' ', value.strip()).replace(', ', ',')}")
+    return ";".join(rules)
+
+
+def share_styles(html, min_uses=2):
+    """Replace style attributes repeated at least min_uses times with short classes in a <head> <style>
+    block, keeping the ones whose class wouldn't save bytes (and anything past MAX_STYLE_BLOCK) inline"""
+    if "</head>" not in html:
+        return html
+    uses = Counter(normalize_style(m.group(3)) for m in TAG_STYLE.finditer(html) if "class=" not in m.group(0))
+    # Savings of a class: every use drops ' style="..."' for ' class="cN"' but the rule is written once
+    candidates = sorted(((n * (len(style) + 9) - n * 12 - len(style) - 6, style) for style, n in uses.items()
+                         if n >= min_uses and style), reverse=True)
+    classes, block = {}, 0
+    for saving, style in candidates:
+        rule = len(style) + 6 + len(str(len(classes)))
+        if saving <= 0 or block + rule > MAX_STYLE_BLOCK:
+            continue
+        classes[style] = f"c{len(classes)}"
+        block += rule
+
+    def replace(m):
+        tag, before, style, after = m.groups()
+        if "class=" in m.group(0):
+            return m.group(0)
+        style = normalize_style(style)
+        attr = f' class="{classes[style]}"' if style in classes else (f' style="{style}"' if style else "")
+        return f"<{tag}{before}{attr}{after}>"
+
+    html = TAG_STYLE.sub(replace, html)
+    if classes:
+        css = "".join(f".{name}{{{style}}}" for style, name in classes.items())
+        html = html.replace("</head>", f"<style>{css}</style></head>", 1)
+    return html
+
+
+def minify(html):
+    """Drop comments and indentation, collapse whitespace runs (the templates have no <pre>)"""
+    html = COMMENT.sub("", html)
+    html = BETWEEN_TAGS.sub("><", html)
+    return SPACES.sub(" ", html).strip()
+
+
+def optimize(html, shared_styles=True):
+    html = minify(html)
+    return share_styles(html) if shared_styles else TAG_STYLE.sub(
+        lambda m: f'<{m.group(1)}{m.group(2)} style="{normalize_style(m.group(3))}"{m.group(4)}>', html)
+
+
+def size(text):
+    return len(text.encode("utf-8"))
+
+
+class Email:
+    """The rendered issue: html (optimized, within budget if possible), text and what it took to get there"""
+
+    def __init__(self, html, text, raw_bytes, shown, trimmed, max_bytes):
+        self.html = html
+        self.text = text
+        self.raw_bytes = raw_bytes
+        self.html_bytes = size(html)
+        self.text_bytes = size(text)
+        self.shown = shown
+        self.trimmed = trimmed
+        self.max_bytes = max_bytes
+
+    @property
+    def saved_bytes(self):
+        return self.raw_bytes - self.html_bytes
+
+    @property
+    def over_budget(self):
+        return bool(self.max_bytes) and self.html_bytes > self.max_bytes
+
+    def record(self):
+        return {"raw_bytes": self.raw_bytes, "html_bytes": self.html_bytes, "saved_bytes": self.saved_bytes,
+                "text_bytes": self.text_bytes, "max_bytes": self.max_bytes, "shown": dict(self.shown),
+                "trimmed": dict(self.trimmed)}
+
+    def summary(self):
+        trimmed = sum(self.trimmed.values())
+        percent = 100 * self.saved_bytes / self.raw_bytes if self.raw_bytes else 0.0
+        return (f"📏 Email {self.html_bytes / 1024:.1f} KB HTML (saved {self.saved_bytes / 1024:.1f} KB, "
+                f"{percent:.0f}%) + {self.text_bytes / 1024:.1f} KB text"
+                + (f", trimmed {trimmed} lowest-ranked cards to fit {self.max_bytes / 1024:.0f} KB" if trimmed else ""))
+
+
+def _score(row):
+    """A row's Score as a float; rows read back from CSV carry it as text, missing ones rank last"""
+    try:
+        return float(row.get("Score") or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _next_to_trim(records, shown):
+    """Section whose last shown card ranks lowest: the section showing the most cards, then the
+    lower score; every section keeps its top card"""
+    candidates = [(shown[name], -_score(records[name][shown[name] - 1]), -i, name)
+                  for i, (name, _) in enumerate(SECTIONS) if shown[name] > 1]
+    return max(candidates)[-1] if candidates else None
+
+
+def render_email(experts, grants, events, csr, today=None, max_cards=None, template=None,
+                 max_bytes=DEFAULT_MAX_BYTES, shared_styles=True):
+    """Render, optimize and trim the issue to max_bytes of HTML (0 / None: no budget)
+
+    Item sections are ranked by Score, highest first (a week's rows arrive in
+    the order they were found), experts keep their order. Trimming estimates
+    each card's optimized size from its raw size, drops cards until the
+    estimate fits and re-renders to check.
+    """
+    records = {"experts": _records(experts)}
+    records.update((name, sorted(_records(rows), key=_score, reverse=True))
+                   for name, rows in (("grants", grants), ("events", events), ("csr", csr)))
+    shown = {name: min(len(rows), _limit(max_cards, name) or len(rows)) for name, rows in records.items()}
+    capped = dict(shown)
+    while True:
+        raw = generate_email_html(records["experts"], records["grants"], records["events"], records["csr"],
+                                  today=today, max_cards=shown, template=template)
+        html = optimize(raw, shared_styles)
+        excess = size(html) - max_bytes if max_bytes else 0
+        if excess <= 0:
+            break
+        ratio = size(html) / size(raw)
+        dropped = False
+        while excess > 0:
+            name = _next_to_trim(records, shown)
+            if name is None:
+                break
+            render = render_expert_card if name == "experts" else render_item_card
+            shown[name] -= 1
+            excess -= size(render(records[name][shown[name]])) * ratio
+            dropped = True
+        if not dropped:
+            break
+    text = generate_email_text(records["experts"], records["grants"], records["events"], records["csr"],
+                               today=today, max_cards=shown)
+    trimmed = {name: capped[name] - shown[name] for name in shown if capped[name] > shown[name]}
+    return Email(html, text, size(raw), shown, trimmed, max_bytes)
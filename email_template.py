@@ -1,183 +1,202 @@
 """
-Email template - reads email_template_email_safe.html and fills in data only
+Email template - parses email_template_email_safe.html once into slots and renders data in a single pass
 """
 
-import pandas as pd
+from datetime import datetime
+from functools import lru_cache
+from html import escape, unescape
 from pathlib import Path
 import re
 
-def generate_email_html(experts_df, grants_df, events_df, csr_df):
-    """Read email-safe HTML template and fill in data"""
-    
-    # Read email-safe template (with inline styles)
-    template_path = Path(__file__).parent / "email_template_email_safe.html"
-    with open(template_path, 'r') as f:
-        html = f.read()
-    
-    # Get counts
-    experts_count = len(experts_df) if not experts_df.empty else 0
-    grants_count = len(grants_df) if not grants_df.empty else 0
-    events_count = len(events_df) if not events_df.empty else 0
-    csr_count = len(csr_df) if not csr_df.empty else 0
-    
-    today = pd.Timestamp.today()
-    week_num = today.isocalendar()[1]
-    date_str = today.strftime("%B %d, %Y")
-    
-    # Replace date and issue info
-    html = html.replace("Issue #6", f"Issue #{week_num}")
-    html = html.replace("February 06, 2026", date_str)
-    
-    # Replace counts - 4 sections, each with a 00 number
-    count_pattern = '<div style="position: absolute; top: 0px; right: 30px; font-family: Georgia, serif; font-size: 100px; font-weight: bold; color: #e8ece9; line-height: 0.8; margin: 0; padding: 0;">00</div>'
-    counts = [experts_count, grants_count, events_count, csr_count]
-    for count in counts:
-        html = html.replace(count_pattern, 
-                           f'<div style="position: absolute; top: 0px; right: 30px; font-family: Georgia, serif; font-size: 100px; font-weight: bold; color: #e8ece9; line-height: 0.8; margin: 0; padding: 0;">{count:02d}</div>', 1)
-    
-    # Replace editorial text with actual counts
-    html = html.replace(
-        "0 new funding opportunities, 0 upcoming climate events, 0 expert connections, and 0 fresh sustainability reports",
-        f"{grants_count} new funding opportunities, {events_count} upcoming climate events, {experts_count} expert connections, and {csr_count} fresh sustainability reports"
-    )
-    
-    # Build expert cards HTML with inline styles
-    experts_html = ""
-    if not experts_df.empty:
-        for idx, (_, row) in enumerate(experts_df.iterrows()):
-            if idx >= 5:
-                break
-            name = row.get('Name', 'Unknown')
-            role = row.get('Role', '')
-            linkedin = row.get('LinkedIn', '')
-            
-            role_html = f'<div style="font-size: 14px; color: #1a5538; font-weight: 500; line-height: 1.5; font-family: Georgia, serif;">{role}</div>' if role and role != '—' else ''
-            linkedin_html = f'<a href="{linkedin}" style="display: inline-block; color: #1a5538; text-decoration: none; font-size: 13px; font-weight: 600; padding: 10px 18px; background: #ffffff; border: 1px solid #9caf88; border-radius: 6px; margin-top: 10px; font-family: Georgia, serif;">View LinkedIn</a>' if linkedin and linkedin != '—' else ''
-            
-            experts_html += f'''<div style="background: #f5f7f5; border: 1px solid #9caf88; border-left: 4px solid #9caf88; padding: 20px; margin-bottom: 15px;">
+TEMPLATE_PATH = Path(__file__).parent / "email_template_email_safe.html"
+MAX_CARDS_PER_SECTION = 5
+
+# Template sections in document order: slot name, section comment that opens it
+SECTIONS = [
+    ("experts", "<!-- Climate Experts Section -->"),
+    ("grants", "<!-- Grants Section -->"),
+    ("events", "<!-- Events Section -->"),
+    ("csr", "<!-- ESG Reports Section -->"),
+]
+TEXT_HEADINGS = {"experts": "CLIMATE EXPERTS", "grants": "GRANTS & FUNDING",
+                 "events": "EVENTS & CONFERENCES", "csr": "ESG & SUSTAINABILITY REPORTS"}
+TEXT_DESCRIPTION_CHARS = 160
+
+COUNT_BADGE = '<div style="position: absolute; top: 0px; right: 30px; font-family: Georgia, serif; font-size: 100px; font-weight: bold; color: #e8ece9; line-height: 0.8; margin: 0; padding: 0;">00</div>'
+EMPTY_STATE = re.compile(
+    r'<div style="text-align: center; padding: 40px 20px; background: #f5f7f5; border: 2px dashed #9caf88; border-radius: 8px;">'
+    r'\s*<div[^>]*>📭</div>\s*<div[^>]*>No items curated this week</div>\s*</div>'
+)
+EDITORIAL = "0 new funding opportunities, 0 upcoming climate events, 0 expert connections, and 0 fresh sustainability reports"
+
+# Shared card components
+EXPERT_CARD = '''<div style="background: #f5f7f5; border: 1px solid #9caf88; border-left: 4px solid #9caf88; padding: 20px; margin-bottom: 15px;">
                 <div style="display: flex; gap: 15px; margin-bottom: 12px; align-items: flex-start;">
                     <div style="font-size: 32px;">👤</div>
                     <div style="flex: 1;">
                         <div style="font-size: 18px; font-weight: 700; color: #0a2f1f; margin: 0 0 4px 0; font-family: Georgia, serif;">{name}</div>
-                        {role_html}
+                        {role}
                     </div>
                 </div>
-                {linkedin_html}
+                {linkedin}
             </div>
 '''
-    
-    # Build grants cards HTML with inline styles
-    grants_html = ""
-    if not grants_df.empty:
-        for idx, (_, row) in enumerate(grants_df.iterrows()):
-            if idx >= 5:
-                break
-            title = row.get('Title', 'Untitled')
-            domain = row.get('Domain', row.get('Organization', ''))
-            date_info = row.get('Date Info', '')
-            url = row.get('URL', '')
-            description = row.get('Description', '')
-            
-            date_html = f'<div style="display: inline-block; font-size: 13px; color: #8b7355; font-weight: 500; margin-right: 20px; font-family: Georgia, serif;">📅 {date_info}</div>' if date_info and date_info != '—' else ''
-            domain_html = f'<div style="display: inline-block; font-size: 13px; color: #8b7355; font-weight: 500; font-family: Georgia, serif;"><a href="{url}" style="color: #1a5538; text-decoration: none;">🌐 {domain}</a></div>' if domain and domain != '—' else ''
-            url_html = f'<a href="{url}" style="display: inline-block; color: #ffffff; background: #0a2f1f; text-decoration: none; font-size: 13px; font-weight: 600; padding: 11px 22px; border-radius: 6px; margin-top: 15px; font-family: Georgia, serif;">Read Full Article →</a>' if url and url != '—' else ''
-            
-            grants_html += f'''<div style="background: #ffffff; border: 1px solid #e8ece9; border-left: 4px solid #0a2f1f; padding: 24px; margin-bottom: 18px;">
-                <div style="font-size: 18px; font-weight: 700; color: #0a2f1f; margin: 0 0 12px 0; line-height: 1.4; font-family: Georgia, serif;">{title}</div>
-                <div style="padding-bottom: 12px; border-bottom: 1px solid #e8ece9; margin-bottom: 12px;">
-                    {date_html}
-                    {domain_html}
-                </div>
-                <div style="font-size: 14px; color: #1a5538; line-height: 1.6; margin-bottom: 15px; font-family: Georgia, serif;">{description}</div>
-                {url_html}
-            </div>
-'''
-    
-    # Build events cards HTML with inline styles
-    events_html = ""
-    if not events_df.empty:
-        for idx, (_, row) in enumerate(events_df.iterrows()):
-            if idx >= 5:
-                break
-            title = row.get('Title', 'Untitled')
-            domain = row.get('Domain', row.get('Organization', ''))
-            date_info = row.get('Date Info', '')
-            url = row.get('URL', '')
-            description = row.get('Description', '')
-            
-            date_html = f'<div style="display: inline-block; font-size: 13px; color: #8b7355; font-weight: 500; margin-right: 20px; font-family: Georgia, serif;">📅 {date_info}</div>' if date_info and date_info != '—' else ''
-            domain_html = f'<div style="display: inline-block; font-size: 13px; color: #8b7355; font-weight: 500; font-family: Georgia, serif;"><a href="{url}" style="color: #1a5538; text-decoration: none;">🌐 {domain}</a></div>' if domain and domain != '—' else ''
-            url_html = f'<a href="{url}" style="display: inline-block; color: #ffffff; background: #0a2f1f; text-decoration: none; font-size: 13px; font-weight: 600; padding: 11px 22px; border-radius: 6px; margin-top: 15px; font-family: Georgia, serif;">Read Full Article →</a>' if url and url != '—' else ''
-            
-            events_html += f'''<div style="background: #ffffff; border: 1px solid #e8ece9; border-left: 4px solid #0a2f1f; padding: 24px; margin-bottom: 18px;">
-                <div style="font-size: 18px; font-weight: 700; color: #0a2f1f; margin: 0 0 12px 0; line-height: 1.4; font-family: Georgia, serif;">{title}</div>
-                <div style="padding-bottom: 12px; border-bottom: 1px solid #e8ece9; margin-bottom: 12px;">
-                    {date_html}
-                    {domain_html}
-                </div>
-                <div style="font-size: 14px; color: #1a5538; line-height: 1.6; margin-bottom: 15px; font-family: Georgia, serif;">{description}</div>
-                {url_html}
-            </div>
-'''
-    
-    # Build CSR cards HTML with inline styles
-    csr_html = ""
-    if not csr_df.empty:
-        for idx, (_, row) in enumerate(csr_df.iterrows()):
-            if idx >= 5:
-                break
-            title = row.get('Title', 'Untitled')
-            domain = row.get('Domain', row.get('Organization', ''))
-            date_info = row.get('Date Info', '')
-            url = row.get('URL', '')
-            description = row.get('Description', '')
-            
-            date_html = f'<div style="display: inline-block; font-size: 13px; color: #8b7355; font-weight: 500; margin-right: 20px; font-family: Georgia, serif;">📅 {date_info}</div>' if date_info and date_info != '—' else ''
-            domain_html = f'<div style="display: inline-block; font-size: 13px; color: #8b7355; font-weight: 500; font-family: Georgia, serif;"><a href="{url}" style="color: #1a5538; text-decoration: none;">🌐 {domain}</a></div>' if domain and domain != '—' else ''
-            url_html = f'<a href="{url}" style="display: inline-block; color: #ffffff; background: #0a2f1f; text-decoration: none; font-size: 13px; font-weight: 600; padding: 11px 22px; border-radius: 6px; margin-top: 15px; font-family: Georgia, serif;">Read Full Article →</a>' if url and url != '—' else ''
-            
-            csr_html += f'''<div style="background: #ffffff; border: 1px solid #e8ece9; border-left: 4px solid #0a2f1f; padding: 24px; margin-bottom: 18px;">
+EXPERT_ROLE = '<div style="font-size: 14px; color: #1a5538; font-weight: 500; line-height: 1.5; font-family: Georgia, serif;">{}</div>'
+EXPERT_LINK = '<a href="{}" style="display: inline-block; color: #1a5538; text-decoration: none; font-size: 13px; font-weight: 600; padding: 10px 18px; background: #ffffff; border: 1px solid #9caf88; border-radius: 6px; margin-top: 10px; font-family: Georgia, serif;">View LinkedIn</a>'
+
+ITEM_CARD = '''<div style="background: #ffffff; border: 1px solid #e8ece9; border-left: 4px solid #0a2f1f; padding: 24px; margin-bottom: 18px;">
                 <div style="font-size: 18px; font-weight: 700; color: #0a2f1f; margin: 0 0 12px 0; line-height: 1.4; font-family: Georgia, serif;">{title}</div>
                 <div style="padding-bottom: 12px; border-bottom: 1px solid #e8ece9; margin-bottom: 12px;">
-                    {date_html}
-                    {domain_html}
+                    {date}
+                    {domain}
                 </div>
                 <div style="font-size: 14px; color: #1a5538; line-height: 1.6; margin-bottom: 15px; font-family: Georgia, serif;">{description}</div>
-                {url_html}
+                {link}
             </div>
 '''
-    
-    # Replace no-data sections with actual cards
-    html = re.sub(
-        r'(<!-- Climate Experts Section -->.*?)<div style="text-align: center; padding: 40px 20px; background: #f5f7f5; border: 2px dashed #9caf88; border-radius: 8px;">.*?</div>\s*(<!-- Grants Section -->)',
-        rf'\1{experts_html}\2',
-        html,
-        count=1,
-        flags=re.DOTALL
-    )
-    
-    html = re.sub(
-        r'(<!-- Grants Section -->.*?)<div style="text-align: center; padding: 40px 20px; background: #f5f7f5; border: 2px dashed #9caf88; border-radius: 8px;">.*?</div>\s*(<!-- Events Section -->)',
-        rf'\1{grants_html}\2',
-        html,
-        count=1,
-        flags=re.DOTALL
-    )
-    
-    html = re.sub(
-        r'(<!-- Events Section -->.*?)<div style="text-align: center; padding: 40px 20px; background: #f5f7f5; border: 2px dashed #9caf88; border-radius: 8px;">.*?</div>\s*(<!-- ESG Reports Section -->)',
-        rf'\1{events_html}\2',
-        html,
-        count=1,
-        flags=re.DOTALL
+ITEM_DATE = '<div style="display: inline-block; font-size: 13px; color: #8b7355; font-weight: 500; margin-right: 20px; font-family: Georgia, serif;">📅 {}</div>'
+ITEM_DOMAIN = '<div style="display: inline-block; font-size: 13px; color: #8b7355; font-weight: 500; font-family: Georgia, serif;"><a href="{}" style="color: #1a5538; text-decoration: none;">🌐 {}</a></div>'
+ITEM_LINK = '<a href="{}" style="display: inline-block; color: #ffffff; background: #0a2f1f; text-decoration: none; font-size: 13px; font-weight: 600; padding: 11px 22px; border-radius: 6px; margin-top: 15px; font-family: Georgia, serif;">Read Full Article →</a>'
+
+
+@lru_cache(maxsize=None)
+def load_template(path=TEMPLATE_PATH):
+    """Split the template into static text and slot names, once per process
+
+    Returns (parts, empty_states): parts alternates literal HTML and slot names
+    ("issue", "date", "editorial", "count:<section>", "cards:<section>");
+    empty_states holds each section's original "No items" block.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        source = f.read()
+    cuts = [(source.index("Issue #6") + len("Issue #"), len("6"), "issue"),
+            (source.index("February 06, 2026"), len("February 06, 2026"), "date"),
+            (source.index(EDITORIAL), len(EDITORIAL), "editorial")]
+    empty_states = {}
+    for name, marker in SECTIONS:
+        start = source.index(marker)
+        badge = source.index(COUNT_BADGE, start)
+        cuts.append((badge + COUNT_BADGE.index("00"), 2, f"count:{name}"))
+        empty = EMPTY_STATE.search(source, badge)
+        empty_states[name] = empty.group(0)
+        cuts.append((empty.start(), len(empty.group(0)), f"cards:{name}"))
+    parts, pos = [], 0
+    for start, length, slot in sorted(cuts):
+        parts += [source[pos:start], slot]
+        pos = start + length
+    parts.append(source[pos:])
+    return tuple(parts), empty_states
+
+
+def _records(data):
+    """Accept a list of dicts, a DataFrame or None"""
+    if data is None:
+        return []
+    if hasattr(data, "to_dict"):
+        return data.to_dict("records")
+    return list(data)
+
+
+def _present(value):
+    return value is not None and value == value and str(value).strip() not in ("", "—")
+
+
+def _safe_url(url):
+    url = str(url or "").strip()
+    return escape(url) if url.lower().startswith(("http://", "https://")) else ""
+
+
+def render_expert_card(row):
+    role, linkedin = row.get("Role", ""), _safe_url(row.get("LinkedIn", ""))
+    return EXPERT_CARD.format(
+        name=escape(str(row.get("Name", "Unknown"))),
+        role=EXPERT_ROLE.format(escape(str(role))) if _present(role) else "",
+        linkedin=EXPERT_LINK.format(linkedin) if linkedin else "",
     )
-    
-    html = re.sub(
-        r'(<!-- ESG Reports Section -->.*?)<div style="text-align: center; padding: 40px 20px; background: #f5f7f5; border: 2px dashed #9caf88; border-radius: 8px;">.*?</div>\s*(<!-- Footer -->)',
-        rf'\1{csr_html}\2',
-        html,
-        count=1,
-        flags=re.DOTALL
+
+
+def render_item_card(row):
+    """Card shared by grants, events and CSR reports"""
+    domain = row.get("Domain", row.get("Organization", ""))
+    date_info, url = row.get("Date Info", ""), _safe_url(row.get("URL", ""))
+    return ITEM_CARD.format(
+        title=escape(str(row.get("Title", "Untitled"))),
+        date=ITEM_DATE.format(escape(str(date_info))) if _present(date_info) else "",
+        domain=ITEM_DOMAIN.format(url, escape(str(domain))) if _present(domain) else "",
+        description=escape(str(row.get("Description", ""))),
+        link=ITEM_LINK.format(url) if url else "",
     )
-    
-    return html
+
+
+def _limit(max_cards, name):
+    """max_cards is one limit for every section, {section: limit} or None for no limit"""
+    return max_cards.get(name) if isinstance(max_cards, dict) else max_cards
+
+
+def _editorial(counts):
+    return (f"{counts['grants']} new funding opportunities, {counts['events']} upcoming climate events, "
+            f"{counts['experts']} expert connections, and {counts['csr']} fresh sustainability reports")
+
+
+def generate_email_html(experts, grants, events, csr, today=None, max_cards=MAX_CARDS_PER_SECTION, template=None):
+    """Render the newsletter from lists of dicts (DataFrames are accepted too); template is another
+    HTML file with the same section markers as email_template_email_safe.html"""
+    parts, empty_states = load_template(Path(template) if template else TEMPLATE_PATH)
+    records = {"experts": _records(experts), "grants": _records(grants),
+               "events": _records(events), "csr": _records(csr)}
+    counts = {name: len(rows) for name, rows in records.items()}
+    today = today or datetime.today()
+    values = {
+        "issue": str(today.isocalendar()[1]),
+        "date": today.strftime("%B %d, %Y"),
+        "editorial": _editorial(counts),
+    }
+    for name, rows in records.items():
+        render = render_expert_card if name == "experts" else render_item_card
+        values[f"count:{name}"] = f"{counts[name]:02d}"
+        values[f"cards:{name}"] = "".join(render(row) for row in rows[:_limit(max_cards, name)]) or empty_states[name]
+    # parts alternates literal text (even indexes) and slot names (odd indexes)
+    return "".join(part if i % 2 == 0 else values[part] for i, part in enumerate(parts))
+
+
+def _text_card(name, row):
+    if name == "experts":
+        role = row.get("Role", "")
+        lines = [f"- {row.get('Name', 'Unknown')}" + (f", {role}" if _present(role) else "")]
+        url = _safe_url(row.get("LinkedIn", ""))
+    else:
+        lines = [f"- {row.get('Title', 'Untitled')}"]
+        details = [str(v) for v in (row.get("Date Info", ""), row.get("Domain", row.get("Organization", "")))
+                   if _present(v)]
+        if details:
+            lines.append("  " + " · ".join(details))
+        description = " ".join(str(row.get("Description", "") or "").split())
+        if description:
+            if len(description) > TEXT_DESCRIPTION_CHARS:
+                description = description[:TEXT_DESCRIPTION_CHARS].rsplit(" ", 1)[0] + "…"
+            lines.append(f"  {description}")
+        url = _safe_url(row.get("URL", ""))
+    if url:
+        lines.append(f"  {unescape(url)}")
+    return "\n".join(lines)
+
+
+def generate_email_text(experts, grants, events, csr, today=None, max_cards=MAX_CARDS_PER_SECTION):
+    """Compact text/plain alternative of generate_email_html from the same records and card limits"""
+    records = {"experts": _records(experts), "grants": _records(grants),
+               "events": _records(events), "csr": _records(csr)}
+    counts = {name: len(rows) for name, rows in records.items()}
+    today = today or datetime.today()
+    blocks = [f"CLIMATE CARDINALS - Weekly Intelligence, Issue #{today.isocalendar()[1]}\n"
+              f"{today.strftime('%B %d, %Y')}",
+              f"This week: {_editorial(counts)}."]
+    for name, _ in SECTIONS:
+        rows = records[name]
+        shown = rows[:_limit(max_cards, name)]
+        lines = [f"{TEXT_HEADINGS[name]} ({counts[name]})"]
+        lines += [_text_card(name, row) for row in shown] or ["No items curated this week"]
+        if len(shown) < len(rows):
+            lines.append(f"...and {len(rows) - len(shown)} more")
+        blocks.append("\n".join(lines))
+    blocks.append("Climate Cardinals - Empowering the next generation of climate leaders")
+    return "\n\n".join(blocks) + "\n"
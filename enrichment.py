@@ -0,0 +1,301 @@
+"""
+Landing-page enrichment - fetch each result's page once and read its dates and organization from the page itself
+Pooled requests.Session with per-host connection limits, streamed bodies with a size cap, and a SQLite page
+cache revalidated with ETag / Last-Modified so unchanged pages cost a 304
+"""
+
+import json
+import re
+import sqlite3
+import threading
+import time
+from urllib.parse import urlparse
+
+from date_extract import extract_date, parse_year
+
+MAX_BYTES = 512 * 1024
+MAX_TEXT = 4000
+CHUNK = 16 * 1024
+PER_HOST = 2
+WORKERS = 8
+TIMEOUT = (5, 10)
+FRESH_HOURS = 20
+USER_AGENT = "Mozilla/5.0 (compatible; ClimateCardinalsNewsletter/1.0)"
+
+HTML_TYPES = ("text/html", "application/xhtml+xml")
+# JSON-LD fields, best first, that date the call or event itself; only these (and the page text) can make it too old
+LD_DATE_FIELDS = ("applicationDeadline", "validThrough", "startDate", "endDate")
+# When a page was published: a report's date, but any CMS page carries one, so it only dates CSR reports
+LD_PUBLISHED_FIELD = "datePublished"
+LD_ORG_FIELDS = ("organizer", "funder", "publisher", "provider", "author")
+META_ORG_FIELDS = ("og:site_name", "application-name", "publisher", "author")
+META_DATE_FIELDS = ("article:published_time", "datepublished", "date", "dc.date")
+
+_CHARSET = re.compile(rb"""<meta[^>]+charset=["']?([\w-]+)""", re.I)
+# Bumped when parse_page changes shape; cached pages parsed by an older version are fetched again
+PAGE_FORMAT = 2
+
+
+class PageCache:
+    """Parsed pages keyed by URL, with the validators needed for conditional GETs"""
+
+    def __init__(self, path):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS pages (
+                   url TEXT PRIMARY KEY,
+                   etag TEXT,
+                   last_modified TEXT,
+                   payload TEXT NOT NULL,
+                   fetched_at REAL NOT NULL
+               )"""
+        )
+        self._conn.commit()
+
+    def get(self, url):
+        """(etag, last_modified, page, fetched_at) or None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified, payload, fetched_at FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        return row[0], row[1], json.loads(row[2]), row[3]
+
+    def put(self, url, etag, last_modified, page):
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?)",
+                               (url, etag, last_modified, json.dumps(page, ensure_ascii=False), time.time()))
+            self._conn.commit()
+
+    def touch(self, url):
+        with self._lock:
+            self._conn.execute("UPDATE pages SET fetched_at = ? WHERE url = ?", (time.time(), url))
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def _decode(body, content_type):
+    m = re.search(r"charset=([\w-]+)", content_type or "", re.I) or _CHARSET.search(body[:2048])
+    charset = m.group(1) if m else "utf-8"
+    if isinstance(charset, bytes):
+        charset = charset.decode("ascii")
+    try:
+        return body.decode(charset, errors="replace")
+    except LookupError:
+        return body.decode("utf-8", errors="replace")
+
+
+def _ld_objects(data):
+    """Flatten JSON-LD (lists, @graph) into its objects"""
+    if isinstance(data, list):
+        for item in data:
+            yield from _ld_objects(item)
+    elif isinstance(data, dict):
+        yield data
+        yield from _ld_objects(data.get("@graph", []))
+
+
+def _ld_name(value):
+    if isinstance(value, list):
+        value = value[0] if value else None
+    if isinstance(value, dict):
+        value = value.get("name")
+    return value.strip() if isinstance(value, str) else None
+
+
+def _main_text(doc):
+    """Text of <main> / <article>, else of the page's headings and paragraphs, up to MAX_TEXT"""
+    from lxml import etree
+    main = next(iter(doc.xpath("(//main | //article)[1]")), None)
+    parts = [main] if main is not None else doc.xpath("//h1 | //p | //time")
+    chunks, size = [], 0
+    for part in parts:
+        etree.strip_elements(part, "script", "style", "noscript", with_tail=False)
+        for chunk in part.itertext():
+            chunks.append(chunk)
+            size += len(chunk)
+            if size >= MAX_TEXT * 2:
+                break
+        if size >= MAX_TEXT * 2:
+            break
+    return re.sub(r"\s+", " ", " ".join(chunks)).strip()[:MAX_TEXT]
+
+
+def parse_page(markup):
+    """Title, organization, dates and main text from an HTML page (head metadata + main text only)"""
+    import lxml.html
+    from lxml.etree import ParserError
+    try:
+        doc = lxml.html.fromstring(markup)
+    except ValueError:  # str with an XML encoding declaration
+        doc = lxml.html.fromstring(markup.encode("utf-8"))
+    except ParserError:
+        return {"title": "", "organization": None, "description": None, "dates": [], "published": None, "text": ""}
+
+    meta = {}
+    for tag in doc.iter("meta"):
+        key = (tag.get("property") or tag.get("name") or tag.get("itemprop") or "").lower()
+        if key and tag.get("content") and key not in meta:
+            meta[key] = tag.get("content").strip()
+
+    ld_dates, ld_orgs = {}, []
+    for script in doc.xpath('//script[@type="application/ld+json"]'):
+        try:
+            data = json.loads(script.text or "")
+        except ValueError:
+            continue
+        for obj in _ld_objects(data):
+            for field in LD_DATE_FIELDS + (LD_PUBLISHED_FIELD,):
+                if isinstance(obj.get(field), str):
+                    ld_dates.setdefault(field, obj[field])
+            ld_orgs += [name for name in map(_ld_name, (obj.get(f) for f in LD_ORG_FIELDS)) if name]
+
+    title = doc.findtext(".//title") or ""
+    return {
+        "title": meta.get("og:title") or title.strip(),
+        "organization": ld_orgs[0] if ld_orgs else next(
+            (meta[f] for f in META_ORG_FIELDS if meta.get(f)), None),
+        "description": meta.get("og:description") or meta.get("description"),
+        "dates": [ld_dates[f] for f in LD_DATE_FIELDS if f in ld_dates],
+        "published": ld_dates.get(LD_PUBLISHED_FIELD) or next((meta[f] for f in META_DATE_FIELDS if meta.get(f)), None),
+        "text": _main_text(doc),
+    }
+
+
+class PageFetcher:
+    """Concurrent, cached landing-page fetcher
+
+    A page fetched within fresh_hours is served from the cache; an older one is
+    revalidated with If-None-Match / If-Modified-Since. Bodies are streamed and
+    cut at max_bytes; non-HTML responses (PDFs) are recorded by type only.
+    """
+
+    def __init__(self, cache_path=None, workers=WORKERS, per_host=PER_HOST, max_bytes=MAX_BYTES,
+                 fresh_hours=FRESH_HOURS, timeout=TIMEOUT):
+        import requests
+        from requests.adapters import HTTPAdapter
+        self.workers = workers
+        self.max_bytes = max_bytes
+        self.fresh_hours = fresh_hours
+        self.timeout = timeout
+        self.cache = PageCache(cache_path) if cache_path else None
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = USER_AGENT
+        # pool_block caps open connections per host at per_host; extra threads wait their turn
+        adapter = HTTPAdapter(pool_connections=64, pool_maxsize=per_host, pool_block=True, max_retries=1)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.stats = {"fetched": 0, "not_modified": 0, "cached": 0, "errors": 0, "bytes": 0}
+        self._lock = threading.Lock()
+
+    def _count(self, key, n=1):
+        with self._lock:
+            self.stats[key] += n
+
+    def _read(self, resp):
+        body = bytearray()
+        for chunk in resp.iter_content(CHUNK):
+            body += chunk
+            if len(body) >= self.max_bytes:
+                break
+        self._count("bytes", len(body))
+        return bytes(body[:self.max_bytes])
+
+    def fetch(self, url):
+        """Parsed page dict for url, or None when it can't be fetched"""
+        if urlparse(url).scheme not in ("http", "https"):
+            return None
+        cached = self.cache.get(url) if self.cache else None
+        if cached and cached[2].get("format") != PAGE_FORMAT:
+            cached = None
+        headers = {}
+        if cached:
+            etag, last_modified, page, fetched_at = cached
+            if time.time() - fetched_at < self.fresh_hours * 3600:
+                self._count("cached")
+                return page
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+        try:
+            with self.session.get(url, headers=headers, stream=True, timeout=self.timeout) as resp:
+                if resp.status_code == 304 and cached:
+                    self.cache.touch(url)
+                    self._count("not_modified")
+                    return cached[2]
+                resp.raise_for_status()
+                content_type = resp.headers.get("Content-Type", "")
+                if content_type.split(";")[0].strip().lower() in HTML_TYPES:
+                    page = parse_page(_decode(self._read(resp), content_type))
+                else:
+                    page = {"content_type": content_type.split(";")[0].strip().lower()}
+                page["final_url"] = resp.url
+                page["format"] = PAGE_FORMAT
+                etag, last_modified = resp.headers.get("ETag"), resp.headers.get("Last-Modified")
+        except Exception as e:
+            self._count("errors")
+            print(f"⚠️  Enrichment fetch failed for {url}: {type(e).__name__}")
+            return cached[2] if cached else None
+        if self.cache:
+            self.cache.put(url, etag, last_modified, page)
+        self._count("fetched")
+        return page
+
+    def fetch_many(self, urls):
+        """{url: page or None} for the distinct urls, fetched on a bounded thread pool"""
+        urls = list(dict.fromkeys(urls))
+        if not urls:
+            return {}
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=max(1, min(self.workers, len(urls)))) as pool:
+            return dict(zip(urls, pool.map(self.fetch, urls)))
+
+    def close(self):
+        self.session.close()
+        if self.cache:
+            self.cache.close()
+
+
+def enrich_row(row, page, future=True, min_year=2025):
+    """Fill Organization and Date Info from the landing page
+
+    Returns the updated row, or None when the page dates the item before
+    min_year (the snippet alone often carries no date) and nothing on it,
+    page text included, mentions min_year or later.
+    """
+    if not page or "text" not in page:
+        return row
+    row = dict(row)
+    if page.get("organization"):
+        row["Organization"] = page["organization"]
+    if not row.get("Description") and page.get("description"):
+        row["Description"] = page["description"]
+    # Structured dates first (deadline, event start; publication for reports), then the page text
+    candidates = list(page.get("dates", []))
+    if not future and page.get("published"):
+        candidates.append(page["published"])
+    stale = current = False
+    for i, text in enumerate(candidates + [page.get("text", "")]):
+        dated = extract_date(text, min_year=min_year, future=future)
+        if dated.kind is None and i < len(candidates):
+            # A structured date in a format the patterns can't read ("04/03/21"): dateutil dates it
+            year = parse_year(text)
+            stale |= bool(year) and year < min_year
+            current |= bool(year) and year >= min_year
+            continue
+        if dated.kind == "stale":
+            stale = True
+            continue
+        current |= dated.kind is not None
+        if dated.kind not in (None, "year"):
+            if row.get("Date Info") in (None, "", "—") or (
+                    dated.kind == "deadline" and not str(row["Date Info"]).startswith("Deadline")):
+                row["Date Info"] = dated.label
+            break
+    return None if stale and not current else row
@@ -0,0 +1,154 @@
+"""
+Expert index - one record per LinkedIn profile slug, persisted across weeks
+Search results are parsed by compiled title/snippet patterns and merged into the record, so regional
+mirrors and trailing slashes are one person and an expert is only ever featured once
+"""
+
+import json
+import re
+from pathlib import Path
+from urllib.parse import unquote
+
+PROFILE_URL = re.compile(r"^(?:https?://)?(?:[\w-]+\.)?linkedin\.com/in/([^/?#]+)", re.I)
+
+# "Name - Role - Org | LinkedIn", "Name – Role at Org | LinkedIn", "Name, Ph.D. - Org"; the separator
+# dash needs spaces around it so hyphenated names stay whole
+TITLE = re.compile(
+    r"^\s*(?P<name>.+?)(?:,[^–—|]*?)?"
+    r"(?:\s+[–—-]\s+(?P<first>[^–—|]+?))?"
+    r"(?:\s+[–—-]\s+(?P<second>[^–—|]+?))?"
+    r"\s*(?:\|.*)?$"
+)
+ROLE_AT = re.compile(r"^(?P<role>.+?)\s+(?:at|@)\s+(?P<org>.+)$", re.I)
+# "Experience: Org · Education: ..." or "... Head of X at Org. ..." in the snippet
+SNIPPET_ORG = re.compile(
+    r"\bExperience:\s*(?P<exp>[^·|]+?)\s*(?:[·|]|$)"
+    r"|\b(?:at|@)\s+(?P<at>[A-Z][^.·|,;:()]{1,60}?)\s*(?:[.·|,;:(]|\s+(?:with|where|since|and|in|for)\b|$)"
+)
+ROLE_WORDS = re.compile(
+    r"\b(?:director|head|lead|manager|officer|founder|ceo|cto|coo|cfo|chief|president|vp|chair|partner|"
+    r"advisor|adviser|consultant|specialist|analyst|coordinator|scientist|engineer|professor|researcher|"
+    r"fellow|associate|executive|strategist|board)\b", re.I
+)
+NOT_A_PERSON = re.compile(r"\b(?:jobs|careers|hiring)\b", re.I)
+
+EMPTY = "—"
+
+
+def profile_slug(url):
+    """Lowercase profile slug of a linkedin.com/in/ URL on any subdomain, or None"""
+    m = PROFILE_URL.match((url or "").strip())
+    return unquote(m.group(1)).lower() if m else None
+
+
+def profile_url(slug):
+    return f"https://www.linkedin.com/in/{slug}"
+
+
+def looks_like_person(name):
+    return len(name.split()) >= 2 and name[0].isupper() and not NOT_A_PERSON.search(name)
+
+
+def parse_profile(title, snippet=""):
+    """(name, role, organization) from a LinkedIn result; missing parts are EMPTY"""
+    m = TITLE.match(title or "")
+    if not m:
+        return (title or "").strip(), EMPTY, EMPTY
+    name = m.group("name").strip()
+    parts = [part for part in (m.group("first"), m.group("second")) if part and part.lower() != "linkedin"]
+    first, second = (parts + [None, None])[:2]
+    role = org = None
+    if first and second:
+        role, org = first, second
+    elif first:
+        at = ROLE_AT.match(first)
+        if at:
+            role, org = at.group("role"), at.group("org")
+        elif ROLE_WORDS.search(first):
+            role = first
+        else:
+            org = first
+    if not org and snippet:
+        s = SNIPPET_ORG.search(snippet)
+        if s:
+            org = s.group("exp") or s.group("at")
+    return name, (role or EMPTY).strip(), (org or EMPTY).strip()
+
+
+class ExpertIndex:
+    """Profile slug -> merged record; every lookup is a dict access
+
+    Each observation or feature is appended to a JSONL file as a partial record
+    and folded into the in-memory record on load, so the file only ever grows
+    by what a run learned. Newer non-empty fields win.
+    """
+
+    FIELDS = ("name", "role", "organization")
+
+    def __init__(self, path=None):
+        self.path = Path(path) if path else None
+        self.records = {}
+        self._pending = []
+        if self.path and self.path.exists():
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        self._merge(json.loads(line))
+
+    def __len__(self):
+        return len(self.records)
+
+    def __contains__(self, slug):
+        return slug in self.records
+
+    def get(self, slug):
+        return self.records.get(slug)
+
+    def _merge(self, update):
+        record = self.records.setdefault(update["slug"], {"slug": update["slug"], "name": EMPTY, "role": EMPTY,
+                                                         "organization": EMPTY, "urls": [], "featured": []})
+        for field in self.FIELDS:
+            if update.get(field) and update[field] != EMPTY:
+                record[field] = update[field]
+        if update.get("url") and update["url"] not in record["urls"]:
+            record["urls"].append(update["url"])
+        if "featured" in update and update["featured"] not in record["featured"]:
+            record["featured"].append(update["featured"])
+        for stamp in ("first_seen", "last_seen"):
+            if update.get(stamp):
+                record.setdefault("first_seen", update[stamp])
+                record["last_seen"] = update[stamp]
+        return record
+
+    def observe(self, url, name=None, role=None, organization=None, week=None):
+        """Merge one search result into its expert's record; None if url isn't a profile"""
+        slug = profile_slug(url)
+        if slug is None:
+            return None
+        known = self.records.get(slug)
+        update = {"slug": slug, "name": name, "role": role, "organization": organization, "url": url,
+                  "last_seen": week}
+        if known and url in known["urls"] and all(not update[f] or update[f] in (EMPTY, known[f])
+                                                  for f in self.FIELDS):
+            return known
+        self._pending.append({k: v for k, v in update.items() if v and v != EMPTY})
+        return self._merge(update)
+
+    def was_featured(self, slug):
+        record = self.records.get(slug)
+        return bool(record and record["featured"])
+
+    def feature(self, slug, week):
+        self._pending.append({"slug": slug, "featured": week})
+        self._merge({"slug": slug, "featured": week})
+
+    def save(self):
+        """Append observations made since the last save"""
+        if not self.path or not self._pending:
+            return 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            for update in self._pending:
+                f.write(json.dumps(update, ensure_ascii=False) + "\n")
+        saved, self._pending = len(self._pending), []
+        return saved
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Issue archive - every collected item of every week in one SQLite file, indexed by URL, domain, section and date
+Filled by each run and backfilled from weekly_data/archive/; answers history queries and re-renders past issues offline
+
+Run: python issue_archive.py upcoming --section grants --days 30 --deadlines
+     python issue_archive.py orgs --section events
+     python issue_archive.py find --org climatefund.org --since 2026-01-01
+     python issue_archive.py weeks
+     python issue_archive.py render 2026-02-02 -o issue.html
+     python issue_archive.py import           (backfill from weekly_data/archive and weekly_data/week)
+"""
+
+import argparse
+import json
+import sqlite3
+import sys
+import threading
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from urllib.parse import urlparse
+
+from date_extract import extract_date
+from weekly_store import canonical_url
+
+SECTIONS = ("grants", "events", "csr", "experts")
+URL_FIELDS = {"experts": "LinkedIn"}
+
+
+def url_field(section):
+    return URL_FIELDS.get(section, "URL")
+
+
+def item_date(row):
+    """(ISO date, kind) from a row's "Date Info" label; month-only dates fall on the 1st"""
+    info = extract_date(row.get("Date Info") or "", min_year=0)
+    if not info.year or not info.month:
+        return None, info.kind
+    try:
+        return date(info.year, info.month, info.day or 1).isoformat(), info.kind
+    except ValueError:
+        # An impossible date must not cost the run its archive write
+        return None, info.kind
+
+
+class IssueArchive:
+    """Thread-safe archive of items per (section, week, canonical URL)
+
+    A row collected again later in the same week replaces the stored item and
+    moves last_seen; first_seen keeps the day it was first collected.
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.executescript(
+            """CREATE TABLE IF NOT EXISTS items (
+                   section TEXT NOT NULL,
+                   week TEXT NOT NULL,
+                   key TEXT NOT NULL,
+                   url TEXT NOT NULL,
+                   domain TEXT NOT NULL,
+                   organization TEXT,
+                   title TEXT,
+                   date_iso TEXT,
+                   date_kind TEXT,
+                   score REAL,
+                   first_seen TEXT NOT NULL,
+                   last_seen TEXT NOT NULL,
+                   item TEXT NOT NULL,
+                   PRIMARY KEY (section, week, key)
+               );
+               CREATE INDEX IF NOT EXISTS idx_items_key ON items (key);
+               CREATE INDEX IF NOT EXISTS idx_items_domain ON items (domain, section);
+               CREATE INDEX IF NOT EXISTS idx_items_org ON items (organization COLLATE NOCASE, section);
+               CREATE INDEX IF NOT EXISTS idx_items_date ON items (section, date_iso);
+               CREATE INDEX IF NOT EXISTS idx_items_week ON items (week, section);
+               CREATE TABLE IF NOT EXISTS issues (
+                   week TEXT PRIMARY KEY,
+                   sent_at TEXT
+               );"""
+        )
+        self._conn.commit()
+
+    def record(self, section, rows, week, seen_at=None):
+        """Upsert a run's rows for one section and week; returns how many were new"""
+        seen_at = seen_at or datetime.now().isoformat(timespec="seconds")
+        field = url_field(section)
+        values = []
+        for row in rows:
+            url = row.get(field) or ""
+            key = canonical_url(url)
+            if not key:
+                continue
+            date_iso, kind = item_date(row)
+            values.append((section, week, key, url, urlparse(key).netloc, row.get("Organization"),
+                           row.get("Title") or row.get("Name"), date_iso, kind, row.get("Score"),
+                           seen_at, seen_at, json.dumps(row, ensure_ascii=False)))
+        with self._lock:
+            existing = {key for (key,) in self._conn.execute(
+                "SELECT key FROM items WHERE section = ? AND week = ?", (section, week))}
+            self._conn.executemany(
+                """INSERT INTO items VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT (section, week, key) DO UPDATE SET
+                       url = excluded.url, domain = excluded.domain, organization = excluded.organization,
+                       title = excluded.title, date_iso = excluded.date_iso, date_kind = excluded.date_kind,
+                       score = excluded.score, last_seen = excluded.last_seen, item = excluded.item""",
+                values,
+            )
+            self._conn.execute("INSERT OR IGNORE INTO issues (week) VALUES (?)", (week,))
+            self._conn.commit()
+        return len({v[2] for v in values} - existing)
+
+    def mark_sent(self, week, sent_at=None):
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO issues VALUES (?, ?) ON CONFLICT (week) DO UPDATE SET sent_at = excluded.sent_at",
+                (week, sent_at or datetime.now().isoformat(timespec="seconds")),
+            )
+            self._conn.commit()
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(sql, params)]
+
+    def find(self, section=None, org=None, url=None, since=None, until=None, week=None, kind=None, limit=None,
+             latest=False):
+        """Items matching every given filter, soonest dated first; org matches domain or organization name.
+        latest keeps one row per item, from the last week it was collected"""
+        where, params = [], []
+        if section:
+            where.append("section = ?")
+            params.append(section)
+        if org:
+            where.append("(domain = ? OR organization = ? COLLATE NOCASE)")
+            params += [org.lower().removeprefix("www."), org]
+        if url:
+            where.append("key = ?")
+            params.append(canonical_url(url))
+        if since:
+            where.append("date_iso >= ?")
+            params.append(since)
+        if until:
+            where.append("date_iso <= ?")
+            params.append(until)
+        if week:
+            where.append("week = ?")
+            params.append(week)
+        if kind:
+            where.append("date_kind = ?")
+            params.append(kind)
+        sql = ("SELECT *, MAX(week) AS latest_week" if latest else "SELECT *") + " FROM items"
+        sql += (" WHERE " + " AND ".join(where) if where else "") + (" GROUP BY section, key" if latest else "")
+        sql += " ORDER BY date_iso IS NULL, date_iso, week DESC, title"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        return self._query(sql, params)
+
+    def upcoming(self, section, days=30, today=None, deadlines=False):
+        """Items dated within the next `days` days, e.g. grants whose deadline is coming up"""
+        today = today or date.today()
+        return self.find(section=section, since=today.isoformat(), until=(today + timedelta(days=days)).isoformat(),
+                         kind="deadline" if deadlines else None, latest=True)
+
+    def organizations(self, section=None):
+        """(organization or domain, items, weeks) per organization, most items first"""
+        sql = ("SELECT COALESCE(NULLIF(organization, '—'), domain) AS org, COUNT(*) AS items, "
+               "COUNT(DISTINCT week) AS weeks FROM items")
+        params = ()
+        if section:
+            sql += " WHERE section = ?"
+            params = (section,)
+        return self._query(sql + " GROUP BY org ORDER BY items DESC, org", params)
+
+    def weeks(self):
+        return self._query(
+            "SELECT week, sent_at, (SELECT COUNT(*) FROM items WHERE items.week = issues.week) AS items "
+            "FROM issues ORDER BY week DESC"
+        )
+
+    def issue(self, week):
+        """{section: [row, ...]} for a week, in the order items were first collected"""
+        issue = {section: [] for section in SECTIONS}
+        for row in self._query("SELECT section, item FROM items WHERE week = ? ORDER BY first_seen, rowid", (week,)):
+            issue.setdefault(row["section"], []).append(json.loads(row["item"]))
+        return issue
+
+    def import_store(self, folder, week):
+        """Backfill one week from a WeeklyStore folder (the current week or an archived one)"""
+        from weekly_store import WeeklyStore
+        store = WeeklyStore(folder)
+        seen_at = f"{week}T00:00:00"
+        return sum(self.record(section, store.load(section), week, seen_at=seen_at) for section in SECTIONS)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def render_issue(archive, week, sent_at=None):
+    """Re-render a past issue from the archive, no searches involved"""
+    from email_template import generate_email_html
+    issue = archive.issue(week)
+    if sent_at:
+        sent = datetime.fromisoformat(sent_at)
+    else:
+        # The week's issue goes out on the Monday after it starts
+        sent = datetime.fromisoformat(week) + timedelta(days=7)
+    return generate_email_html(issue["experts"], issue["grants"], issue["events"], issue["csr"], today=sent)
+
+
+def print_items(items):
+    for item in items:
+        print(f"{item['date_iso'] or '—':<10}  {item['section']:<7}  {item['week']}  "
+              f"{(item['title'] or '')[:70]:<70}  {item['domain']}  {item['url']}")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Query the archive of every collected newsletter item")
+    ap.add_argument("--db", default="weekly_data/archive.sqlite", help="archive file")
+    ap.add_argument("--json", action="store_true", help="print JSON instead of a table")
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("upcoming", help="items dated within the next N days")
+    p.add_argument("--section", default="grants", choices=SECTIONS)
+    p.add_argument("--days", type=int, default=30)
+    p.add_argument("--deadlines", action="store_true", help="only items with a deadline date")
+
+    p = sub.add_parser("find", help="items by section, organization, URL, date range or week")
+    p.add_argument("--section", choices=SECTIONS)
+    p.add_argument("--org", help="domain (climatefund.org) or organization name")
+    p.add_argument("--url")
+    p.add_argument("--since", help="earliest item date, YYYY-MM-DD")
+    p.add_argument("--until", help="latest item date, YYYY-MM-DD")
+    p.add_argument("--week", help="collection week start, YYYY-MM-DD")
+    p.add_argument("--limit", type=int)
+
+    p = sub.add_parser("orgs", help="item counts per organization")
+    p.add_argument("--section", choices=SECTIONS)
+
+    sub.add_parser("weeks", help="archived weeks and when they were sent")
+
+    p = sub.add_parser("render", help="re-render a past issue as HTML")
+    p.add_argument("week", help="collection week start, YYYY-MM-DD")
+    p.add_argument("-o", "--output", help="write here instead of stdout")
+
+    p = sub.add_parser("import", help="backfill from the weekly store and its archive")
+    p.add_argument("--data", default="weekly_data", help="folder holding week/, archive/ and state.json")
+
+    args = ap.parse_args(argv)
+    archive = IssueArchive(args.db)
+    start = time.perf_counter()
+    try:
+        if args.command == "upcoming":
+            result = archive.upcoming(args.section, days=args.days, deadlines=args.deadlines)
+        elif args.command == "find":
+            result = archive.find(section=args.section, org=args.org, url=args.url, since=args.since,
+                                  until=args.until, week=args.week, limit=args.limit)
+        elif args.command == "orgs":
+            result = archive.organizations(args.section)
+        elif args.command == "weeks":
+            result = archive.weeks()
+        elif args.command == "render":
+            sent = {w["week"]: w["sent_at"] for w in archive.weeks()}.get(args.week)
+            markup = render_issue(archive, args.week, sent)
+            if args.output:
+                Path(args.output).write_text(markup, encoding="utf-8")
+                print(f"Rendered week of {args.week} to {args.output}")
+            else:
+                sys.stdout.write(markup)
+            return
+        else:
+            data = Path(args.data)
+            added = 0
+            for folder in sorted(p for p in (data / "archive").glob("*") if p.is_dir()):
+                added += archive.import_store(folder, folder.name)
+            state_path = data / "state.json"
+            week = json.loads(state_path.read_text(encoding="utf-8")).get("week_start_date") if state_path.exists() else None
+            if week and (data / "week").is_dir():
+                added += archive.import_store(data / "week", week)
+            print(f"Imported {added} items into {args.db}")
+            return
+    finally:
+        archive.close()
+    elapsed = (time.perf_counter() - start) * 1000
+    if args.json:
+        print(json.dumps(result, indent=2, ensure_ascii=False))
+    elif args.command in ("orgs", "weeks"):
+        for row in result:
+            print("  ".join(str(v if v is not None else "—") for v in row.values()))
+    else:
+        print_items(result)
+    print(f"{len(result)} rows in {elapsed:.1f} ms", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
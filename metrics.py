@@ -0,0 +1,172 @@
+"""
+Run metrics - per-query latency and result counts, per-stage wall time and why candidates were rejected
+One JSON record per run is appended to weekly_data/metrics.jsonl and summarized at the end of the run;
+PROFILE=cpu (cProfile) or PROFILE=memory (tracemalloc) also dumps the hot spots
+"""
+
+import json
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+
+ACCEPTED = "accepted"
+# Why a search result did not make it into the newsletter
+DUPLICATE = "duplicate"
+IRRELEVANT = "irrelevant"
+OVER_CAP = "over_cap"
+TOO_OLD = "too_old"
+NOT_A_PERSON = "not_a_person"
+NOT_A_PROFILE = "not_a_profile"
+TOO_OLD_PAGE = "too_old_page"
+
+
+class Metrics:
+    """Thread-safe collector for one pipeline run"""
+
+    def __init__(self):
+        self.started = time.time()
+        self.queries = []
+        self.stages = {}
+        self.outcomes = {}
+        self.emails = {}
+        self.backend_ms = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name):
+        """Time a block; repeated stages add up"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.stages[name] = self.stages.get(name, 0.0) + elapsed
+
+    def query(self, query, num, source, seconds, results, error=None):
+        """source: "cache", "network", "stale" (quota spent or search failed), "skipped" (left to the
+        cache by the query scheduler) or "empty" (nothing to fall back on)"""
+        record = {"query": query, "num": num, "source": source,
+                  "ms": round(seconds * 1000, 1), "results": results}
+        if error:
+            record["error"] = error
+        with self._lock:
+            self.queries.append(record)
+
+    def outcome(self, section, keyword, reason, n=1):
+        with self._lock:
+            counts = self.outcomes.setdefault(section, {}).setdefault(keyword, Counter())
+            counts[reason] += n
+
+    def email(self, issue, sizes):
+        """Byte sizes of an issue's email: raw and optimized HTML, text part, cards trimmed to fit"""
+        with self._lock:
+            self.emails[issue] = sizes
+
+    def backend(self, latencies):
+        """Seconds each search backend call took this run, kept so the next run can hedge from the start"""
+        with self._lock:
+            self.backend_ms = [round(s * 1000, 1) for s in latencies]
+
+    def rejections(self, section):
+        total = Counter()
+        for counts in self.outcomes.get(section, {}).values():
+            total.update(counts)
+        total.pop(ACCEPTED, None)
+        return total
+
+    def record(self):
+        with self._lock:
+            return {
+                "started": self.started,
+                "seconds": round(time.time() - self.started, 3),
+                "stages": {k: round(v, 4) for k, v in self.stages.items()},
+                "queries": list(self.queries),
+                "outcomes": {s: {kw: dict(c) for kw, c in kws.items()} for s, kws in self.outcomes.items()},
+                "emails": dict(self.emails),
+                "backend_ms": list(self.backend_ms),
+            }
+
+    def save(self, path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(self.record(), ensure_ascii=False) + "\n")
+
+    def summary(self, slowest=5):
+        """Lines for the end-of-run report"""
+        lines = ["⏱️  Stages: " + ", ".join(f"{name} {secs:.2f}s" for name, secs in
+                                           sorted(self.stages.items(), key=lambda kv: -kv[1]))]
+        sources = Counter(q["source"] for q in self.queries)
+        errors = sum(1 for q in self.queries if "error" in q)
+        lines.append(f"🔍 Queries: {len(self.queries)} ({', '.join(f'{n} {s}' for s, n in sources.most_common())}"
+                     f"{f', {errors} errors' if errors else ''})")
+        network = sorted((q for q in self.queries if q["source"] != "cache"), key=lambda q: -q["ms"])
+        for q in network[:slowest]:
+            lines.append(f"    {q['ms']:>8.0f} ms  {q['results']:>2} results  {q['query']}")
+        for section in self.outcomes:
+            accepted = sum(c[ACCEPTED] for c in self.outcomes[section].values())
+            rejected = self.rejections(section)
+            lines.append(f"🧮 {section}: {accepted} accepted; rejected " +
+                         (", ".join(f"{n} {reason}" for reason, n in rejected.most_common()) or "none"))
+        # Keywords whose results never make it in are wasted search budget
+        wasted = [kw for kws in self.outcomes.values() for kw, c in kws.items() if not c[ACCEPTED] and sum(c.values())]
+        if wasted:
+            lines.append(f"🪫 No accepted rows from: {', '.join(wasted)}")
+        return lines
+
+
+def recent_latencies(path, limit=200):
+    """Backend call latencies in seconds from the latest runs in metrics.jsonl, oldest first"""
+    path = Path(path)
+    if not path.exists():
+        return []
+    samples = []
+    for line in reversed(path.read_text(encoding="utf-8").splitlines()):
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        samples[:0] = [ms / 1000 for ms in record.get("backend_ms", ())]
+        if len(samples) >= limit:
+            break
+    return samples[-limit:]
+
+
+@contextmanager
+def profiled(mode, folder, top=25):
+    """PROFILE=cpu writes cProfile's top functions, PROFILE=memory tracemalloc's top allocation sites"""
+    if mode not in ("cpu", "memory"):
+        yield
+        return
+    path = Path(folder) / f"profile-{mode}.txt"
+    if mode == "cpu":
+        import cProfile
+        import io
+        import pstats
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            out = io.StringIO()
+            pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(top)
+            path.write_text(out.getvalue(), encoding="utf-8")
+            print(f"🔥 CPU profile (top {top} by cumulative time) saved to {path}")
+    else:
+        import tracemalloc
+        tracemalloc.start(10)
+        try:
+            yield
+        finally:
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            stats = snapshot.statistics("lineno")[:top]
+            lines = [f"current {current / 2 ** 20:.1f} MB, peak {peak / 2 ** 20:.1f} MB"]
+            lines += [str(stat) for stat in stats]
+            path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+            print(f"🔥 Memory profile (peak {peak / 2 ** 20:.1f} MB, top {top} sites) saved to {path}")
@@ -0,0 +1,405 @@
+"""
+PDF report metadata - title, publication year and company of a CSR/ESG PDF without downloading it
+Reads the tail (trailer, xref) and the first pages with HTTP Range requests into a sparse, memory-mapped
+spool file; results are cached by a hash of the file's size and tail, so each report is fetched once, and a
+URL is trusted for URL_TTL before its tail is read again to catch a report replaced under the same name
+"""
+
+import hashlib
+import json
+import mmap
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+import zlib
+
+TAIL_BYTES = 64 * 1024
+HEAD_BYTES = 256 * 1024
+OBJ_BYTES = 16 * 1024
+MAX_STREAMS = 8
+MAX_INFLATED = 256 * 1024
+MAX_TEXT = 2000
+WORKERS = 4
+TIMEOUT = (5, 20)
+# How long a URL's cached metadata is served without a request; then one tail read revalidates it
+URL_TTL = 7 * 24 * 3600
+
+_CONTENT_RANGE = re.compile(r"bytes (\d+)-(\d+)/(\d+)")
+_STARTXREF = re.compile(rb"startxref\s+(\d+)")
+_REF = rb"\s+(\d+)\s+\d+\s+R"
+_INFO_REF = re.compile(rb"/Info" + _REF)
+_XREF_SECTION = re.compile(rb"\s*(\d+) (\d+)[ \t]*\r?\n")
+_PDF_DATE = re.compile(rb"D:(\d{4})(\d{2})?(\d{2})?")
+_YEAR = re.compile(rb"(?<!\d)(20\d{2})(?!\d)")
+_STREAM = re.compile(rb"<<((?:(?!<<|>>).|<<(?:(?!>>).)*>>)*)>>\s*stream\r?\n", re.S)
+_TEXT_OP = re.compile(rb"(\((?:\\.|[^\\)])*\))\s*Tj|\[((?:\\.|[^\]])*)\]\s*TJ", re.S)
+_LITERAL = re.compile(rb"\((?:\\.|[^\\)])*\)", re.S)
+_XMP = {
+    "title": re.compile(rb"<dc:title>.*?<rdf:li[^>]*>(.*?)</rdf:li>", re.S),
+    "company": re.compile(rb"<dc:publisher>.*?<rdf:li[^>]*>(.*?)</rdf:li>", re.S),
+    "created": re.compile(rb"<xmp:CreateDate>(\d{4}-\d{2}-\d{2})"),
+}
+_ESCAPES = {b"n": b"\n", b"r": b"\r", b"t": b"\t", b"b": b"\b", b"f": b"\f"}
+
+
+class Spool:
+    """Sparse temp file as large as the PDF, memory-mapped; fetched ranges land at their real offsets"""
+
+    def __init__(self, size):
+        self.size = size
+        self.file = tempfile.TemporaryFile()
+        self.file.truncate(size)
+        self.map = mmap.mmap(self.file.fileno(), size)
+        self.ranges = []
+
+    def write(self, start, data):
+        data = data[:self.size - start]
+        self.map[start:start + len(data)] = data
+        self.ranges.append((start, start + len(data)))
+
+    def has(self, start, end):
+        return any(a <= start and min(end, self.size) <= b for a, b in self.ranges)
+
+    def search(self, pattern, last=False):
+        """First (or last) match of pattern inside the fetched ranges, never the unfetched zeros"""
+        found = None
+        for a, b in sorted(self.ranges):
+            for m in pattern.finditer(self.map, a, b):
+                if not last:
+                    return m
+                found = m
+        return found
+
+    def close(self):
+        self.map.close()
+        self.file.close()
+
+
+def _literal(raw):
+    """Decode a PDF literal string body (no parentheses)"""
+    out, i = bytearray(), 0
+    while i < len(raw):
+        c = raw[i:i + 1]
+        if c != b"\\":
+            out += c
+            i += 1
+            continue
+        nxt = raw[i + 1:i + 2]
+        if nxt in _ESCAPES:
+            out += _ESCAPES[nxt]
+            i += 2
+        elif nxt.isdigit():
+            octal = re.match(rb"[0-7]{1,3}", raw[i + 1:i + 4]).group(0)
+            out.append(int(octal, 8) & 0xFF)
+            i += 1 + len(octal)
+        elif nxt in (b"\r", b"\n"):
+            i += 2
+        else:
+            out += nxt
+            i += 2
+    return bytes(out)
+
+
+def pdf_string(buf, pos):
+    """Text of the PDF string (literal or hex) starting at buf[pos], or None"""
+    while pos < len(buf) and buf[pos:pos + 1].isspace():
+        pos += 1
+    opener = buf[pos:pos + 1]
+    if opener == b"(":
+        depth, i = 0, pos
+        while i < len(buf):
+            c = buf[i:i + 1]
+            if c == b"\\":
+                i += 2
+                continue
+            depth += (c == b"(") - (c == b")")
+            if depth == 0:
+                break
+            i += 1
+        data = _literal(buf[pos + 1:i])
+    elif opener == b"<" and buf[pos + 1:pos + 2] != b"<":
+        end = buf.find(b">", pos)
+        digits = re.sub(rb"\s+", b"", buf[pos + 1:end])
+        try:
+            data = bytes.fromhex((digits + b"0" * (len(digits) % 2)).decode("ascii"))
+        except ValueError:
+            return None
+    else:
+        return None
+    if data.startswith(b"\xfe\xff"):
+        return data[2:].decode("utf-16-be", "replace").strip()
+    return data.decode("latin-1").strip()
+
+
+def _object(spool, num):
+    """Byte span of "num 0 obj ... endobj" in the spool, or None"""
+    m = spool.search(re.compile(rb"(?<!\d)%d\s+0\s+obj" % num))
+    if not m:
+        return None
+    stop = spool.map.find(b"endobj", m.end())
+    return m.end(), stop if stop != -1 else min(spool.size, m.end() + OBJ_BYTES)
+
+
+def xref_offset(buf, xref_at, num):
+    """Offset of object num from a classic xref table at xref_at, or None"""
+    if buf[xref_at:xref_at + 4] != b"xref":
+        return None
+    pos = xref_at + 4
+    while True:
+        m = _XREF_SECTION.match(buf, pos)
+        if not m:
+            return None
+        first, count = int(m.group(1)), int(m.group(2))
+        if first <= num < first + count:
+            entry = buf[m.end() + (num - first) * 20:m.end() + (num - first) * 20 + 18]
+            return int(entry[:10]) if entry[17:18] == b"n" else None
+        pos = m.end() + count * 20
+
+
+def _pdf_date(value):
+    m = _PDF_DATE.match(value.encode("latin-1", "replace")) if value else None
+    if not m:
+        return None
+    year, month, day = m.group(1).decode(), (m.group(2) or b"01").decode(), (m.group(3) or b"01").decode()
+    return f"{year}-{month}-{day}"
+
+
+def parse_info(buf, span):
+    """Title / Author / Company / CreationDate from the Info dictionary at span"""
+    info = {}
+    start, end = span
+    for key in ("Title", "Author", "Company", "Subject", "CreationDate", "ModDate"):
+        m = re.compile(rb"/%s(?![A-Za-z])" % key.encode()).search(buf, start, end)
+        if m:
+            value = pdf_string(buf, m.end())
+            if value:
+                info[key] = value
+    return info
+
+
+def first_page_text(buf, start, end):
+    """Text shown with Tj/TJ in the first Flate content streams of buf[start:end]"""
+    chunks, streams = [], 0
+    for m in _STREAM.finditer(buf, start, end):
+        header = m.group(1)
+        if b"/FlateDecode" not in header or re.search(rb"/Subtype\s*/Image|/Type\s*/(?:XRef|ObjStm)|/Length1", header):
+            continue
+        try:
+            data = zlib.decompressobj().decompress(buf[m.end():min(end, m.end() + HEAD_BYTES)], MAX_INFLATED)
+        except zlib.error:
+            continue
+        for op in _TEXT_OP.finditer(data):
+            if op.group(1):
+                chunks.append(_literal(op.group(1)[1:-1]))
+            else:
+                chunks += [_literal(s[1:-1]) for s in _LITERAL.findall(op.group(2))]
+        streams += 1
+        if streams >= MAX_STREAMS or sum(map(len, chunks)) >= MAX_TEXT:
+            break
+    text = b" ".join(chunks).decode("latin-1")
+    return re.sub(r"\s+", " ", text).strip()[:MAX_TEXT]
+
+
+def extract(spool):
+    """Metadata from whatever ranges the spool holds"""
+    buf = spool.map
+    info = {}
+    # The last trailer wins (incremental updates append newer ones)
+    m = spool.search(_INFO_REF, last=True)
+    span = _object(spool, int(m.group(1))) if m else None
+    if span:
+        info = parse_info(buf, span)
+    xmp = {}
+    for key, pattern in _XMP.items():
+        hit = spool.search(pattern)
+        if hit:
+            xmp[key] = re.sub(rb"<[^>]+>", b"", hit.group(1)).decode("utf-8", "replace").strip()
+
+    title = info.get("Title") or xmp.get("title") or ""
+    created = _pdf_date(info.get("CreationDate")) or xmp.get("created")
+    text = first_page_text(buf, 0, min(spool.size, HEAD_BYTES))
+    # Publication year: the latest of the title's years and the creation date; else the cover text
+    years = [int(y) for y in _YEAR.findall(title.encode("latin-1", "replace"))]
+    if created:
+        years.append(int(created[:4]))
+    if not years:
+        years = [int(y) for y in _YEAR.findall(text.encode("latin-1", "replace"))[:5]]
+    return {
+        "title": title,
+        "company": info.get("Company") or xmp.get("company") or info.get("Author"),
+        "year": max(years) if years else None,
+        "created": created,
+        "text": text,
+    }
+
+
+class ReportCache:
+    """url -> content key, content key -> metadata; a mirror of a known report costs one tail read"""
+
+    def __init__(self, path):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS urls (url TEXT PRIMARY KEY, content_key TEXT NOT NULL, "
+                           "checked_at REAL NOT NULL DEFAULT 0)")
+        if "checked_at" not in {row[1] for row in self._conn.execute("PRAGMA table_info(urls)")}:
+            # Caches from before URL_TTL: every URL gets revalidated on its next read
+            self._conn.execute("ALTER TABLE urls ADD COLUMN checked_at REAL NOT NULL DEFAULT 0")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS reports (
+                   content_key TEXT PRIMARY KEY,
+                   payload TEXT NOT NULL,
+                   fetched_at REAL NOT NULL
+               )"""
+        )
+        self._conn.commit()
+
+    def by_url(self, url, max_age=URL_TTL):
+        """Metadata for url if its content was checked within max_age seconds"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload FROM urls JOIN reports USING (content_key) WHERE url = ? AND checked_at >= ?",
+                (url, time.time() - max_age),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def by_key(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT payload FROM reports WHERE content_key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, url, key, meta=None):
+        with self._lock:
+            if meta is not None:
+                self._conn.execute("INSERT OR REPLACE INTO reports VALUES (?, ?, ?)",
+                                   (key, json.dumps(meta, ensure_ascii=False), time.time()))
+            self._conn.execute("INSERT OR REPLACE INTO urls VALUES (?, ?, ?)", (url, key, time.time()))
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class PdfMetaReader:
+    """Range-request PDF metadata reader with a content-hash cache
+
+    Per report: one request for the last TAIL_BYTES (trailer, xref, usually the
+    Info dictionary), one for the first HEAD_BYTES (cover page, XMP), and one
+    more only if the xref points the Info dictionary somewhere else. Servers
+    without Range support are read up to HEAD_BYTES and then dropped. A cached
+    URL older than url_ttl costs the tail request again; an unchanged tail is
+    served from the cache, a new one (next year's report) is read afresh.
+    """
+
+    def __init__(self, cache_path=None, session=None, workers=WORKERS, timeout=TIMEOUT, url_ttl=URL_TTL):
+        if session is None:
+            import requests
+            session = requests.Session()
+        self.session = session
+        self.workers = workers
+        self.timeout = timeout
+        self.cache = ReportCache(cache_path) if cache_path else None
+        self.url_ttl = url_ttl
+        self.stats = {"fetched": 0, "cached": 0, "same_content": 0, "errors": 0, "bytes": 0, "requests": 0}
+        self._lock = threading.Lock()
+
+    def _count(self, key, n=1):
+        with self._lock:
+            self.stats[key] += n
+
+    def _get(self, url, start=None, end=None, suffix=None, limit=HEAD_BYTES):
+        """(status, content_range_total, start, bytes) for one ranged GET, reading at most limit bytes"""
+        rng = f"bytes=-{suffix}" if suffix else f"bytes={start}-{end}"
+        self._count("requests")
+        with self.session.get(url, headers={"Range": rng}, stream=True, timeout=self.timeout) as resp:
+            resp.raise_for_status()
+            body = bytearray()
+            for chunk in resp.iter_content(16 * 1024):
+                body += chunk
+                if len(body) >= limit:
+                    break
+            self._count("bytes", len(body))
+            m = _CONTENT_RANGE.match(resp.headers.get("Content-Range", ""))
+            if resp.status_code == 206 and m:
+                return 206, int(m.group(3)), int(m.group(1)), bytes(body)
+            return resp.status_code, None, 0, bytes(body[:limit])
+
+    def read(self, url):
+        """Metadata dict for the PDF at url, or None if it can't be read"""
+        if self.cache:
+            cached = self.cache.by_url(url, self.url_ttl)
+            if cached is not None:
+                self._count("cached")
+                return cached
+        try:
+            status, total, tail_start, tail = self._get(url, suffix=TAIL_BYTES)
+            if status != 206:
+                # No Range support: what we read is the first HEAD_BYTES of the file
+                total, tail_start = len(tail), 0
+            key = hashlib.sha1(b"%d\n" % total + tail).hexdigest()
+            if self.cache:
+                known = self.cache.by_key(key)
+                if known is not None:
+                    self.cache.put(url, key)
+                    self._count("same_content")
+                    return known
+            spool = Spool(max(total, 1))
+            try:
+                spool.write(tail_start, tail)
+                if status == 206 and tail_start > 0:
+                    _, _, start, head = self._get(url, 0, min(HEAD_BYTES, tail_start) - 1)
+                    spool.write(start, head)
+                    self._fetch_info(url, spool)
+                meta = extract(spool)
+            finally:
+                spool.close()
+        except Exception as e:
+            self._count("errors")
+            print(f"⚠️  PDF metadata failed for {url}: {type(e).__name__}")
+            return None
+        meta["content_key"] = key
+        if self.cache:
+            self.cache.put(url, key, meta)
+        self._count("fetched")
+        return meta
+
+    def _fetch_info(self, url, spool):
+        """Range-read the Info object when the xref places it outside what we already have"""
+        xref, info = spool.search(_STARTXREF, last=True), spool.search(_INFO_REF, last=True)
+        if not (xref and info):
+            return
+        num, at = int(info.group(1)), int(xref.group(1))
+        if _object(spool, num) or not spool.has(at, at + 4):
+            return
+        offset = xref_offset(spool.map, at, num)
+        if offset is not None and not spool.has(offset, offset + OBJ_BYTES):
+            _, _, start, data = self._get(url, offset, min(spool.size, offset + OBJ_BYTES) - 1, limit=OBJ_BYTES)
+            spool.write(start, data)
+
+    def read_many(self, urls):
+        urls = list(dict.fromkeys(urls))
+        if not urls:
+            return {}
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=max(1, min(self.workers, len(urls)))) as pool:
+            return dict(zip(urls, pool.map(self.read, urls)))
+
+    def close(self):
+        if self.cache:
+            self.cache.close()
+
+
+def as_page(meta):
+    """Shape metadata like an enrichment page, so enrich_row dates and filters PDFs the same way"""
+    if not meta:
+        return None
+    return {
+        "title": meta["title"],
+        "organization": meta["company"],
+        "description": None,
+        "dates": [],
+        "published": meta["created"],
+        "text": f"{meta['title']} {meta['text']}".strip(),
+    }
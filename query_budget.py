@@ -0,0 +1,118 @@
+"""
+Query budget - per-keyword yield statistics kept across runs in weekly_data/keyword_yield.json
+Ranks which searches get the day's network budget, how many results each keyword contributes
+and how long a low-yield keyword's cached results are trusted
+"""
+
+import json
+from pathlib import Path
+
+from metrics import ACCEPTED, DUPLICATE
+
+# Weight of the latest run in the moving averages
+ALPHA = 0.4
+# Runs a keyword needs before its history changes anything
+MIN_RUNS = 2
+# Unseen keywords are assumed to do well, so they get searched and measured
+PRIOR_YIELD = 2.0
+# Below this many accepted rows per run (or above this duplicate rate) a keyword is low-yield
+LOW_YIELD = 0.5
+HIGH_DUPLICATE_RATE = 0.8
+# Low-yield keywords are re-searched this many times less often
+LOW_YIELD_TTL_FACTOR = 4
+
+
+class YieldStats:
+    """Moving averages of accepted rows per run and duplicate rate, per query"""
+
+    def __init__(self, path=None):
+        self.path = Path(path) if path else None
+        self.keywords = {}
+        if self.path and self.path.exists():
+            try:
+                self.keywords = json.loads(self.path.read_text(encoding="utf-8"))
+            except ValueError:
+                self.keywords = {}
+
+    def __len__(self):
+        return len(self.keywords)
+
+    def _known(self, query):
+        entry = self.keywords.get(query)
+        return entry if entry and entry["runs"] >= MIN_RUNS else None
+
+    def expected(self, query):
+        """Accepted rows this query is expected to add in a run"""
+        entry = self._known(query)
+        return entry["accepted"] if entry else PRIOR_YIELD
+
+    def duplicate_rate(self, query):
+        entry = self._known(query)
+        return entry["duplicate_rate"] if entry else 0.0
+
+    def priority(self, query):
+        """Expected new rows per network call; what the budget is spent by"""
+        return self.expected(query) * (1 - self.duplicate_rate(query))
+
+    def is_low_yield(self, query):
+        return (self._known(query) is not None and
+                (self.expected(query) < LOW_YIELD or self.duplicate_rate(query) > HIGH_DUPLICATE_RATE))
+
+    def take(self, query, base):
+        """How many of a query's results go into the candidate pool: base for unproven
+        keywords, down to base // 2 for ones that yield nothing, up to 2 * base for the best"""
+        if not self._known(query):
+            return base
+        return max(max(1, base // 2), min(2 * base, round(base / 2 + self.expected(query))))
+
+    def ttl(self, query, ttl_hours):
+        """Cache TTL for a query; low-yield keywords keep their cached results longer"""
+        return ttl_hours * LOW_YIELD_TTL_FACTOR if self.is_low_yield(query) else ttl_hours
+
+    def update(self, outcomes, queries, uses=None):
+        """Fold one run's Metrics.outcomes ({section: {query: Counter(reason)}}) into the averages;
+        only the given queries count, and a query that was looked at but yielded nothing counts as 0.
+        uses ({section: {query: editions}}, see editions.query_uses) averages a query's counts over
+        the editions that judged its results, so sharing a keyword doesn't multiply its yield"""
+        counts = {}
+        for section, by_query in outcomes.items():
+            for query, reasons in by_query.items():
+                n = max(1, (uses or {}).get(section, {}).get(query, 1))
+                counts.setdefault(query, []).append((reasons, n))
+        for query in queries:
+            seen = sum(sum(r.values()) / n for r, n in counts.get(query, ()))
+            accepted = sum(r[ACCEPTED] / n for r, n in counts.get(query, ()))
+            duplicates = sum(r[DUPLICATE] / n for r, n in counts.get(query, ()))
+            entry = self.keywords.get(query)
+            dup_rate = duplicates / seen if seen else 0.0
+            if entry is None:
+                self.keywords[query] = {"runs": 1, "accepted": float(accepted), "duplicate_rate": dup_rate}
+                continue
+            entry["runs"] += 1
+            entry["accepted"] = round((1 - ALPHA) * entry["accepted"] + ALPHA * accepted, 4)
+            if seen:
+                entry["duplicate_rate"] = round((1 - ALPHA) * entry["duplicate_rate"] + ALPHA * dup_rate, 4)
+
+    def save(self):
+        if not self.path:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps(self.keywords, indent=2, sort_keys=True), encoding="utf-8")
+
+
+def schedule(jobs, yields):
+    """Order (section, query, ...) cache-miss jobs for the network budget
+
+    Each job's priority is its expected new rows divided by its rank within its
+    section, so every section's best keyword comes before any section's third
+    best, and a section full of low-yield keywords still gets its top one.
+    """
+    by_section = {}
+    for job in jobs:
+        by_section.setdefault(job[0], []).append(job)
+    keyed = []
+    for section_jobs in by_section.values():
+        section_jobs.sort(key=lambda job: -yields.priority(job[1]))
+        keyed += [(yields.priority(job[1]) / (rank + 1), job) for rank, job in enumerate(section_jobs)]
+    keyed.sort(key=lambda kv: -kv[0])
+    return [job for _, job in keyed]
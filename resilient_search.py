@@ -0,0 +1,237 @@
+"""
+Resilient search - retries with backoff, a shared token bucket, hedged requests and a circuit breaker around a backend
+Retryable errors (rate limits, timeouts, dropped connections) are retried; fatal ones fail at once; a run of
+failures opens the breaker so the rest of the run falls back to cached results instead of waiting on a dead backend
+"""
+
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from search_backends import RetryableSearchError, SearchError
+
+# Exception class names (from ddgs, requests, httpx...) that mean "try again later"
+RETRYABLE_NAMES = ("ratelimit", "timeout", "temporar", "connection", "unavailable", "toomanyrequests")
+
+
+class CircuitOpenError(SearchError):
+    """The breaker is open; the backend isn't being called until the cooldown passes"""
+
+
+class QuotaExceededError(SearchError):
+    """The daily call budget is spent; nothing was sent to the backend"""
+
+
+def is_retryable(exc):
+    if isinstance(exc, RetryableSearchError):
+        return True
+    if isinstance(exc, SearchError):
+        return False
+    if isinstance(exc, (TimeoutError, ConnectionError)):
+        return True
+    name = type(exc).__name__.lower()
+    return any(word in name for word in RETRYABLE_NAMES) or "202 ratelimit" in str(exc).lower()
+
+
+class TokenBucket:
+    """Shared request rate limit: `rate` requests per second on average, bursts of up to `burst`"""
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take a token, sleeping until one is available; returns seconds waited"""
+        if not self.rate:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # Go into debt so concurrent callers queue up behind each other
+            self._tokens -= 1
+            wait_for = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait_for:
+            time.sleep(wait_for)
+        return wait_for
+
+
+class CircuitBreaker:
+    """Opens after `threshold` consecutive failed queries; after `cooldown` seconds one trial query
+    is let through (half-open) and its outcome closes or re-opens the breaker"""
+
+    def __init__(self, threshold=5, cooldown=60.0):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.trips = 0
+        self._trial = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if self._trial or time.monotonic() - self.opened_at < self.cooldown:
+                return False
+            self._trial = True
+            return True
+
+    def is_open(self):
+        """True while calls would be refused; unlike allow() it never starts the half-open trial"""
+        with self._lock:
+            return self.opened_at is not None and (
+                self._trial or time.monotonic() - self.opened_at < self.cooldown)
+
+    def success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial = False
+
+    def failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial or (self.opened_at is None and self.failures >= self.threshold):
+                self.trips += 1
+                self.opened_at = time.monotonic()
+                self._trial = False
+
+    @property
+    def state(self):
+        with self._lock:
+            return "closed" if self.opened_at is None else ("half-open" if self._trial else "open")
+
+
+class ResilientSearch:
+    """search(query, num) through retries, hedging, a shared TokenBucket and a CircuitBreaker
+
+    Each attempt is bounded by `timeout`. Once `min_samples` latencies are known,
+    an attempt still running at the p95 latency gets a hedged duplicate request
+    and whichever answers first wins. Retryable failures back off exponentially
+    with full jitter; fatal ones and exhausted retries raise to the caller.
+    With `quota` (a callable that takes one unit of a daily budget, False once
+    it's spent) every backend call is charged, retries and hedges included; a
+    hedge is skipped and a retry abandoned when the budget runs out.
+    `latencies` seeds the p95 with earlier runs' call latencies (seconds); a
+    run alone rarely makes min_samples calls. `measured` holds this run's own.
+    """
+
+    def __init__(self, backend, rate=None, burst=1, attempts=3, backoff=0.5, max_backoff=8.0, timeout=20.0,
+                 hedge=True, min_samples=20, min_hedge_delay=0.25, breaker=None, workers=32, sleep=time.sleep,
+                 quota=None, latencies=()):
+        self.backend = backend
+        self.quota = quota
+        self.bucket = TokenBucket(rate, burst)
+        self.attempts = attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.hedge = hedge
+        self.min_samples = min_samples
+        self.min_hedge_delay = min_hedge_delay
+        self.breaker = breaker or CircuitBreaker()
+        self.stats = {"calls": 0, "retries": 0, "hedges": 0, "hedge_wins": 0, "timeouts": 0,
+                      "fatal": 0, "failed": 0, "short_circuited": 0, "over_quota": 0}
+        self._sleep = sleep
+        self._latencies = deque(latencies, maxlen=200)
+        self.measured = deque(maxlen=200)
+        self._lock = threading.Lock()
+        self._rng = random.Random()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="search")
+
+    def _count(self, key, n=1):
+        with self._lock:
+            self.stats[key] += n
+
+    def hedge_delay(self):
+        """p95 of recent successful latencies, or None until there are enough samples"""
+        with self._lock:
+            if not self.hedge or len(self._latencies) < self.min_samples:
+                return None
+            ordered = sorted(self._latencies)
+        return max(self.min_hedge_delay, ordered[int(0.95 * (len(ordered) - 1))])
+
+    def _charge(self):
+        return self.quota is None or self.quota()
+
+    def _call(self, query, num, throttle=False):
+        if throttle:
+            self.bucket.acquire()
+        self._count("calls")
+        start = time.monotonic()
+        results = self.backend.search(query, num)
+        elapsed = time.monotonic() - start
+        with self._lock:
+            self._latencies.append(elapsed)
+            self.measured.append(elapsed)
+        return results
+
+    def _attempt(self, query, num):
+        """One attempt, maybe hedged; raises the first error only if every request failed"""
+        if not self._charge():
+            raise QuotaExceededError(f"daily query limit reached, not searching {query!r}")
+        # Wait for the rate limit before the hedge clock starts; the hedge waits for its own token
+        self.bucket.acquire()
+        primary = self._pool.submit(self._call, query, num)
+        futures = [primary]
+        deadline = time.monotonic() + self.timeout
+        delay = self.hedge_delay()
+        if delay is not None and delay < self.timeout:
+            done, _ = wait(futures, timeout=delay)
+            if not done and self._charge():
+                self._count("hedges")
+                futures.append(self._pool.submit(self._call, query, num, True))
+        pending = set(futures)
+        error = None
+        while pending:
+            done, pending = wait(pending, timeout=max(0.0, deadline - time.monotonic()),
+                                 return_when=FIRST_COMPLETED)
+            if not done:
+                self._count("timeouts")
+                raise TimeoutError(f"search timed out after {self.timeout:.0f}s: {query!r}")
+            for future in done:
+                if future.exception() is None:
+                    if future is not primary:
+                        self._count("hedge_wins")
+                    return future.result()
+                error = error or future.exception()
+        raise error
+
+    def search(self, query, num):
+        if not self.breaker.allow():
+            self._count("short_circuited")
+            raise CircuitOpenError(f"circuit open, not searching {query!r}")
+        for attempt in range(self.attempts):
+            try:
+                results = self._attempt(query, num)
+            except QuotaExceededError:
+                self._count("over_quota")
+                # Earlier tries failed, or this was the half-open trial: either way it mustn't stay pending
+                if attempt or self.breaker.state == "half-open":
+                    self.breaker.failure()
+                raise
+            except Exception as e:
+                if not is_retryable(e):
+                    # The backend answered; the query itself is the problem
+                    self._count("fatal")
+                    self.breaker.success()
+                    raise
+                if attempt + 1 == self.attempts:
+                    self._count("failed")
+                    self.breaker.failure()
+                    raise
+                self._count("retries")
+                self._sleep(self._rng.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt)))
+            else:
+                self.breaker.success()
+                return results
+
+    def close(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,131 @@
+"""
+Search backends - where web_search gets its results from
+DDGSBackend hits DuckDuckGo; RecordingBackend saves real responses to disk; ReplayBackend serves them back offline
+"""
+
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from pathlib import Path
+
+
+class SearchError(Exception):
+    """A backend failed to answer a query"""
+
+
+class RetryableSearchError(SearchError):
+    """A transient failure (rate limit, timeout) that is worth retrying"""
+
+
+class SearchBackend:
+    """Interface: search(query, num) returns [{"title", "link", "snippet"}, ...] or raises"""
+
+    name = "base"
+
+    def search(self, query, num):
+        raise NotImplementedError
+
+
+class DDGSBackend(SearchBackend):
+    name = "ddgs"
+
+    def search(self, query, num):
+        from ddgs import DDGS
+        try:
+            with DDGS() as ddgs:
+                return [{
+                    "title": r.get("title", ""),
+                    "link": r.get("href", ""),
+                    "snippet": r.get("body", "")
+                } for r in ddgs.text(query, max_results=num)]
+        except Exception as e:
+            # ddgs reports an empty result page as an exception; that's an answer, not a failure
+            if "no results" in str(e).lower():
+                return []
+            raise
+
+
+def fixture_path(folder, query, num):
+    """One JSON file per (query, num): readable slug plus a short hash of the exact query"""
+    slug = re.sub(r"[^a-z0-9]+", "-", query.lower()).strip("-")[:60]
+    digest = hashlib.sha1(f"{query}\n{num}".encode("utf-8")).hexdigest()[:8]
+    return Path(folder) / f"{slug}-{num}-{digest}.json"
+
+
+class RecordingBackend(SearchBackend):
+    """Pass queries to another backend and save every successful response as a fixture"""
+
+    name = "record"
+
+    def __init__(self, inner, folder):
+        self.inner = inner
+        self.folder = Path(folder)
+        self.folder.mkdir(parents=True, exist_ok=True)
+
+    def search(self, query, num):
+        results = self.inner.search(query, num)
+        record = {"query": query, "num": num, "recorded_at": time.time(), "results": results}
+        path = fixture_path(self.folder, query, num)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(record, ensure_ascii=False, indent=1), encoding="utf-8")
+        tmp.replace(path)
+        return results
+
+
+class ReplayBackend(SearchBackend):
+    """Serve recorded fixtures with configurable latency and injected failures
+
+    latency is seconds per call (plus up to `jitter` extra); error_rate is the
+    share of calls that raise RetryableSearchError, like a throttled backend.
+    Queries without a fixture return [] or raise SearchError, depending on `missing`.
+    """
+
+    name = "replay"
+
+    def __init__(self, folder, latency=0.0, jitter=0.0, error_rate=0.0, missing="empty", seed=None):
+        self.folder = Path(folder)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.missing = missing
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self._fixtures = {}
+        for path in sorted(self.folder.glob("*.json")):
+            record = json.loads(path.read_text(encoding="utf-8"))
+            self._fixtures[(record["query"], record["num"])] = record["results"]
+
+    def __len__(self):
+        return len(self._fixtures)
+
+    def search(self, query, num):
+        with self._rng_lock:
+            delay = self.latency + self._rng.uniform(0, self.jitter)
+            fail = self._rng.random() < self.error_rate
+        if delay:
+            time.sleep(delay)
+        if fail:
+            raise RetryableSearchError(f"injected failure for {query!r}")
+        results = self._fixtures.get((query, num))
+        if results is None:
+            if self.missing == "raise":
+                raise SearchError(f"no fixture for {query!r} (num={num})")
+            return []
+        return [dict(r) for r in results]
+
+
+def backend_from_env():
+    """SEARCH_BACKEND=ddgs (default) | record | replay, fixtures in SEARCH_FIXTURES"""
+    kind = os.getenv("SEARCH_BACKEND", "ddgs").lower()
+    folder = os.getenv("SEARCH_FIXTURES", "weekly_data/search_fixtures")
+    if kind == "record":
+        return RecordingBackend(DDGSBackend(), folder)
+    if kind == "replay":
+        return ReplayBackend(folder,
+                             latency=float(os.getenv("REPLAY_LATENCY", "0")),
+                             error_rate=float(os.getenv("REPLAY_ERROR_RATE", "0")))
+    return DDGSBackend()
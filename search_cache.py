@@ -0,0 +1,99 @@
+"""
+Search cache - persistent SQLite TTL cache for web_search results
+One file under weekly_data/, keyed by normalized query + num, LRU eviction
+"""
+
+import json
+import re
+import sqlite3
+import threading
+import time
+
+
+def normalize_query(query):
+    return re.sub(r"\s+", " ", (query or "").strip().lower())
+
+
+class SearchCache:
+    """Thread-safe on-disk cache of search results with hit/miss counters"""
+
+    def __init__(self, path, max_entries=5000):
+        self.path = str(path)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS results (
+                   query TEXT NOT NULL,
+                   num INTEGER NOT NULL,
+                   payload TEXT NOT NULL,
+                   fetched_at REAL NOT NULL,
+                   last_access REAL NOT NULL,
+                   PRIMARY KEY (query, num)
+               )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_last_access ON results (last_access)")
+        self._conn.commit()
+
+    def get(self, query, num, ttl_hours=None):
+        """Return cached results, or None if missing or older than ttl_hours (None = any age)"""
+        key = normalize_query(query)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, fetched_at FROM results WHERE query = ? AND num = ?", (key, num)
+            ).fetchone()
+            if row is None or (ttl_hours is not None and now - row[1] > ttl_hours * 3600):
+                self.misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE results SET last_access = ? WHERE query = ? AND num = ?", (now, key, num)
+            )
+            self._conn.commit()
+            self.hits += 1
+            return json.loads(row[0])
+
+    def fresh(self, query, num, ttl_hours):
+        """True if get() would hit; doesn't touch the counters or the LRU order"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT fetched_at FROM results WHERE query = ? AND num = ?", (normalize_query(query), num)
+            ).fetchone()
+        return row is not None and time.time() - row[0] <= ttl_hours * 3600
+
+    def put(self, query, num, results):
+        key = normalize_query(query)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+                (key, num, json.dumps(results, ensure_ascii=False), now, now),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM results").fetchone()
+        excess = count - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM results WHERE rowid IN "
+                "(SELECT rowid FROM results ORDER BY last_access LIMIT ?)", (excess,)
+            )
+            self.evictions += excess
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
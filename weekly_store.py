@@ -0,0 +1,106 @@
+"""
+Weekly store - append-only accumulation of each section's items for the current week
+One JSONL log per section; an in-memory index (canonical URL -> item hash) makes daily merges O(new items)
+"""
+
+import hashlib
+import json
+import shutil
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+TRACKING_PARAMS = {"fbclid", "gclid", "mc_cid", "mc_eid", "ref", "ref_src"}
+
+
+def canonical_url(url):
+    """Normalize a URL so trivially different links to the same page compare equal"""
+    try:
+        parts = urlsplit((url or "").strip())
+    except ValueError:
+        return (url or "").strip()
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                   if not k.lower().startswith("utm_") and k.lower() not in TRACKING_PARAMS)
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit(("https" if parts.scheme in ("http", "https") else parts.scheme,
+                       host, path, urlencode(query), ""))
+
+
+def item_hash(item):
+    blob = json.dumps(item, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()[:16]
+
+
+class WeeklyStore:
+    """Per-section append-only logs for one collection week
+
+    Each log line is {"key": canonical URL, "hash": item hash, "item": row}. A
+    changed item is appended again and the latest version wins on read.
+    """
+
+    def __init__(self, folder):
+        self.folder = Path(folder)
+        self.folder.mkdir(parents=True, exist_ok=True)
+        self._index = {}
+
+    def _log_path(self, section):
+        return self.folder / f"{section}.jsonl"
+
+    def _read_log(self, section):
+        path = self._log_path(section)
+        if not path.exists():
+            return []
+        with open(path, encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def index(self, section):
+        if section not in self._index:
+            self._index[section] = {rec["key"]: rec["hash"] for rec in self._read_log(section)}
+        return self._index[section]
+
+    def merge(self, section, rows, url_field="URL"):
+        """Append rows that are new or changed this week; returns the number appended"""
+        index = self.index(section)
+        fresh = []
+        for row in rows:
+            key = canonical_url(row.get(url_field, ""))
+            digest = item_hash(row)
+            if not key or index.get(key) == digest:
+                continue
+            index[key] = digest
+            fresh.append({"key": key, "hash": digest, "item": row})
+        if fresh:
+            with open(self._log_path(section), "a", encoding="utf-8") as f:
+                for rec in fresh:
+                    f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+        return len(fresh)
+
+    def load(self, section):
+        """The week's items for a section, latest version per URL, in first-seen order"""
+        latest = {}
+        for rec in self._read_log(section):
+            latest[rec["key"]] = rec["item"]
+        return list(latest.values())
+
+    def compact(self, section):
+        """Rewrite a section log keeping only the latest record per URL"""
+        latest = {}
+        for rec in self._read_log(section):
+            latest[rec["key"]] = rec
+        tmp = self._log_path(section).with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            for rec in latest.values():
+                f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+        tmp.replace(self._log_path(section))
+        return len(latest)
+
+    def rollover(self, archive_folder):
+        """Compact every section log, move them to archive_folder and start an empty week"""
+        archive_folder = Path(archive_folder)
+        archive_folder.mkdir(parents=True, exist_ok=True)
+        for path in sorted(self.folder.glob("*.jsonl")):
+            self.compact(path.stem)
+            shutil.move(str(path), str(archive_folder / path.name))
+        self._index = {}